@@ -72,6 +72,8 @@ setup(
     author=pkg_info['__author__'],
     tests_require=requirements,
     install_requires=requirements,
+    # vectorized similarity matrices (yawlib.similarity), fast JSON encoder (yawlib.serializer)
+    extras_require={'numpy': ['numpy'], 'orjson': ['orjson']},
     author_email=pkg_info['__email__'],
     description=pkg_info['__description__'],
     long_description=long_description,
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import asyncio
+import tempfile
+import threading
+import unittest
+
+from yawlib import SynsetNotFoundException
+from yawlib.aio import AsyncWordnet
+from yawlib.pool import ConnectionPool, PoolTimeout
+from yawlib.inmemory import InMemoryWordnet
+
+from test.test_inmemory import create_wnsql
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestAsyncWordnet(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wnsql = create_wnsql(os.path.join(self.tmpdir.name, 'wnsql.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def hold_connection(self, pool):
+        """ Borrow a connection in another thread, returns a function which gives it back """
+        holding, done = threading.Event(), threading.Event()
+
+        def hold():
+            with pool.acquire():
+                holding.set()
+                done.wait()
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait()
+
+        def release():
+            done.set()
+            thread.join()
+        return release
+
+    def test_pool(self):
+        pool = ConnectionPool(self.wnsql, size=2)
+        with pool.acquire() as ctx:
+            self.assertEqual(self.wnsql.get_synset('02084071-n', ctx=ctx).lemmas, ['dog', 'domestic dog'])
+            # connections are read-only
+            self.assertRaises(Exception, lambda: ctx.execute("DELETE FROM synsets"))
+        # all connections are used by other threads
+        releases = [self.hold_connection(pool) for _ in range(2)]
+        try:
+            self.assertRaises(PoolTimeout, lambda: pool.acquire(timeout=0.01))
+        finally:
+            for release in releases:
+                release()
+        self.assertEqual((pool.opened, pool.idle), (2, 2))
+        # idle connections are reused, the most recently released one first
+        with pool.acquire() as ctx3:
+            self.assertIsNot(ctx3, ctx)
+        with pool.acquire() as ctx4:
+            self.assertIs(ctx4, ctx3)
+        self.assertEqual(pool.opened, 2)
+        stats = pool.stats()
+        self.assertEqual((stats['checkouts'], stats['waits'], stats['timeouts']), (5, 0, 1))
+        pool.close()
+        self.assertEqual(pool.idle, 0)
+
+    def test_pool_options(self):
+        pool = ConnectionPool(self.wnsql, size=1, immutable=True, cache_size=1024, mmap_size=1048576)
+        self.assertTrue(pool.uri().endswith('?mode=ro&immutable=1'))
+        with pool.acquire() as ctx:
+            self.assertEqual(ctx.select_scalar('PRAGMA cache_size'), -1024)
+            self.assertEqual(ctx.select_scalar('PRAGMA mmap_size'), 1048576)
+            # nested checkouts by the same thread share the connection
+            with pool.acquire() as nested:
+                self.assertIs(nested, ctx)
+            self.assertEqual(pool.idle, 0)
+        self.assertEqual(pool.idle, 1)
+        self.assertEqual(pool.stats()['checkouts'], 1)
+
+    def test_pooled_dao(self):
+        self.wnsql.enable_pool(1)
+        # calls without ctx (and nested DAO calls) borrow the only pooled connection
+        self.assertEqual(self.wnsql.get_by_key('dog%1:05:00::').ID, '02084071-n')
+        self.assertEqual(len(self.wnsql.search('dog%')), 2)
+        stats = self.wnsql.pool.stats()
+        self.assertEqual((stats['opened'], stats['checkouts'], stats['in_use']), (1, 2, 0))
+        self.wnsql.disable_pool()
+        self.assertIsNone(self.wnsql.pool)
+        self.assertEqual(self.wnsql.get_synset('02084071-n').tagcount, 42)
+
+    def test_async_wnsql(self):
+        async def run():
+            async with AsyncWordnet(self.wnsql, pool_size=2) as awn:
+                ss = await awn.get_synset('02084071-n')
+                self.assertEqual(ss.tagcount, 42)
+                synsets = await awn.get_synsets(['02084071-n', '02121620-n'])
+                self.assertEqual(len(synsets), 2)
+                ss = await awn.get_by_key('cat%1:05:00::')
+                self.assertEqual(ss.ID, '02121620-n')
+                results = await awn.search_many(['dog', 'cat', 'wolf'])
+                self.assertEqual([len(r) for r in results], [1, 1, 0])
+                results = await awn.lookup_many(['02084071-n', 'cat%1:05:00::', 'wolf'])
+                self.assertEqual([len(r) for r in results.values()], [1, 1, 0])
+                checkouts = awn.pool.stats()['checkouts']
+                results = await awn.get_synset_many(['02084071-n', '99999999-n', '02121620-n', '02084071-n'])
+                self.assertEqual([s.ID if s else None for s in results], ['02084071-n', None, '02121620-n', '02084071-n'])
+                # one batched call on a single pooled connection
+                self.assertEqual(awn.pool.stats()['checkouts'], checkouts + 1)
+                results = await awn.get_by_key_many(['cat%1:05:00::', 'DOG%1:05:00::'])
+                self.assertEqual([s.ID for s in results], ['02121620-n', '02084071-n'])
+                self.assertEqual(awn.pool.stats()['checkouts'], checkouts + 2)
+                with self.assertRaises(SynsetNotFoundException):
+                    await awn.get_by_key_many(['cat%1:05:00::', 'wolf%1:05:00::'])
+                hypernyms = await awn.hypernyms('02084071-n')
+                self.assertEqual([s.ID for s in hypernyms], ['02083346-n'])
+                self.assertLessEqual(awn.pool.opened, 2)
+        asyncio.run(run())
+
+    def test_async_inmemory(self):
+        async def run():
+            async with AsyncWordnet(InMemoryWordnet.build(self.wnsql)) as awn:
+                self.assertIsNone(awn.pool)
+                synsets = await awn.search('dog%', 'n')
+                self.assertEqual([s.ID for s in synsets], ['02084071-n'])
+                # the same result type as WordnetSQL
+                self.assertEqual(await awn.hypehypo('02121620-n'), self.wnsql.hypehypo('02121620-n'))
+        asyncio.run(run())
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
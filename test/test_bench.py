@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import tempfile
+import unittest
+
+from yawlib import bench
+from yawlib.wordnetsql import WordnetSQL
+from yawlib.omwsql import OMWSQL
+from yawlib.glosswordnet import GWordnetSQLite
+
+from test.test_inmemory import MOCKUP_SYNSETS_DATA
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestBenchmark(unittest.TestCase):
+
+    SIZE = 500
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.synthetic = bench.SyntheticWordnet.from_xml(MOCKUP_SYNSETS_DATA, size=cls.SIZE)
+        cls.workload = cls.synthetic.generate(cls.tmpdir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def path(self, backend):
+        return os.path.join(self.tmpdir.name, bench.DB_FILES[backend])
+
+    def test_synthetic_synsets(self):
+        templates = len(self.synthetic.templates)
+        synsets = [(ss.ID.to_canonical(), list(ss.lemmas), list(ss.sensekeys))
+                   for ss in self.synthetic.synsets(start=templates - 1, count=2)]
+        self.assertEqual(synsets[0][0], '{:08d}-{}'.format(bench.FIRST_OFFSET + templates - 1, self.synthetic.templates[-1][1]))
+        # the second copy of the first template
+        first, _, lemmas, keys = self.synthetic.templates[0]
+        self.assertEqual(synsets[1][1], [lemma + '1' for lemma in lemmas])
+        self.assertEqual(synsets[1][2][0], keys[0].replace('%', '1%'))
+
+    def test_template(self):
+        # resolved from the package, not from the working directory
+        self.assertEqual(bench.BENCH_TEMPLATE, os.path.abspath(MOCKUP_SYNSETS_DATA))
+        self.assertRaises(ValueError, lambda: bench.SyntheticWordnet.from_xml(None))
+
+    def test_generate(self):
+        self.assertEqual(self.workload['size'], self.SIZE)
+        self.assertEqual(bench.read_workload(self.tmpdir.name)['ids'], self.workload['ids'])
+        sid = self.workload['ids'][0]
+        wn, omw, gwn = WordnetSQL(self.path('wnsql')), OMWSQL(self.path('omw')), GWordnetSQLite(self.path('gwn'))
+        with wn.ctx() as ctx:
+            self.assertEqual(ctx.select_scalar('SELECT COUNT(*) FROM synsets'), self.SIZE)
+        ss = wn.get_synset(sid)
+        self.assertEqual(omw.get_synset(sid).lemmas, ss.lemmas)
+        self.assertEqual(gwn.get_synset(sid).lemmas, ss.lemmas)
+        self.assertEqual(gwn.get_synset(sid).definition.strip(), ss.definition.strip())
+        # every synset but the roots has a hypernym
+        self.assertEqual(len(wn.relation_graph()), self.SIZE)
+        self.assertEqual(len(wn.relation_graph().roots()), len(omw.relation_graph().roots()))
+        key = self.workload['keys'][0]
+        self.assertEqual(wn.get_by_key(key).ID, gwn.get_by_key(key).ID)
+
+    def test_omw_search(self):
+        wn, omw = WordnetSQL(self.path('wnsql')), OMWSQL(self.path('omw'))
+        profiler = omw.enable_profiling()
+        synsets = omw.search('%a%')
+        self.assertGreater(len(synsets), 100)
+        self.assertEqual({ss.ID for ss in synsets}, {ss.ID for ss in wn.search('%a%')})
+        # hits are fetched with IN (...) queries instead of one get_synset() per hit
+        self.assertLess(sum(s['calls'] for s in profiler.stats()), 20)
+        sid = self.workload['ids'][0]
+        definition = omw.get_synset(sid).definition
+        profiler.reset()
+        self.assertIn(sid, omw.search_def(definition))
+        self.assertLess(sum(s['calls'] for s in profiler.stats()), 10)
+        # lazy synsets
+        synsets = omw.search('%a%', fields=('lemmas',))
+        self.assertEqual({ss.deferred_fields() for ss in synsets}, {frozenset(('definition', 'examples'))})
+        self.assertEqual(omw.search_def(definition, fields=())[sid].definition, definition)
+
+    def test_run_benchmarks(self):
+        results = bench.run_benchmarks(self.tmpdir.name, backends=('wnsql', 'omw', 'gwn'),
+                                       benchmarks=('get_synset', 'get_by_key', 'search', 'insert_synsets'),
+                                       ops=3, warmup=1, template=MOCKUP_SYNSETS_DATA)
+        self.assertEqual(results['meta']['synsets'], self.SIZE)
+        found = {(r['backend'], r['benchmark']): r for r in results['results']}
+        # there is no sensekey in OMW
+        self.assertNotIn(('omw', 'get_by_key'), found)
+        self.assertIn(('gwn', 'insert_synsets'), found)
+        self.assertEqual(len(found), 9)
+        for r in found.values():
+            self.assertEqual(r['ops'], 3)
+            self.assertGreater(r['ops_per_sec'], 0)
+            self.assertLessEqual(r['p50'], r['max'])
+        self.assertEqual(found[('wnsql', 'get_synset')]['items'], 3)
+        self.assertEqual(found[('gwn', 'insert_synsets')]['items'], 3 * bench.INSERT_SIZE)
+        # results can be saved and compared
+        output = os.path.join(self.tmpdir.name, 'results.json')
+        bench.write_results(results, output)
+        rows = bench.compare_results(bench.read_results(output), results)
+        self.assertEqual(len(rows), 9)
+        self.assertAlmostEqual(rows[0]['ops_per_sec'], 1.0)
+        self.assertIn('get_by_key', bench.report(results))
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import unittest
+
+from yawlib.cache import SynsetCache, cached
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSynsetCache(unittest.TestCase):
+
+    def test_lru(self):
+        cache = SynsetCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # a is now the most recently used
+        cache.put('c', 3)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertIsNone(cache.get('b'))
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses'], stats['evictions']), (2, 3, 1, 1))
+        cache.invalidate('a')
+        self.assertEqual(len(cache), 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertRaises(ValueError, lambda: SynsetCache(maxsize=0))
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = SynsetCache(maxsize=10, ttl=60, timer=timer)
+        cache.put('a', 1)
+        timer.now = 59
+        self.assertEqual(cache.get('a'), 1)
+        timer.now = 60
+        self.assertNotIn('a', cache)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_get_or_load(self):
+        cache = SynsetCache()
+        calls = []
+
+        def load():
+            calls.append(1)
+            return 'value'
+        self.assertEqual(cache.get_or_load('k', load), 'value')
+        self.assertEqual(cache.get_or_load('k', load), 'value')
+        self.assertEqual(len(calls), 1)
+        # None is not cached
+        self.assertIsNone(cache.get_or_load('none', lambda: None))
+        self.assertNotIn('none', cache)
+        # no cache
+        self.assertEqual(cached(None, 'k', load), 'value')
+        self.assertEqual(len(calls), 2)
+
+
+# -------------------------------------------------------------------------------
+# Main method
+# -------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import unittest
+from collections import Counter
+
+from yawlib.glosswordnet import GWordnetXML, GWordnetSQLite, GlossColumnStore
+
+########################################################################
+
+TEST_DIR = os.path.dirname(__file__)
+TEST_DATA = os.path.join(TEST_DIR, 'data')
+MOCKUP_SYNSETS_DATA = os.path.join(TEST_DATA, 'test.xml')
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestGlossColumnStore(unittest.TestCase):
+
+    xmlwn = GWordnetXML([MOCKUP_SYNSETS_DATA])
+
+    def check_store(self, store):
+        synsets = self.xmlwn.synsets
+        self.assertEqual(len(store), len(synsets))
+        for expected, actual in zip(synsets, store.synsets()):
+            self.assertEqual(actual.to_json(), expected.to_json())
+            self.assertEqual(actual.get_tags(), expected.get_tags())
+            self.assertEqual([(i.text, i.lemma, i.pos, i.cat, i.order) for g in actual for i in g.items],
+                             [(i.text, i.lemma, i.pos, i.cat, i.order) for g in expected for i in g.items])
+            self.assertEqual(sorted(store.get_gramwords(expected.ID)), sorted(expected.get_gramwords()))
+        # corpus-wide statistics
+        expected_keys = Counter(sk for ss in synsets for sk in ss.get_tags() if sk)
+        self.assertEqual(store.tagged_sensekeys(), expected_keys)
+        nouns = store.select('items', pos='NN')
+        self.assertEqual(len(nouns), sum(1 for ss in synsets for g in ss for i in g.items if i.pos == 'NN'))
+        self.assertEqual(store.count_by('items', 'pos', rows=nouns), Counter({'NN': len(nouns)}))
+        self.assertEqual(len(store.select('items', pos='no-such-pos')), 0)
+        self.assertEqual(store.synset_of('items', nouns[0]), 'r00001740')
+
+    def test_from_xml(self):
+        store = GlossColumnStore.from_xml([MOCKUP_SYNSETS_DATA])
+        self.check_store(store)
+        ss = store.get_synset('00001740-r')
+        self.assertEqual(ss.lemmas, ['a cappella'])
+        self.assertIn('r00001740', store)
+        self.assertNotIn('n99999999', store)
+
+    def test_from_sqlite(self):
+        db = GWordnetSQLite(":memory:")
+        with db.ctx() as ctx:
+            db.bulk_insert_synsets(self.xmlwn.synsets, ctx=ctx)
+            store = GlossColumnStore.from_sqlite(db, ctx=ctx)
+        self.check_store(store)
+        # database IDs are kept
+        ss = store.get_synset('00001740-r')
+        self.assertEqual([g.gid for g in ss], [1, 2])
+        self.assertEqual([i.itemid for i in ss.glosses[0].items][:2], [1, 2])
+
+
+# -------------------------------------------------------------------------------
+# Main method
+# -------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main()
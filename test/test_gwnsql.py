@@ -48,8 +48,10 @@ from texttaglib.chirptext import Counter, header
 from texttaglib.chirptext.chio import CSV
 from texttaglib.chirptext import ttl
 from yawlib import YLConfig
-from yawlib import WordnetException
+from yawlib import WordnetException, SynsetNotFoundException
+from yawlib import fulltext
 from yawlib.glosswordnet import GWordnetXML
+from yawlib.cache import SynsetCache
 from yawlib.glosswordnet import GWordnetSQLite as GWNSQL
 
 ########################################################################
@@ -108,6 +110,78 @@ class TestGlossWordnetSQL(unittest.TestCase):
             sks = ctx.sensekey.select()
             self.assertEqual(len(sks), 7)
 
+    def test_bulk_insert(self):
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        synsets = list(xmlwn.synsets)
+        db = GWNSQL(":memory:")
+        bulk_db = GWNSQL(":memory:")
+        with db.ctx() as ctx, bulk_db.ctx() as bulk_ctx:
+            db.insert_synsets(synsets[:20], ctx=ctx)
+            db.insert_synsets(synsets[20:], ctx=ctx)
+            # small batches to make sure that IDs continue across flushes and calls
+            self.assertEqual(bulk_db.bulk_insert_synsets(synsets[:20], batch_size=100, ctx=bulk_ctx), 20)
+            bulk_db.bulk_insert_synsets(synsets[20:], batch_size=100, ctx=bulk_ctx)
+            for table in ('synset', 'term', 'sensekey', 'gloss_raw', 'gloss', 'glossitem', 'sensetag'):
+                query = 'SELECT * FROM {} ORDER BY rowid'.format(table)
+                self.assertEqual([tuple(r) for r in ctx.select(query)], [tuple(r) for r in bulk_ctx.select(query)])
+            # indexes are created after the load
+            query = "SELECT name FROM sqlite_master WHERE type='index' ORDER BY name"
+            self.assertEqual([tuple(r) for r in ctx.select(query)], [tuple(r) for r in bulk_ctx.select(query)])
+            self.assertEqual(bulk_ctx.select_scalar('PRAGMA journal_mode'), 'memory')
+            ss = bulk_db.get_synset('r00001740', ctx=bulk_ctx)
+            self.assertEqual(ss.get_tags(), ['musical_accompaniment%1:10:00::', 'a_cappella%4:02:00::'])
+
+    def test_bulk_insert_stream(self):
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        db = GWNSQL(":memory:")
+        with db.ctx() as ctx:
+            count = db.bulk_insert_synsets(GWordnetXML().iterfiles([MOCKUP_SYNSETS_DATA]), batch_size=100, ctx=ctx)
+            self.assertEqual(count, len(xmlwn.synsets))
+            synsets = db.get_synsets([s.ID for s in xmlwn.synsets], ctx=ctx)
+            self.assertEqual([s.ID for s in synsets], [s.ID for s in xmlwn.synsets])
+            ss = synsets['00001740-r']
+            self.assertEqual(ss.get_tags(), ['musical_accompaniment%1:10:00::', 'a_cappella%4:02:00::'])
+
+    def test_parallel_insert(self):
+        db = GWNSQL(":memory:")
+        parallel_db = GWNSQL(":memory:")
+        with db.ctx() as ctx, parallel_db.ctx() as parallel_ctx:
+            db.bulk_insert_synsets(GWordnetXML().iterfiles([MOCKUP_SYNSETS_DATA]), ctx=ctx)
+            # split the test file into several shards
+            count = parallel_db.parallel_insert_files([MOCKUP_SYNSETS_DATA], workers=2, shard_size=100000, ctx=parallel_ctx)
+            self.assertEqual(count, ctx.select_scalar('SELECT COUNT(*) FROM synset'))
+            for table in ('synset', 'term', 'sensekey', 'gloss_raw', 'gloss', 'glossitem', 'sensetag'):
+                query = 'SELECT * FROM {} ORDER BY rowid'.format(table)
+                self.assertEqual([tuple(r) for r in ctx.select(query)], [tuple(r) for r in parallel_ctx.select(query)])
+
+    def test_synset_cache(self):
+        cache = SynsetCache(maxsize=100)
+        db = GWNSQL(":memory:", cache=cache)
+        with db.ctx() as ctx:
+            setup_ram_gwn(db, ctx)
+            ss = db.get_synset('00001740-r', ctx=ctx)
+            expected = ss.to_json_str()
+            self.assertIn(('gwn', 'eng', 400001740), cache)
+            hits = cache.stats()['hits']
+            self.assertEqual(db.get_synset('r00001740', ctx=ctx).to_json_str(), expected)
+            self.assertEqual(cache.stats()['hits'], hits + 1)
+            # callers get their own copies
+            ss.add_lemma('acappella')
+            ss.glosses[0].items.clear()
+            cached_ss = db.get_by_key('a_cappella%4:02:00::', ctx=ctx)
+            self.assertIsNot(cached_ss, ss)
+            self.assertEqual(cached_ss.to_json_str(), expected)
+            self.assertIs(cached_ss.glosses[0].synset, cached_ss)
+            synsets = db.search('a cappella', ctx=ctx)
+            self.assertEqual(synsets['00001740-r'].to_json_str(), expected)
+            hits = cache.stats()['hits']
+            # the second search is answered from the cache
+            synsets = db.search('a cappella', ctx=ctx)
+            self.assertEqual(synsets['00001740-r'].lemmas, ss.lemmas[:-1])
+            self.assertEqual(cache.stats()['hits'], hits + 2)
+
     def test_results_to_synsets(self):
         db = get_test_gwn()
         db.results_to_synsets([], None)
@@ -130,6 +204,30 @@ class TestGlossWordnetSQL(unittest.TestCase):
         self.assertEqual(len(synsets), 2)
         print(synsets)
 
+    def test_get_synsets_bulk(self):
+        gwn = get_test_gwn()
+        with gwn.ctx() as ctx:
+            sids = [x.ID for x in ctx.synset.select(columns=('ID',))]
+            synsets = gwn.get_synsets(sids + ['n99999999'], ctx=ctx)
+            self.assertEqual([s.ID.to_gwnsql() for s in synsets], sids)
+            # compare with the source XML file
+            xmlwn = GWordnetXML()
+            xmlwn.read(MOCKUP_SYNSETS_DATA)
+            expected = {x.ID: x for x in xmlwn.synsets}
+            self.assertEqual(len(synsets), len(expected))
+            for ss in synsets:
+                orig = expected[ss.ID]
+                self.assertEqual(ss.lemmas, orig.lemmas)
+                self.assertEqual(ss.sensekeys, orig.sensekeys)
+                self.assertEqual([str(g) for g in ss.raw_glosses], [str(g) for g in orig.raw_glosses])
+                self.assertEqual([str(g) for g in ss.glosses], [str(g) for g in orig.glosses])
+                for g, og in zip(ss.glosses, orig.glosses):
+                    self.assertEqual([(i.origid, i.text, i.lemma) for i in g.items], [(i.origid, i.text, i.lemma) for i in og.items])
+                    self.assertEqual([(t.sk, t.lemma, t.cat, t.item.origid) for t in g.tags],
+                                     [(t.sk, t.lemma, t.cat, t.item.origid) for t in og.tags])
+                    for tag in g.tags:
+                        self.assertIn(tag.item, g.items)
+
     def test_get_gloss_synsets(self):
         print("Test get glossed synset(s)")
         db = get_test_gwn()
@@ -143,6 +241,75 @@ class TestGlossWordnetSQL(unittest.TestCase):
         self.assertEqual([x.sk for x in tags], ['musical_accompaniment%1:10:00::', 'a_cappella%4:02:00::'])
         pass
 
+    def test_fts_match_query(self):
+        self.assertEqual(fulltext.to_match_query('%music%'), '"music"')
+        self.assertEqual(fulltext.to_match_query('perform%a cap_ella'), '"perform" AND "a cap" AND "ella"')
+        self.assertEqual(fulltext.to_match_query('say "hi"'), '"say ""hi"""')
+        self.assertEqual(fulltext.to_match_query('100@%', escape='@'), '"100%"')
+        # too short to use a trigram index
+        self.assertIsNone(fulltext.to_match_query('%ab%'))
+        self.assertIsNone(fulltext.to_match_query('%'))
+
+    def test_fts_search(self):
+        if not fulltext.fts5_available():
+            return
+        gwn = GWNSQL(':memory:')
+        with gwn.ctx() as ctx:
+            setup_ram_gwn(gwn, ctx)
+            queries = ['%music%', '%ly', 'wholly', 'a cappella', '%a%']
+
+            def search_all():
+                results = []
+                for q in queries:
+                    results.append({s.ID.to_canonical() for s in gwn.search(q, ctx=ctx)})
+                    results.append({s.ID.to_canonical() for s in gwn.search_cat(q, cat='orig', ctx=ctx)})
+                return results
+            expected = search_all()
+            self.assertFalse(fulltext.has_index(ctx, 'gloss_raw', 'gloss'))
+            gwn.build_fts_index(ctx=ctx)
+            self.assertTrue(fulltext.has_index(ctx, 'gloss_raw', 'gloss'))
+            self.assertTrue(fulltext.has_index(ctx, 'term', 'term'))
+            self.assertEqual(search_all(), expected)
+            # results are ranked
+            rows = fulltext.search(ctx, 'gloss_raw', 'gloss', '%music%', columns=('sid', 'gloss'))
+            self.assertTrue(rows)
+            self.assertTrue(all('music' in row.gloss.lower() for row in rows))
+
+    def test_nocase_index_query_plan(self):
+        gwn = GWNSQL(':memory:')
+        with gwn.ctx() as ctx:
+            setup_ram_gwn(gwn, ctx)
+
+            def query_plans(func):
+                # capture SQL statements issued by the DAO (with bound values) and explain them
+                statements = []
+                ctx.conn.set_trace_callback(statements.append)
+                try:
+                    func()
+                finally:
+                    ctx.conn.set_trace_callback(None)
+                return ['\n'.join(row[3] for row in ctx.select('EXPLAIN QUERY PLAN ' + s)) for s in statements if 'NOCASE' in s or 'LIKE' in s]
+            lookups = [lambda: gwn.get_by_key('WHOLLY%4:02:00::', ctx=ctx),
+                       lambda: gwn.get_by_keys(['Wholly%4:02:00::', 'divine%3:00:02:heavenly:00'], ctx=ctx),
+                       lambda: gwn.search('Automatically', ctx=ctx),
+                       lambda: gwn.search('auto%', ctx=ctx)]
+            # drop the indexes to simulate an old database
+            for table, column in gwn.NOCASE_INDEXES:
+                ctx.execute('DROP INDEX {}_{}_nocase'.format(table, column))
+            for lookup in lookups:
+                for plan in query_plans(lookup):
+                    self.assertNotIn('_nocase', plan)
+            gwn.upgrade_schema(ctx=ctx)
+            for lookup in lookups:
+                plans = query_plans(lookup)
+                self.assertTrue(plans)
+                for plan in plans:
+                    self.assertRegex(plan, r'USING (COVERING )?INDEX (sensekey_sensekey|term_term)_nocase')
+            # lookups are still case-insensitive
+            self.assertEqual(gwn.get_by_key('WHOLLY%4:02:00::', ctx=ctx).ID, '00008007-r')
+            self.assertEqual(len(gwn.get_by_keys(['Wholly%4:02:00::', 'divine%3:00:02:heavenly:00'], ctx=ctx)), 2)
+            self.assertTrue(gwn.search('Automatically', ctx=ctx))
+
     def test_get_synset_by_term(self):
         ss = get_test_gwn().search('AD')
         self.assertGreater(len(ss), 0)
@@ -242,6 +409,11 @@ class TestGlossWordnetSQL(unittest.TestCase):
                 self.assertTrue(ss.ID)
                 self.assertTrue(ss.definition)
                 self.assertTrue(ss.keys)
+            # unknown synset IDs are ignored unless strict is set
+            sids = ('r00001837', 'n99999999', 'a01179767')
+            self.assertEqual([ss.ID for ss in gwn.get_synsets(sids, ctx=ctx)], ['00001837-r', '01179767-a'])
+            self.assertRaises(SynsetNotFoundException, lambda: gwn.get_synsets(sids, strict=True, ctx=ctx))
+            self.assertEqual(len(gwn.get_synsets(sids[::2], strict=True, ctx=ctx)), 2)
             # test get by key
             r00008007 = gwn.get_by_key('wholly%4:02:00::', ctx=ctx)
             self.assertTrue(r00008007)
@@ -255,7 +427,7 @@ class TestGlossWordnetSQL(unittest.TestCase):
                 self.assertTrue(ss.keys)
                 self.assertTrue(ss.examples)
             # test sk2sid
-            self.assertEqual(gwn.sk2sid('wholly%4:02:00::', ctx=ctx), 'r00008007')
+            self.assertEqual(gwn.sk2sid('wholly%4:02:00::', ctx=ctx), '00008007-r')
             # test search
             lemma = 'automatically'
             synsets = gwn.search(lemma=lemma, ctx=ctx)
@@ -50,6 +50,7 @@ import json
 from texttaglib.chirptext import header
 from texttaglib.chirptext import texttaglib as ttl
 from yawlib.glosswordnet import GWordnetXML
+from yawlib.wntk import copy_objects
 
 ########################################################################
 
@@ -88,6 +89,57 @@ class TestGlossWordNetXML(unittest.TestCase):
         self.assertEqual(len(ss.get_domain()), 1)
         self.assertEqual(ss.get_domain()[0].surface, '(physics)')
 
+    def test_iterparse(self):
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        streamed = GWordnetXML()
+        synsets = list(streamed.iterfiles([MOCKUP_SYNSETS_DATA]))
+        # streamed synsets are not kept by the reader
+        self.assertEqual(len(streamed.synsets), 0)
+        self.assertEqual([s.ID for s in synsets], [s.ID for s in xmlwn.synsets])
+        self.assertEqual([s.to_json() for s in synsets], [s.to_json() for s in xmlwn.synsets])
+        ss = synsets[[s.ID for s in synsets].index('03095965-n')]
+        self.assertEqual(ss.get_domain()[0].surface, '(physics)')
+
+    def test_compact_objects(self):
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        ss = xmlwn.synsets.by_sid('00001740-r')
+        gloss = ss.get_def()
+        item = gloss.items[0]
+        tag = gloss.tags[0]
+        for obj in (ss.raw_glosses[0], gloss, item, tag):
+            self.assertFalse(hasattr(obj, '__dict__'))
+        # tags of collocations keep the ID of the tagged item
+        self.assertEqual(tag.cat, 'cf')
+        self.assertEqual(tag.sk, 'musical_accompaniment%1:10:00::')
+        self.assertEqual(tag.itemid, 'r00001740_wf2')
+        self.assertEqual(tag.origid, 'r00001740_id.1')
+        # synsets still accept attributes of their own
+        ss.note = 'checked'
+        self.assertEqual(ss.note, 'checked')
+        # repeated values are shared
+        self.assertEqual(item.text, 'without')
+        others = [i for s in xmlwn.synsets for g in s.glosses for i in g.items if i.text == 'without' and i is not item]
+        self.assertTrue(others)
+        self.assertIs(item.text, others[0].text)
+        self.assertIs(item.pos, others[0].pos)
+
+    def test_copy_objects(self):
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        for slotted in (True, False):
+            ss = copy_objects(xmlwn.synsets, slotted=slotted)[0]
+            orig = list(xmlwn.synsets)[0]
+            gloss = ss.glosses[0]
+            self.assertEqual(hasattr(gloss, '__dict__'), not slotted)
+            self.assertEqual(hasattr(gloss.items[0], '__dict__'), not slotted)
+            self.assertEqual(ss.lemmas, orig.lemmas)
+            self.assertIs(gloss.synset, ss)
+            self.assertIs(gloss.items[0].gloss, gloss)
+            self.assertIs(ss._Synset__sid, orig.ID)
+            self.assertEqual([i.text for i in gloss.items], [i.text for i in orig.glosses[0].items])
+
     def test_convert_gwnxml_to_json(self):
         header("Test export GWN to JSON")
         xmlwn = GWordnetXML()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import tempfile
+import unittest
+
+from yawlib.inmemory import InMemoryWordnet
+from yawlib.yawol.httpcache import ResponseCache, data_version, parse_etags
+
+from test.test_inmemory import create_wnsql
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'wnsql.db')
+        self.wnsql = create_wnsql(self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_etag(self):
+        responses = ResponseCache(self.wnsql, max_age=60)
+        etag = responses.etag('synset', '02084071-n')
+        self.assertEqual(etag, ResponseCache(self.wnsql).etag('synset', '02084071-n'))
+        self.assertNotEqual(etag, responses.etag('search', '02084071-n'))
+        self.assertNotEqual(etag, responses.etag('synset', '02084071-n', 'callback'))
+        self.assertEqual(responses.headers(etag), {'ETag': etag, 'Cache-Control': 'public, max-age=60'})
+        # ETags change when the database file is changed
+        version = data_version(self.wnsql)
+        with self.wnsql.ctx() as ctx:
+            ctx.execute("UPDATE synsets SET definition = 'a dog' WHERE synsetid = 102084071")
+        self.assertNotEqual(data_version(self.wnsql), version)
+        # snapshots are identified by their files
+        path = os.path.join(self.tmpdir.name, 'wn.snapshot')
+        InMemoryWordnet.build(self.wnsql).save(path)
+        self.assertNotEqual(data_version(InMemoryWordnet.load(path)), data_version(InMemoryWordnet.build(self.wnsql)))
+
+    def test_not_modified(self):
+        responses = ResponseCache(self.wnsql)
+        etag = responses.etag('synset', '02084071-n')
+        self.assertEqual(parse_etags('"a", W/"b"'), ['"a"', '"b"'])
+        self.assertTrue(responses.not_modified(etag, etag))
+        self.assertTrue(responses.not_modified('"x", W/{}'.format(etag), etag))
+        self.assertTrue(responses.not_modified('*', etag))
+        self.assertFalse(responses.not_modified('"x"', etag))
+        self.assertFalse(responses.not_modified(None, etag))
+
+    def test_respond(self):
+        responses = ResponseCache(self.wnsql)
+
+        def render(sid):
+            ss = self.wnsql.get_synset(sid)
+            return ss.to_json_str() if ss is not None else None
+        etag = responses.etag('synset', '02084071-n', 'cb')
+        data, tag, not_modified = responses.respond('synset', '02084071-n', etag, lambda: render('02084071-n'), 'cb')
+        self.assertEqual((data, tag, not_modified), (self.wnsql.get_synset('02084071-n').to_json_str().encode('utf-8'), etag, True))
+        self.assertFalse(responses.respond('synset', '02084071-n', '"x"', lambda: render('02084071-n'))[2])
+        # resources which do not exist are never "not modified"
+        etag = responses.etag('synset', '99999999-n')
+        for if_none_match in ('*', etag):
+            self.assertEqual(responses.respond('synset', '99999999-n', if_none_match, lambda: render('99999999-n')), (None, etag, False))
+
+    def test_cached_responses(self):
+        responses = ResponseCache(self.wnsql, maxsize=2)
+        calls = []
+
+        def render(sid):
+            calls.append(sid)
+            ss = self.wnsql.get_synset(sid)
+            return ss.to_json_str() if ss is not None else None
+        data = responses.get('synset', '02084071-n', lambda: render('02084071-n'))
+        self.assertIsInstance(data, bytes)
+        self.assertIs(responses.get('synset', '02084071-n', lambda: render('02084071-n')), data)
+        # not found responses are not cached
+        self.assertIsNone(responses.get('synset', '99999999-n', lambda: render('99999999-n')))
+        self.assertIsNone(responses.get('synset', '99999999-n', lambda: render('99999999-n')))
+        self.assertEqual(calls, ['02084071-n', '99999999-n', '99999999-n'])
+        stats = responses.stats()
+        self.assertEqual((stats['size'], stats['hits']), (1, 1))
+        # without cache, views are always called
+        responses = ResponseCache(self.wnsql, maxsize=0)
+        self.assertEqual(responses.get('synset', '02084071-n', lambda: render('02084071-n')), data)
+        self.assertIsNone(responses.stats())
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
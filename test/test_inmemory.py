@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import mmap
+import tempfile
+import unittest
+
+from yawlib import WordnetSQL, SynsetID
+from yawlib import SynsetNotFoundException
+from yawlib.common import WordnetException
+from yawlib.glosswordnet import GWordnetXML, GWordnetSQLite
+from yawlib.inmemory import InMemoryWordnet
+from yawlib.helpers import get_snapshot
+
+########################################################################
+
+TEST_DIR = os.path.dirname(__file__)
+MOCKUP_SYNSETS_DATA = os.path.join(TEST_DIR, 'data', 'test.xml')
+
+WNSQL_SCRIPT = """
+CREATE TABLE words (wordid INTEGER PRIMARY KEY, lemma TEXT);
+CREATE TABLE synsets (synsetid INTEGER PRIMARY KEY, pos TEXT, lexdomainid INTEGER, definition TEXT);
+CREATE TABLE senses (wordid INTEGER, casedwordid INTEGER, synsetid INTEGER, senseid INTEGER PRIMARY KEY, sensenum INTEGER, lexid INTEGER, tagcount INTEGER, sensekey TEXT);
+CREATE TABLE samples (synsetid INTEGER, sampleid INTEGER, sample TEXT);
+CREATE TABLE semlinks (synset1id INTEGER, synset2id INTEGER, linkid INTEGER);
+CREATE VIEW wordsXsensesXsynsets AS SELECT wordid, lemma, casedwordid, synsetid, senseid, sensenum, lexid, tagcount, sensekey, pos, lexdomainid, definition FROM words JOIN senses USING (wordid) JOIN synsets USING (synsetid);
+CREATE VIEW wordsXsenses AS SELECT wordid, lemma, casedwordid, synsetid, senseid, sensenum, lexid, tagcount, sensekey FROM words JOIN senses USING (wordid);
+INSERT INTO words VALUES (1, 'dog'), (2, 'domestic dog'), (3, 'canine'), (4, 'cat'), (5, 'dogged');
+INSERT INTO synsets VALUES (102084071, 'n', 5, 'a member of the genus Canis; has been domesticated by man since prehistoric times'),
+                           (102083346, 'n', 5, 'any of various fissiped mammals with nonretractile claws'),
+                           (102121620, 'n', 5, 'feline mammal usually having thick soft fur'),
+                           (301584019, 's', 0, 'stubbornly unyielding');
+INSERT INTO senses VALUES (1, NULL, 102084071, 1, 1, 0, 42, 'dog%1:05:00::'), (2, NULL, 102084071, 2, 1, 0, 0, 'domestic_dog%1:05:00::'),
+                          (3, NULL, 102083346, 3, 1, 0, 3, 'canine%1:05:00::'), (4, NULL, 102121620, 4, 1, 0, 18, 'cat%1:05:00::'),
+                          (5, NULL, 301584019, 5, 1, 0, 1, 'dogged%5:00:00:persistent:00');
+INSERT INTO samples VALUES (102084071, 1, 'the dog barked all night'), (301584019, 1, 'dogged persistence');
+INSERT INTO semlinks VALUES (102084071, 102083346, 1), (102083346, 102084071, 2), (102121620, 102083346, 40);
+"""
+
+
+def create_wnsql(db_path):
+    wn = WordnetSQL(db_path)
+    with wn.ctx() as ctx:
+        ctx.cur.executescript(WNSQL_SCRIPT)
+    return wn
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestInMemoryWordnet(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wnsql = create_wnsql(os.path.join(self.tmpdir.name, 'wnsql.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_build_from_wnsql(self):
+        wn = InMemoryWordnet.build(self.wnsql)
+        self.assertEqual(len(wn), 4)
+        ss = wn.get_synset('02084071-n')
+        expected = self.wnsql.get_synset('02084071-n')
+        self.assertEqual(ss.ID, expected.ID)
+        self.assertEqual(ss.lemmas, ['dog', 'domestic dog'])
+        self.assertEqual(ss.sensekeys, expected.sensekeys)
+        self.assertEqual(ss.definitions, expected.definitions)
+        self.assertEqual(ss.examples, ['the dog barked all night'])
+        self.assertEqual(ss.tagcount, 42)
+        self.assertIsNone(wn.get_synset('99999999-n'))
+        self.assertEqual([s.ID for s in wn.get_synsets([102084071, 'n02084071', '99999999-n', '01584019-a'])], ['02084071-n', '01584019-a'])
+        self.assertEqual(wn.get_tagcount('02084071-n'), 42)
+        # sensekeys
+        self.assertEqual(wn.get_by_key('DOG%1:05:00::').ID, '02084071-n')
+        self.assertEqual(wn.sk2sid('cat%1:05:00::'), SynsetID.from_string('02121620-n'))
+        self.assertRaises(SynsetNotFoundException, lambda: wn.get_by_key('wolf%1:05:00::'))
+        self.assertEqual([s.ID for s in wn.get_by_keys(['dog%1:05:00::', 'domestic_dog%1:05:00::'])], ['02084071-n'])
+
+    def test_search(self):
+        wn = InMemoryWordnet.build(self.wnsql)
+        with self.wnsql.ctx() as ctx:
+            for query, pos in (('dog', None), ('Dog%', None), ('dog%', 'n'), ('dog%', 'a'), ('%ine', None), ('ca_', None), ('wolf', None)):
+                expected = {s.ID for s in self.wnsql.search(query, pos, ctx=ctx)}
+                self.assertEqual({s.ID for s in wn.search(query, pos)}, expected)
+            self.assertEqual({s.ID for s in wn.search_def('%mammal%')}, {'02083346-n', '02121620-n'})
+            self.assertEqual({s.ID for s in wn.search_ex('%persist%')}, {'01584019-a'})
+            # definitions are searched as they are stored
+            for query in ('%canis; has%', '%mammal%', 'has been%'):
+                expected = {s.ID for s in self.wnsql.search_def(query, ctx=ctx)}
+                self.assertEqual({s.ID for s in wn.search_def(query)}, expected)
+            # case-sensitive search
+            self.assertEqual([s.ID for s in wn.search('Dog%', ignore_case=False)], [])
+            self.assertEqual([s.ID for s in wn.search('domestic d_g', ignore_case=False)], ['02084071-n'])
+            self.assertEqual([s.ID for s in wn.search_def('%canis%', ignore_case=False)], [])
+            self.assertEqual([s.ID for s in wn.search_def('%Canis%', ignore_case=False)], ['02084071-n'])
+            # exact lemma, one sense per synset
+            for lemma in ('dog', 'domestic dog', 'Dog', 'dog%', 'wolf'):
+                expected = [s.to_json() for s in self.wnsql.get_synsets_by_lemma(lemma, ctx=ctx)]
+                self.assertEqual([s.to_json() for s in wn.get_synsets_by_lemma(lemma)], expected)
+
+    def test_relations(self):
+        wn = InMemoryWordnet.build(self.wnsql)
+        self.assertEqual([s.ID for s in wn.hypernyms('02084071-n')], ['02083346-n'])
+        self.assertEqual(wn.hypernyms('02084071-n')['02083346-n'].lemmas, ['canine'])
+        self.assertEqual([s.ID for s in wn.hyponyms('02083346-n')], ['02084071-n'])
+        # linkid 40 is not a hypernym but it is a hypehypo link
+        self.assertEqual(len(wn.hypernyms('02121620-n')), 0)
+        self.assertEqual(wn.hypehypo('02121620-n'), {102083346})
+        self.assertEqual(wn.hypehypo('02121620-n'), self.wnsql.hypehypo('02121620-n'))
+        self.assertEqual(wn.hypehypo('99999999-n'), set())
+
+    def test_snapshot(self):
+        path = os.path.join(self.tmpdir.name, 'wn.snapshot')
+        InMemoryWordnet.build(self.wnsql).save(path)
+        wn = InMemoryWordnet.load(path)
+        self.assertEqual(wn.source, 'wnsql')
+        self.assertEqual(wn.get_synset('02084071-n').lemmas, ['dog', 'domestic dog'])
+        self.assertEqual(wn.get_by_key('dogged%5:00:00:persistent:00').ID, '01584019-a')
+        self.assertEqual([s.ID for s in wn.hyponyms('02083346-n')], ['02084071-n'])
+        with open(path, 'rb') as infile:
+            data = bytearray(infile.read())
+        data[:8] = b'NOTASNAP'
+        self.assertRaises(WordnetException, lambda: InMemoryWordnet.from_buffer(data))
+
+    def test_mmap_snapshot(self):
+        path = os.path.join(self.tmpdir.name, 'wn.snapshot')
+        InMemoryWordnet.build(self.wnsql).save(path)
+        wn = get_snapshot(path)
+        self.assertIsInstance(wn.buffer, mmap.mmap)
+        self.assertEqual(wn.get_synset('02084071-n').lemmas, ['dog', 'domestic dog'])
+        self.assertEqual({s.ID for s in wn.search('dog%')}, {'02084071-n', '01584019-a'})
+        self.assertEqual([s.ID for s in wn.hypernyms('02084071-n')], ['02083346-n'])
+        wn.close()
+        self.assertIsNone(wn.buffer)
+
+    def test_build_from_gwn(self):
+        db = GWordnetSQLite(':memory:')
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        with db.ctx() as ctx:
+            db.insert_synsets(xmlwn.synsets, ctx=ctx)
+            wn = InMemoryWordnet.build(db, ctx=ctx)
+        self.assertEqual(len(wn), len(xmlwn.synsets))
+        for expected in xmlwn.synsets:
+            ss = wn.get_synset(expected.ID)
+            self.assertEqual(ss.lemmas, expected.lemmas)
+            self.assertEqual(ss.sensekeys, expected.sensekeys)
+            self.assertEqual(ss.definition, expected.definition)
+            self.assertEqual(ss.examples, expected.examples)
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from yawlib.models import Synset
+from yawlib.common import WordnetException
+from yawlib.cache import SynsetCache
+from yawlib.wordnetsql import WordnetSQL
+from yawlib.lazy import LazySynset
+from yawlib.glosswordnet import GWordnetXML, GWordnetSQLite
+from yawlib.glosswordnet.gwnmodels import GlossedSynset, LazyGlossedSynset
+
+from test.test_inmemory import create_wnsql, MOCKUP_SYNSETS_DATA
+
+
+SIDS = ['02084071-n', '02083346-n', '02121620-n', '01584019-a']
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestLazySynsets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wnsql = create_wnsql(os.path.join(self.tmpdir.name, 'wnsql.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def calls(self, profiler):
+        calls = sum(s['calls'] for s in profiler.stats())
+        profiler.reset()
+        return calls
+
+    def test_deferred_fields(self):
+        eager = self.wnsql.get_synsets(SIDS)
+        profiler = self.wnsql.enable_profiling()
+        synsets = self.wnsql.get_synsets(SIDS, fields=())
+        self.assertEqual(self.calls(profiler), 1)
+        self.assertEqual([ss.ID for ss in synsets], SIDS)
+        self.assertTrue(all(isinstance(ss, LazySynset) for ss in synsets))
+        self.assertEqual(synsets['02084071-n'].deferred_fields(), {'lemmas', 'definition', 'examples'})
+        # one fault loads a field group for the whole collection
+        self.assertEqual(synsets['02084071-n'].lemma, 'dog')
+        self.assertEqual(self.calls(profiler), 1)
+        for ss, expected in zip(synsets, eager):
+            self.assertEqual(ss.lemmas, expected.lemmas)
+            self.assertEqual(ss.sensekeys, expected.sensekeys)
+            self.assertEqual(ss.tagcount, expected.tagcount)
+            self.assertEqual(ss.deferred_fields(), {'definition', 'examples'})
+        self.assertEqual(self.calls(profiler), 0)
+        self.assertEqual([ss.definition for ss in synsets], [ss.definition for ss in eager])
+        self.assertEqual([ss.examples for ss in synsets], [ss.examples for ss in eager])
+        self.assertEqual(self.calls(profiler), 2)
+        self.assertEqual(synsets.by_sk('dogged%5:00:00:persistent:00').ID, '01584019-a')
+        self.assertEqual(synsets.to_json(), eager.to_json())
+        self.assertIsNone(synsets['02084071-n']._batch)
+
+    def test_fields(self):
+        eager = self.wnsql.get_synset('02084071-n')
+        ss = self.wnsql.get_synset('02084071-n', fields=('sensekeys',))
+        self.assertEqual(ss.deferred_fields(), {'definition', 'examples'})
+        self.assertEqual(ss.to_json_bytes(), eager.to_json_bytes())
+        self.assertEqual(ss.deferred_fields(), set())
+        self.assertEqual(self.wnsql.get_synset('02084071-n', fields='definition').deferred_fields(), {'lemmas', 'examples'})
+        self.assertRaises(WordnetException, lambda: self.wnsql.get_synset('02084071-n', fields=('glosses',)))
+        # search functions and lookup_many
+        self.assertEqual({ss.deferred_fields() for ss in self.wnsql.search('dog%', fields=())}, {frozenset(('lemmas', 'definition', 'examples'))})
+        self.assertEqual([ss.lemma for ss in self.wnsql.search_def('%mammal%', fields=('lemmas',))], ['canine', 'cat'])
+        self.assertEqual(self.wnsql.get_by_key('cat%1:05:00::', fields=()).definition, 'feline mammal usually having thick soft fur')
+        results = self.wnsql.lookup_many(['dog', '02121620-n'], fields=('lemmas',))
+        self.assertEqual([ss.lemma for ss in results['02121620-n']], ['cat'])
+        # lazy synsets are not cached
+        wn = WordnetSQL(self.wnsql.ds.path, cache=SynsetCache(10))
+        wn.get_synsets(SIDS, fields=())
+        self.assertEqual(wn.cache.stats()['size'], 0)
+        wn.get_synsets(SIDS)
+        self.assertEqual(type(wn.get_synset('02084071-n', fields=())), Synset)
+
+    def test_failed_fault(self):
+        synsets = self.wnsql.get_synsets(SIDS, fields=())
+        load_fields = self.wnsql._load_fields
+
+        def fail_once(group, synset_map, ctx=None):
+            self.wnsql._load_fields = load_fields
+            # fail after filling some values
+            load_fields(group, synset_map, ctx=ctx)
+            raise WordnetException("Connection lost")
+        self.wnsql._load_fields = fail_once
+        ss = synsets['02084071-n']
+        self.assertRaises(WordnetException, lambda: ss.lemmas)
+        self.assertEqual(ss.deferred_fields(), {'lemmas', 'definition', 'examples'})
+        # the group is loaded again on the next access
+        self.assertEqual(ss.lemmas, ['dog', 'domestic dog'])
+        self.assertEqual(ss.sensekeys, ['dog%1:05:00::', 'domestic_dog%1:05:00::'])
+        self.assertEqual(ss.tagcount, 42)
+        self.assertEqual(synsets['02121620-n'].lemmas, ['cat'])
+        self.assertEqual(ss.deferred_fields(), {'definition', 'examples'})
+
+    def test_pickle(self):
+        ss = pickle.loads(pickle.dumps(self.wnsql.get_synset('02084071-n', fields=())))
+        self.assertEqual(type(ss), Synset)
+        self.assertEqual(ss.lemmas, ['dog', 'domestic dog'])
+        self.assertEqual(ss.examples, ['the dog barked all night'])
+        self.assertEqual(ss.tagcount, 42)
+
+    def test_gwn(self):
+        db = GWordnetSQLite(os.path.join(self.tmpdir.name, 'gwn.db'))
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        db.insert_synsets(xmlwn.synsets)
+        sids = [ss.ID for ss in xmlwn.synsets]
+        eager = db.get_synsets(sids)
+        profiler = db.enable_profiling()
+        synsets = db.get_synsets(sids, fields=('definition',))
+        self.assertEqual(self.calls(profiler), 4)
+        self.assertTrue(all(isinstance(ss, LazyGlossedSynset) for ss in synsets))
+        self.assertEqual({ss.deferred_fields() for ss in synsets}, {frozenset(('lemmas', 'tags'))})
+        self.assertEqual([ss.definition for ss in synsets], [ss.definition for ss in eager])
+        # sense tags are loaded on first access
+        self.assertEqual([ss.get_tags() for ss in synsets], [ss.get_tags() for ss in eager])
+        self.assertEqual(self.calls(profiler), 1)
+        self.assertEqual(synsets.to_json(), eager.to_json())
+        self.assertEqual(self.calls(profiler), 2)
+        # tags need glosses
+        ss = db.get_synset(sids[0], fields=('tags',))
+        self.assertEqual(ss.deferred_fields(), {'lemmas'})
+        ss = pickle.loads(pickle.dumps(db.get_synset(sids[0], fields=())))
+        self.assertEqual(type(ss), GlossedSynset)
+        self.assertEqual(ss.get_tags(), eager[sids[0]].get_tags())
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import json
+import tempfile
+import unittest
+
+from yawlib import fulltext
+from yawlib.lookup import classify, SYNSET_ID, SENSEKEY, TEXT
+from yawlib.helpers import search_wn_full_text, bulk_get_synsets, bulk_search, parse_bulk_items, to_ndjson
+from yawlib.inmemory import InMemoryWordnet
+from yawlib.glosswordnet import GWordnetXML, GWordnetSQLite
+
+from test.test_inmemory import create_wnsql, MOCKUP_SYNSETS_DATA
+
+
+QUERIES = ['02084071-n', '99999999-n', 'dog%1:05:00::', 'DOGGED%5:00:00:persistent:00', 'wolf%1:05:00::',
+           'dog', 'mammal', 'Dog%', 'persist', 'ca_', 'nothing']
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestLookupMany(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wnsql = create_wnsql(os.path.join(self.tmpdir.name, 'wnsql.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_classify(self):
+        self.assertEqual(classify('02084071-n'), SYNSET_ID)
+        self.assertEqual(classify('n02084071'), SYNSET_ID)
+        self.assertEqual(classify('dogged%5:00:00:persistent:00'), SENSEKEY)
+        self.assertEqual(classify('dog%1:05:00::'), SENSEKEY)
+        self.assertEqual(classify('dog%'), TEXT)
+        self.assertEqual(classify('02084071-n dog'), TEXT)
+
+    def test_lookup_wnsql(self):
+        results = self.wnsql.lookup_many(QUERIES + ['dog'])
+        self.assertEqual(list(results.keys()), QUERIES)
+        with self.wnsql.ctx() as ctx:
+            for query in QUERIES:
+                expected = [s.ID for s in search_wn_full_text(self.wnsql, query, ctx=ctx)]
+                self.assertEqual([s.ID for s in results[query]], expected)
+        self.assertEqual([s.ID for s in self.wnsql.lookup_many(['dog%'], pos='a')['dog%']], ['01584019-a'])
+        self.assertEqual(len(self.wnsql.lookup_many(['dog'], auto_wrap=False)['dog']), 1)
+        # _ is a wildcard, such queries are not wrapped
+        self.assertEqual([s.ID for s in self.wnsql.lookup_many(['ca_'])['ca_']], ['02121620-n'])
+
+    @unittest.skipIf(not fulltext.fts5_available(), "SQLite FTS5 is not available")
+    def test_lookup_fts(self):
+        expected = self.wnsql.lookup_many(QUERIES + ['domestic', 'barked all'])
+        self.wnsql.build_fts_index()
+        profiler = self.wnsql.enable_profiling()
+        results = self.wnsql.lookup_many(QUERIES + ['domestic', 'barked all'])
+        for query, synsets in expected.items():
+            self.assertEqual({s.ID for s in results[query]}, {s.ID for s in synsets})
+        self.assertEqual({s.ID for s in results['barked all']}, {'02084071-n'})
+        self.assertTrue(any('MATCH' in s['template'] for s in profiler.stats()))
+
+    def test_grouped_queries(self):
+        profiler = self.wnsql.enable_profiling()
+        self.wnsql.lookup_many(QUERIES)
+        calls = sum(s['calls'] for s in profiler.stats())
+        profiler.reset()
+        # the number of statements does not depend on the number of queries
+        more = ['{}-n'.format(i) for i in range(10000000, 10000030)] + ['dog{}%1:05:00::'.format(i) for i in range(30)]
+        self.wnsql.lookup_many(QUERIES + more + ['lemma{}'.format(i) for i in range(20)])
+        self.assertEqual(sum(s['calls'] for s in profiler.stats()), calls)
+
+    def test_lookup_inmemory(self):
+        wn = InMemoryWordnet.build(self.wnsql)
+        expected = self.wnsql.lookup_many(QUERIES, pos='n')
+        for query, synsets in wn.lookup_many(QUERIES, pos='n').items():
+            self.assertEqual([s.ID for s in synsets], [s.ID for s in expected[query]])
+
+    def test_bulk_helpers(self):
+        synsetids = ['02084071-n', 'dog', '99999999-n', 'n02121620']
+        results = list(bulk_get_synsets(self.wnsql, synsetids, chunk_size=2))
+        self.assertEqual([sid for sid, ss in results], synsetids)
+        self.assertEqual([ss.ID if ss else None for sid, ss in results], ['02084071-n', None, None, '02121620-n'])
+        # synsets which are not in the first Wordnet are looked up in the fallback Wordnet
+        fallback = InMemoryWordnet.build(self.wnsql)
+        wn = create_wnsql(os.path.join(self.tmpdir.name, 'nouns.db'))
+        with wn.ctx() as ctx:
+            for table in ('senses', 'samples', 'synsets'):
+                ctx.execute('DELETE FROM {} WHERE synsetid = 301584019'.format(table))
+        results = dict(bulk_get_synsets(wn, ['01584019-a', '02084071-n'], fallback=fallback))
+        self.assertEqual(results['01584019-a'].lemmas, ['dogged'])
+        results = list(bulk_search(wn, ['cat', 'dogged', 'wolf'], fallback=fallback, chunk_size=2, auto_wrap=False))
+        self.assertEqual([(q, [s.ID for s in synsets]) for q, synsets in results],
+                         [('cat', ['02121620-n']), ('dogged', ['01584019-a']), ('wolf', [])])
+        lines = list(to_ndjson({'query': q, 'synsets': synsets.to_json()} for q, synsets in bulk_search(self.wnsql, ['dog%'])))
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(len(json.loads(lines[0])['synsets']), 2)
+        self.assertEqual(parse_bulk_items(['dog']), ['dog'])
+        self.assertRaises(ValueError, lambda: parse_bulk_items({'queries': ['dog']}))
+        self.assertRaises(ValueError, lambda: parse_bulk_items(['dog', 1]))
+
+    def test_lookup_gwn(self):
+        db = GWordnetSQLite(':memory:')
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        with db.ctx() as ctx:
+            db.insert_synsets(xmlwn.synsets, ctx=ctx)
+            queries = ['00001740-r', 'A_CAPPELLA%4:02:00::', 'A Cappella', 'good', 'a_cappella', 'ca%']
+            results = db.lookup_many(queries, auto_wrap=False, ctx=ctx)
+            for query in queries:
+                expected = search_wn_full_text(db, query, auto_wrap=False, ctx=ctx)
+                self.assertEqual([s.ID for s in results[query]], [s.ID for s in expected])
+            self.assertEqual([s.ID for s in results['A Cappella']], ['00001740-r'])
+            # terms are not patterns, they are not wrapped
+            results = db.lookup_many(['A Cappella', 'a cappella', 'cappella'], ctx=ctx)
+            self.assertEqual([s.ID for s in results['A Cappella']], ['00001740-r'])
+            self.assertEqual([s.ID for s in results['a cappella']], ['00001740-r'])
+            self.assertEqual(len(results['cappella']), 0)
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,6 +45,8 @@ import unittest
 import logging
 from yawlib import POS, SynsetID, Synset, SynsetCollection
 from yawlib import WordnetException
+from yawlib.common import InvalidSynsetID
+from yawlib.models import synset_key
 from yawlib.glosswordnet import GlossedSynset, GlossGroup, GlossRaw
 
 ########################################################################
@@ -92,6 +94,39 @@ class TestSynsetIDWrapper(unittest.TestCase):
         # ?
         s = SynsetID.from_string('02315002-a')
 
+    def test_interned_synsetid(self):
+        s = SynsetID.from_string('12345678-n')
+        # repeated strings are parsed only once
+        self.assertIs(SynsetID.from_string('12345678-n'), s)
+        self.assertIs(SynsetID.from_string(s), s)
+        self.assertEqual(s.key, 112345678)
+        self.assertEqual(int(s), 112345678)
+        self.assertIs(SynsetID.from_key(112345678), s)
+        self.assertIs(SynsetID.from_string(112345678), s)
+        self.assertEqual(SynsetID.from_key(512345678).to_canonical(), '12345678-s')
+        self.assertRaises(InvalidSynsetID, lambda: SynsetID.from_key(12345678))
+        self.assertEqual(SynsetID.from_string(112345678).key, s.key)
+        self.assertEqual(hash(s), hash(SynsetID('12345678', 'n')))
+        self.assertEqual(hash(s), hash('12345678-n'))
+        # equality uses the same representation as hash
+        self.assertEqual(s, '12345678-n')
+        self.assertNotEqual(s, '112345678')
+        self.assertNotEqual(s, 112345678)
+        self.assertEqual(len({s, '12345678-n', SynsetID.from_key(112345678)}), 1)
+        # integer keys are validated like strings
+        self.assertEqual(synset_key(112345678), 112345678)
+        self.assertEqual(synset_key('n12345678'), 112345678)
+        self.assertRaises(InvalidSynsetID, lambda: synset_key(12345678))
+        self.assertRaises(InvalidSynsetID, lambda: synset_key(-112345678))
+        self.assertNotEqual(s, SynsetID.from_string('12345678-v'))
+        self.assertLess(s, SynsetID.from_string('12345678-v'))
+        self.assertLess(s, '12345679-n')
+        self.assertEqual(sorted(['12345679-n', '12345678-v', '12345678-n'], key=SynsetID.from_string), ['12345678-n', '12345679-n', '12345678-v'])
+        # SynsetID objects are immutable
+        with self.assertRaises(AttributeError):
+            s.pos = 'v'
+        self.assertEqual(SynsetID.from_string('foo', default=None), None)
+
     def test_pos(self):
         self.assertEqual(POS.num2pos(1), 'n')
         self.assertEqual(POS.num2pos("1"), 'n')
@@ -153,7 +188,8 @@ class TestSynsetIDWrapper(unittest.TestCase):
         ssid = ss.ID
         self.assertIs(ss.ID, ssid)
         self.assertEqual(ss.ID, s1)
-        self.assertIsNot(ss.ID, s1)  # must not be the same instance SynsetID
+        self.assertIs(ss.ID, s1)  # SynsetID objects are immutable and shared
+        self.assertIs(Synset('12345678-n').ID, s1)
 
 
 class testGSynset(unittest.TestCase):
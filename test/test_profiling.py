@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import tempfile
+import unittest
+
+from yawlib.profiling import QueryProfiler, QueryStats, normalize_query
+from yawlib.helpers import wn_stats
+
+from test.test_inmemory import create_wnsql
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestQueryProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wnsql = create_wnsql(os.path.join(self.tmpdir.name, 'wnsql.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('SELECT a FROM t\n  WHERE x IN (?,?, ?) AND y in (?)'),
+                         'SELECT a FROM t WHERE x IN (?, ...) AND y in (?, ...)')
+        self.assertEqual(normalize_query('INSERT INTO t VALUES (?, ?)'), 'INSERT INTO t VALUES (?, ?)')
+
+    def test_percentiles(self):
+        stats = QueryStats('SELECT 1')
+        for ms in range(1, 101):
+            stats.record(ms / 1000.0, 1)
+        info = stats.to_dict()
+        self.assertEqual((info['calls'], info['rows']), (100, 100))
+        self.assertAlmostEqual(info['p50'], 0.05)
+        self.assertAlmostEqual(info['p90'], 0.09)
+        self.assertAlmostEqual(info['p99'], 0.099)
+        self.assertAlmostEqual(info['max'], 0.1)
+
+    def test_profile_dao(self):
+        profiler = self.wnsql.enable_profiling()
+        self.assertIs(self.wnsql.profiler, profiler)
+        self.assertEqual(len(self.wnsql.search('dog%')), 2)
+        self.assertEqual(len(self.wnsql.search('cat')), 1)
+        stats = {s['template']: s for s in profiler.stats()}
+        definitions = stats['SELECT synsetid,definition FROM synsets WHERE synsetid IN (?, ...)']
+        self.assertEqual((definitions['calls'], definitions['rows']), (2, 3))
+        self.assertTrue(definitions['plan'])
+        self.assertTrue(any('SEARCH' in step for step in definitions['plan']))
+        self.assertIn('synsets WHERE synsetid IN (?, ...)', profiler.report(plans=True))
+        # nothing is recorded after profiling was disabled
+        self.wnsql.disable_profiling()
+        self.wnsql.search('cat')
+        self.assertEqual({s['template']: s['calls'] for s in profiler.stats()}[definitions['template']], 2)
+        profiler.reset()
+        self.assertEqual(profiler.stats(), [])
+
+    def test_profile_pool(self):
+        self.wnsql.enable_pool(1)
+        profiler = self.wnsql.enable_profiling(QueryProfiler(explain=False))
+        self.assertEqual(self.wnsql.get_by_key('cat%1:05:00::').ID, '02121620-n')
+        self.assertEqual(self.wnsql.get_synset('02084071-n').tagcount, 42)
+        stats = {s['template']: s for s in profiler.stats()}
+        keys = stats['select synsetid from senses where sensekey=? COLLATE NOCASE']
+        self.assertEqual((keys['calls'], keys['rows'], keys['plan']), (1, 1, None))
+        info = wn_stats(self.wnsql)
+        self.assertEqual(info['backend'], 'wnsql')
+        self.assertEqual(info['pool']['checkouts'], 2)
+        self.assertIsNone(info['cache'])
+        self.assertEqual(len(info['queries']), len(stats))
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import tempfile
+import unittest
+
+from yawlib import SynsetID
+from yawlib import SynsetNotFoundException
+from yawlib.relgraph import RelationGraph
+from yawlib.inmemory import InMemoryWordnet
+
+from test.test_inmemory import create_wnsql
+
+
+# -------------------------------------------------------------------------------
+# Test data
+# -------------------------------------------------------------------------------
+
+#          entity (1)
+#          /        \
+#   animal (2)    artifact (3)
+#     |     \         |
+#  dog (4)  pet (5)  toy (6)
+#     \     /
+#    puppy (7)      rock (8) (no link)
+EDGES = [('00000002-n', '00000001-n'), ('00000003-n', '00000001-n'),
+         ('00000004-n', '00000002-n'), ('00000005-n', '00000002-n'), ('00000006-n', '00000003-n'),
+         ('00000007-n', '00000004-n'), ('00000007-n', '00000005-n')]
+
+
+def sids(*offsets):
+    return [SynsetID.from_string('{:08d}-n'.format(offset)) for offset in offsets]
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestRelationGraph(unittest.TestCase):
+
+    graph = RelationGraph.from_edges(EDGES, nodes=['00000008-n'])
+
+    def test_links(self):
+        g = self.graph
+        self.assertEqual(len(g), 8)
+        self.assertIn('00000008-n', g)
+        self.assertNotIn('00000009-n', g)
+        self.assertEqual(g.hypernyms('00000007-n'), sids(4, 5))
+        self.assertEqual(g.hyponyms('00000002-n'), sids(4, 5))
+        self.assertEqual(g.roots(), sids(1, 8))
+        self.assertRaises(SynsetNotFoundException, lambda: g.depth('00000009-n'))
+
+    def test_closure(self):
+        g = self.graph
+        self.assertEqual(g.ancestors('00000007-n'), sids(4, 5, 2, 1))
+        self.assertEqual(g.ancestors('00000001-n'), [])
+        self.assertEqual(g.descendants('00000002-n'), sids(4, 5, 7))
+        self.assertEqual(g.depth('00000007-n'), 3)
+        self.assertEqual(g.depth('00000008-n'), 0)
+        self.assertEqual(g.path_to_root('00000007-n'), sids(7, 4, 2, 1))
+
+    def test_shortest_path_and_lcs(self):
+        g = self.graph
+        self.assertEqual(g.shortest_path_distance('00000007-n', '00000006-n'), 5)
+        self.assertEqual(g.shortest_path('00000007-n', '00000006-n'), sids(7, 4, 2, 1, 3, 6))
+        self.assertEqual(g.shortest_path('00000004-n', '00000005-n'), sids(4, 2, 5))
+        self.assertEqual(g.shortest_path('00000004-n', '00000004-n'), sids(4))
+        self.assertEqual(g.shortest_path('00000004-n', '00000007-n'), sids(4, 7))
+        self.assertIsNone(g.shortest_path('00000004-n', '00000008-n'))
+        self.assertEqual(g.lowest_common_hypernyms('00000004-n', '00000005-n'), sids(2))
+        self.assertEqual(g.lowest_common_hypernyms('00000007-n', '00000006-n'), sids(1))
+        self.assertEqual(g.lowest_common_hypernyms('00000007-n', '00000004-n'), sids(4))
+        self.assertEqual(g.lowest_common_hypernyms('00000007-n', '00000008-n'), [])
+
+    def test_dao_graph(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            wn = create_wnsql(os.path.join(tmpdir, 'wnsql.db'))
+            self.assertEqual(wn.depth('02084071-n'), 1)
+            self.assertEqual(wn.ancestors('02084071-n'), ['02083346-n'])
+            self.assertEqual([s.ID for s in wn.hypernyms('02084071-n')], ['02083346-n'])
+            self.assertEqual([s.ID for s in wn.hyponyms('02083346-n')], ['02084071-n'])
+            self.assertEqual(wn.lowest_common_hypernyms('02084071-n', '02083346-n'), ['02083346-n'])
+            # a synset without any hypernym link is still in the graph
+            self.assertEqual(wn.path_to_root('01584019-a'), ['01584019-a'])
+            mwn = InMemoryWordnet.build(wn)
+            self.assertEqual(mwn.shortest_path('02084071-n', '02083346-n'), wn.shortest_path('02084071-n', '02083346-n'))
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
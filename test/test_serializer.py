@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import json
+import unittest
+from unittest import mock
+
+from yawlib import Synset, SynsetCollection
+from yawlib import serializer
+from yawlib.glosswordnet import GWordnetXML
+
+from test.test_inmemory import MOCKUP_SYNSETS_DATA
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+class TestSerializer(unittest.TestCase):
+
+    def create_synset(self):
+        return Synset('02084071-n', keys=['dog%1:05:00::'], lemmas=['dog', 'domestic dog'],
+                      defs=['a member of the genus Canis'], exes=['the dog barked all night'], tagcount=42)
+
+    def test_synset_json(self):
+        ss = self.create_synset()
+        data = ss.to_json_bytes()
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(json.loads(data), ss.to_json())
+        self.assertEqual(json.loads(ss.to_json_str()), ss.to_json())
+        # to_json_str() is not affected by the fast path
+        self.assertEqual(ss.to_json_str(), json.dumps(ss.to_json()))
+        # modifications are always visible
+        ss.add_lemma('Canis familiaris')
+        self.assertEqual(json.loads(ss.to_json_bytes())['lemmas'], ['dog', 'domestic dog', 'Canis familiaris'])
+        ss.tagcount += 1
+        self.assertEqual(json.loads(ss.to_json_bytes())['tagcount'], 43)
+        ss.definition = 'a domesticated carnivorous mammal'
+        self.assertEqual(json.loads(ss.to_json_bytes())['definition'], 'a domesticated carnivorous mammal')
+        ss.lemma = 'Dog'
+        self.assertEqual(json.loads(ss.to_json_bytes())['lemmas'][0], 'Dog')
+        ss.examples[0] = 'the dog barked'
+        self.assertEqual(json.loads(ss.to_json_bytes())['examples'], ['the dog barked'])
+        ss.definitions[0] = 'changed'
+        self.assertEqual(json.loads(ss.to_json_bytes())['definition'], 'changed')
+
+    def test_multilingual(self):
+        ss = Synset('02084071-n', lemmas=['犬', 'イヌ'], defs=['イヌ科の哺乳類'], lang='jpn')
+        self.assertEqual(json.loads(ss.to_json_bytes()), ss.to_json())
+        self.assertIn('犬'.encode('utf-8'), ss.to_json_bytes())
+        # without orjson
+        with mock.patch.object(serializer, 'orjson', None):
+            ss2 = Synset('02084071-n', lemmas=['犬', 'イヌ'], defs=['イヌ科の哺乳類'], lang='jpn')
+            self.assertEqual(ss2.to_json_bytes(), serializer.dumps(ss.to_json()))
+            self.assertEqual(json.loads(ss2.to_json_bytes()), ss.to_json())
+
+    def test_collection(self):
+        xmlwn = GWordnetXML()
+        xmlwn.read(MOCKUP_SYNSETS_DATA)
+        synsets = SynsetCollection(list(xmlwn.synsets)[:10])
+        synsets.add(self.create_synset())
+        expected = [ss.to_json() for ss in synsets]
+        self.assertEqual(json.loads(synsets.to_json_bytes()), expected)
+        self.assertEqual(synsets.to_json_str(), json.dumps(expected))
+        chunks = list(synsets.iter_json(chunk_size=4))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks), synsets.to_json_bytes())
+        self.assertEqual(list(SynsetCollection().iter_json()), [b'[]'])
+        # definitions of glossed synsets come from their glosses
+        gss = list(xmlwn.synsets)[0]
+        gss.glosses = [g for g in gss.glosses if g.cat != 'def']
+        self.assertIsNone(json.loads(gss.to_json_bytes())['definition'])
+
+    def test_object_json(self):
+        ss = self.create_synset()
+        record = serializer.object_json((('synsetid', '02084071-n'), ('synset', ss.to_json_bytes()), ('missing', None)))
+        self.assertEqual(json.loads(record), {'synsetid': '02084071-n', 'synset': ss.to_json(), 'missing': None})
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
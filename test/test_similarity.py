@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Script for testing yawlib library
+Latest version can be found at https://github.com/letuananh/yawlib
+
+Adapted from: https://github.com/letuananh/lelesk
+
+@author: Le Tuan Anh <tuananh.ke@gmail.com>
+'''
+
+# Copyright (c) 2016, Le Tuan Anh <tuananh.ke@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+__author__ = "Le Tuan Anh <tuananh.ke@gmail.com>"
+__copyright__ = "Copyright 2014, yawlib"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Le Tuan Anh"
+__email__ = "<tuananh.ke@gmail.com>"
+__status__ = "Prototype"
+
+########################################################################
+
+import os
+import math
+import tempfile
+import unittest
+
+from yawlib.relgraph import RelationGraph
+from yawlib.similarity import Similarity, _NUMPY_AVAILABLE
+
+from test.test_inmemory import create_wnsql
+from test.test_relgraph import EDGES
+
+
+# -------------------------------------------------------------------------------
+# Test cases
+# -------------------------------------------------------------------------------
+
+GRAPH = RelationGraph.from_edges(EDGES, nodes=['00000008-n'])
+TAGCOUNTS = {'00000004-n': 5, '00000005-n': 1, '00000006-n': 2, '00000007-n': 1}
+SIDS = ['00000004-n', '00000005-n', '00000007-n', '00000006-n', '00000008-n', '00000009-n']
+
+
+class TestSimilarity(unittest.TestCase):
+
+    sim = Similarity(GRAPH, TAGCOUNTS, use_numpy=False)
+
+    def test_path(self):
+        matrix = self.sim.matrix('path', SIDS)
+        self.assertEqual(matrix[0], [1.0, 1 / 3, 1 / 2, 1 / 5, 0.0, 0.0])
+        self.assertEqual(matrix[4][4], 1.0)
+        # unknown synset
+        self.assertEqual(matrix[5], [0.0] * 6)
+        self.assertEqual(self.sim.similarity('path', '00000007-n', '00000006-n'), 1 / 6)
+
+    def test_wup_lch(self):
+        # dog & pet: lcs = animal (depth 2), distances 1 + 1
+        self.assertEqual(self.sim.similarity('wup', '00000004-n', '00000005-n'), 2 * 2 / (2 * 2 + 2))
+        self.assertEqual(self.sim.similarity('wup', '00000004-n', '00000004-n'), 1.0)
+        self.assertEqual(self.sim.similarity('wup', '00000004-n', '00000008-n'), 0.0)
+        # taxonomy depth (nouns) = 4 nodes
+        self.assertAlmostEqual(self.sim.similarity('lch', '00000004-n', '00000005-n'), -math.log(3 / 8))
+        self.assertEqual(self.sim.similarity('lch', '00000004-n', '00000008-n'), 0.0)
+
+    def test_information_content(self):
+        # 8 synsets + 9 tags (add-one smoothing)
+        total = 8 + 9
+        self.assertAlmostEqual(self.sim.information_content('00000001-n'), -math.log(16 / total))
+        self.assertAlmostEqual(self.sim.information_content('00000002-n'), -math.log(11 / total))
+        self.assertAlmostEqual(self.sim.information_content('00000004-n'), -math.log(8 / total))
+        self.assertAlmostEqual(self.sim.similarity('res', '00000007-n', '00000006-n'), self.sim.information_content('00000001-n'))
+        self.assertAlmostEqual(self.sim.similarity('res', '00000004-n', '00000005-n'), self.sim.information_content('00000002-n'))
+        ic_animal = self.sim.information_content('00000002-n')
+        expected = 2 * ic_animal / (self.sim.information_content('00000004-n') + self.sim.information_content('00000005-n'))
+        self.assertAlmostEqual(self.sim.similarity('lin', '00000004-n', '00000005-n'), expected)
+        self.assertRaises(ValueError, lambda: self.sim.matrix('foo', SIDS))
+
+    @unittest.skipIf(not _NUMPY_AVAILABLE, "NumPy is not available")
+    def test_numpy(self):
+        sim = Similarity(GRAPH, TAGCOUNTS, use_numpy=True)
+        for measure in ('path', 'wup', 'lch', 'res', 'lin'):
+            expected = self.sim.matrix(measure, SIDS)
+            actual = sim.matrix(measure, SIDS).tolist()
+            for row, expected_row in zip(actual, expected):
+                for value, expected_value in zip(row, expected_row):
+                    self.assertAlmostEqual(value, expected_value)
+
+    def test_dao_similarity(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            wn = create_wnsql(os.path.join(tmpdir, 'wnsql.db'))
+            matrix = wn.similarity_matrix('path', ['02084071-n', '02121620-n'], ['02083346-n'])
+            self.assertEqual([list(row) for row in matrix], [[0.5], [0.0]])
+            self.assertEqual(wn.get_tagcounts()[102084071], 42)
+
+
+########################################################################
+
+if __name__ == "__main__":
+    unittest.main()
@@ -43,11 +43,16 @@ __status__ = "Prototype"
 
 import os
 import logging
+import tempfile
 import unittest
 
 from yawlib.helpers import get_wn
+from yawlib import fulltext
+from yawlib.common import SQLITE_MAX_VARIABLES
 from texttaglib.chirptext.cli import setup_logging
 
+from test.test_inmemory import create_wnsql
+
 ########################################################################
 
 MY_DIR = os.path.dirname(__file__)
@@ -85,7 +90,7 @@ class TestWordnetSQL(unittest.TestCase):
         synsets = wn.search('love')
         self.assertEqual(len(synsets), 10)
         n07543288 = synsets.by_sid('07543288-n')
-        self.assertEqual(n07543288.ID, 107543288)
+        self.assertEqual(n07543288.ID.key, 107543288)
         self.assertEqual(n07543288.definition, 'a strong positive emotion of regard and affection')
         self.assertEqual(n07543288.tagcount, 42)
         # love, nouns only
@@ -123,6 +128,67 @@ class TestWordnetSQL(unittest.TestCase):
         self.assertEqual(1, len(hypehypos))
 
 
+class TestWordnetSQLFixture(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wnsql = create_wnsql(os.path.join(self.tmpdir.name, 'wnsql.db'))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_synsets_by_lemma(self):
+        synsets = self.wnsql.get_synsets_by_lemma('domestic dog')
+        self.assertEqual([ss.ID for ss in synsets], ['02084071-n'])
+        # only the sense of this lemma
+        ss = synsets['02084071-n']
+        self.assertEqual(ss.lemmas, ['domestic dog'])
+        self.assertEqual(ss.sensekeys, ['domestic_dog%1:05:00::'])
+        self.assertEqual(ss.tagcount, 0)
+        self.assertEqual(ss.definition, self.wnsql.get_synset('02084071-n').definition)
+        self.assertEqual(ss.examples, ['the dog barked all night'])
+        self.assertEqual(self.wnsql.get_synsets_by_lemma('dog')['02084071-n'].tagcount, 42)
+        self.assertEqual(len(self.wnsql.get_synsets_by_lemma('wolf')), 0)
+
+    def test_get_synsets(self):
+        sids = ['01584019-a', 'n02084071', 102121620, '02084071-n', '99999999-n', '02083346-n']
+        synsets = self.wnsql.get_synsets(sids)
+        # duplicated and unknown synset IDs are ignored, input order is preserved
+        self.assertEqual([s.ID for s in synsets], ['01584019-a', '02084071-n', '02121620-n', '02083346-n'])
+        for ss in synsets:
+            self.assertEqual(ss.to_json(), self.wnsql.get_synset(ss.ID).to_json())
+        self.assertIsNone(self.wnsql.get_synset('99999999-n'))
+        self.assertEqual(synsets['02084071-n'].lemmas, ['dog', 'domestic dog'])
+        self.assertEqual(synsets['02084071-n'].tagcount, 42)
+        self.assertEqual(synsets['02084071-n'].examples, ['the dog barked all night'])
+        self.assertEqual(len(self.wnsql.get_synsets([])), 0)
+        # more synset IDs than the variables of one IN (...) query
+        unknown = ['{:08d}-n'.format(offset) for offset in range(10000000, 10000000 + 2 * SQLITE_MAX_VARIABLES)]
+        synsets = self.wnsql.get_synsets(['02084071-n'] + unknown + ['01584019-a'])
+        self.assertEqual([s.ID for s in synsets], ['02084071-n', '01584019-a'])
+        self.assertEqual(synsets['01584019-a'].to_json(), self.wnsql.get_synset('01584019-a').to_json())
+
+    @unittest.skipIf(not fulltext.fts5_available(), "SQLite FTS5 is not available")
+    def test_fts_index_sync(self):
+        wn = self.wnsql
+        with wn.ctx() as ctx:
+            wn.build_fts_index(ctx=ctx)
+            self.assertTrue(fulltext.has_index(ctx, 'synsets', 'definition'))
+            # rows written after the index was built are searchable
+            ctx.execute("INSERT INTO synsets VALUES (102115096, 'n', 5, 'a wild carnivorous mammal of the dog family')")
+            self.assertEqual([s.ID for s in wn.search_def('%carnivorous%', ctx=ctx)], ['02115096-n'])
+            ctx.execute("UPDATE synsets SET definition='a wild canine' WHERE synsetid=102115096")
+            self.assertEqual(len(wn.search_def('%carnivorous%', ctx=ctx)), 0)
+            self.assertEqual([s.ID for s in wn.search_def('%wild canine%', ctx=ctx)], ['02115096-n'])
+            ctx.execute("DELETE FROM synsets WHERE synsetid=102115096")
+            self.assertEqual(len(wn.search_def('%wild canine%', ctx=ctx)), 0)
+            self.assertEqual(ctx.select("INSERT INTO fts_synsets_definition(fts_synsets_definition) VALUES ('integrity-check')"), [])
+            # triggers are dropped with the indexes
+            fulltext.drop_indexes(ctx, wn.FTS_INDEXES)
+            ctx.execute("INSERT INTO synsets VALUES (102115096, 'n', 5, 'a wild canine')")
+            self.assertEqual([s.ID for s in wn.search_def('%wild canine%', ctx=ctx)], ['02115096-n'])
+
+
 ########################################################################
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+asyncio facade for Wordnet DAOs
+
+Queries are run in worker threads on a bounded pool of long-lived read-only connections,
+so that slow searches do not block the event loop (e.g. in ASGI servers):
+
+    awn = AsyncWordnet(WordnetSQL(YLConfig.WNSQL30_PATH), pool_size=4)
+    ss = await awn.get_synset('01775164-v')
+    results = await awn.search_many(['love', 'dog'])
+    awn.close()
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from texttaglib.puchikarui import Schema
+
+from .common import SynsetNotFoundException
+from .pool import ConnectionPool, DEFAULT_POOL_SIZE
+
+
+class AsyncWordnet:
+    """ Async wrapper of WordnetSQL, OMWSQL, GWordnetSQLite (or InMemoryWordnet) """
+
+    def __init__(self, wn, pool_size=DEFAULT_POOL_SIZE, pool=None):
+        self.wn = wn
+        self._own_pool = False
+        if pool is not None:
+            self.pool = pool
+        elif getattr(wn, 'pool', None) is not None:
+            # share the pool of the DAO
+            self.pool = wn.pool
+        elif isinstance(wn, Schema):
+            self.pool = ConnectionPool(wn, size=pool_size)
+            self._own_pool = True
+        else:
+            self.pool = None  # no database (in-memory Wordnet)
+        # one thread per connection
+        self.executor = ThreadPoolExecutor(max_workers=self.pool.size if self.pool is not None else pool_size,
+                                           thread_name_prefix='yawlib')
+
+    def _call(self, method, args, kwargs):
+        func = getattr(self.wn, method)
+        if self.pool is None:
+            return func(*args, **kwargs)
+        with self.pool.acquire() as ctx:
+            if hasattr(self.wn, 'instrument'):
+                # record statements when profiling is enabled on the DAO (see yawlib.profiling)
+                self.wn.instrument(ctx)
+            return func(*args, ctx=ctx, **kwargs)
+
+    async def run(self, method, *args, **kwargs):
+        """ Call a DAO method (by name) in a worker thread with a pooled connection """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self._call, method, args, kwargs))
+
+    async def get_synset(self, synsetid, **kwargs):
+        return await self.run('get_synset', synsetid, **kwargs)
+
+    async def get_synsets(self, synsetids, **kwargs):
+        return await self.run('get_synsets', synsetids, **kwargs)
+
+    async def get_by_key(self, sensekey, **kwargs):
+        return await self.run('get_by_key', sensekey, **kwargs)
+
+    async def get_by_keys(self, sensekeys, **kwargs):
+        return await self.run('get_by_keys', sensekeys, **kwargs)
+
+    async def search(self, lemma, pos=None, **kwargs):
+        return await self.run('search', lemma, pos, **kwargs)
+
+    async def search_def(self, query, **kwargs):
+        return await self.run('search_def', query, **kwargs)
+
+    async def search_ex(self, query, **kwargs):
+        return await self.run('search_ex', query, **kwargs)
+
+    async def lookup_many(self, queries, **kwargs):
+        """ Look up synset IDs, sensekeys and lemma/text patterns with grouped queries (see yawlib.lookup) """
+        return await self.run('lookup_many', queries, **kwargs)
+
+    async def hypernyms(self, synsetid, **kwargs):
+        return await self.run('hypernyms', synsetid, **kwargs)
+
+    async def hyponyms(self, synsetid, **kwargs):
+        return await self.run('hyponyms', synsetid, **kwargs)
+
+    async def hypehypo(self, synsetid, **kwargs):
+        return await self.run('hypehypo', synsetid, **kwargs)
+
+    # ---------------------------------------------------------------------------
+    # Bulk variants
+    # ---------------------------------------------------------------------------
+
+    async def get_synset_many(self, synsetids, **kwargs):
+        """ Get synsets with a single batched get_synsets() call, results are in input order (None for unknown synsets) """
+        synsetids = list(synsetids)
+        synsets = await self.get_synsets(synsetids, **kwargs)
+        return [synsets.by_sid(sid) for sid in synsetids]
+
+    async def search_many(self, lemmas, pos=None, **kwargs):
+        """ Run several searches concurrently, returns a list of SynsetCollection in input order """
+        return await asyncio.gather(*(self.search(lemma, pos, **kwargs) for lemma in lemmas))
+
+    async def get_by_key_many(self, sensekeys, **kwargs):
+        """ Get synsets with a single batched get_by_keys() call, results are in input order
+
+        SynsetNotFoundException is raised for unknown sensekeys (the same as get_by_key()).
+        """
+        sensekeys = list(sensekeys)
+        synsets = await self.get_by_keys(sensekeys, **kwargs)
+        # sensekeys are matched case-insensitively
+        sk_map = {sk.lower(): ss for ss in synsets for sk in ss.sensekeys}
+        results = []
+        for sk in sensekeys:
+            if sk.lower() not in sk_map:
+                raise SynsetNotFoundException("Could not find any synset with provided key {}".format(sk))
+            results.append(sk_map[sk.lower()])
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self._own_pool:
+            self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
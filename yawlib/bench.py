@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark harness for Wordnet DAO hot paths
+
+A synthetic Wordnet of a realistic size is generated by cloning template synsets (Gloss WordNet XML, by default
+test/data/test.xml of a source checkout) with new offsets, lemmas and sensekeys, and written in all three SQLite
+formats (WordnetSQL, OMWSQL and GWordnetSQLite) together with a workload (sampled synset IDs, sensekeys, lemmas and
+definition words). The same data and workload are used for every backend and a fixed seed makes runs reproducible.
+
+    generate(templates, 'bench', size=20000)
+    results = run_benchmarks('bench', ops=200)
+    write_results(results, 'bench-results.json')
+
+Results are written as JSON (throughput and latency percentiles of each benchmark) so that runs can be compared
+over time (see compare_results() and `wntk bench --compare').
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import platform
+import tempfile
+
+from .__version__ import __version__
+from .models import SynsetID
+from .common import WordnetFeatureNotSupported
+from .profiling import percentile
+from .wordnetsql import WordnetSQL
+from .omwsql import OMWSQL
+from .glosswordnet import GWordnetXML, GWordnetSQLite
+
+
+# -----------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------
+
+# test/ is not installed with the package, the template has to be given (--template of `wntk bench') otherwise
+_SOURCE_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'data', 'test.xml')
+BENCH_TEMPLATE = _SOURCE_TEMPLATE if os.path.isfile(_SOURCE_TEMPLATE) else None
+# about the size of Princeton WordNet 3.0 is 117659 synsets
+DEFAULT_SIZE = 20000
+DEFAULT_OPS = 200
+DEFAULT_SEED = 42
+# children of each synset in the generated hypernym tree
+BRANCHING = 8
+# first offset of generated synsets
+FIRST_OFFSET = 1000000
+# number of sampled queries of each kind in the workload
+WORKLOAD_SIZE = 1000
+# synsets per operation of bulk benchmarks
+HYDRATION_SIZE = 100
+INSERT_SIZE = 10
+BULK_INSERT_SIZE = 100
+
+BACKENDS = ('wnsql', 'omw', 'gwn')
+BENCHMARKS = ('get_synset', 'get_by_key', 'search', 'search_def', 'get_synsets', 'insert_synsets', 'bulk_insert_synsets')
+DB_FILES = {'wnsql': 'wnsql.db', 'omw': 'omw.db', 'gwn': 'gwn.db'}
+WORKLOAD_FILE = 'workload.json'
+
+SYNTHETIC_WNSQL_SCRIPT = """
+CREATE TABLE words (wordid INTEGER PRIMARY KEY, lemma TEXT);
+CREATE TABLE synsets (synsetid INTEGER PRIMARY KEY, pos TEXT, lexdomainid INTEGER, definition TEXT);
+CREATE TABLE senses (wordid INTEGER, casedwordid INTEGER, synsetid INTEGER, senseid INTEGER PRIMARY KEY, sensenum INTEGER, lexid INTEGER, tagcount INTEGER, sensekey TEXT);
+CREATE TABLE samples (synsetid INTEGER, sampleid INTEGER, sample TEXT);
+CREATE TABLE semlinks (synset1id INTEGER, synset2id INTEGER, linkid INTEGER);
+CREATE VIEW wordsXsensesXsynsets AS SELECT wordid, lemma, casedwordid, synsetid, senseid, sensenum, lexid, tagcount, sensekey, pos, lexdomainid, definition FROM words JOIN senses USING (wordid) JOIN synsets USING (synsetid);
+CREATE VIEW wordsXsenses AS SELECT wordid, lemma, casedwordid, synsetid, senseid, sensenum, lexid, tagcount, sensekey FROM words JOIN senses USING (wordid);
+"""
+SYNTHETIC_WNSQL_INDEXES = """
+CREATE UNIQUE INDEX unq_words_lemma ON words (lemma);
+CREATE INDEX k_senses_synsetid ON senses (synsetid);
+CREATE INDEX k_senses_wordid ON senses (wordid);
+CREATE INDEX k_senses_sensekey ON senses (sensekey);
+CREATE INDEX k_samples_synsetid ON samples (synsetid);
+CREATE INDEX k_semlinks_synset1id ON semlinks (synset1id);
+"""
+SYNTHETIC_OMW_SCRIPT = """
+CREATE TABLE synset (synset TEXT PRIMARY KEY, pos TEXT, name TEXT, src TEXT);
+CREATE TABLE word (wordid INTEGER PRIMARY KEY, lang TEXT, lemma TEXT, pron TEXT, pos TEXT);
+CREATE TABLE sense (synset TEXT, wordid INTEGER, lang TEXT, rank TEXT, lexid INTEGER, freq INTEGER, src TEXT);
+CREATE TABLE synlink (synset1 TEXT, synset2 TEXT, link TEXT, src TEXT);
+CREATE TABLE synset_def (synset TEXT, lang TEXT, def TEXT, sid TEXT, usr TEXT);
+CREATE TABLE synset_ex (synset TEXT, lang TEXT, def TEXT, sid TEXT);
+"""
+SYNTHETIC_OMW_INDEXES = """
+CREATE INDEX word_lemma_idx ON word (lemma);
+CREATE INDEX sense_synset_idx ON sense (synset);
+CREATE INDEX sense_wordid_idx ON sense (wordid);
+CREATE INDEX synlink_synset1_idx ON synlink (synset1);
+CREATE INDEX synset_def_synset_idx ON synset_def (synset);
+CREATE INDEX synset_ex_synset_idx ON synset_ex (synset);
+"""
+
+_WORD = re.compile(r'[a-z]{5,}')
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+# -----------------------------------------------------------------------
+# Synthetic Wordnet
+# -----------------------------------------------------------------------
+
+class SyntheticWordnet:
+    """ Clones template synsets (e.g. GlossedSynset objects) to build a Wordnet of any size
+
+    The n-th copy of a template gets a new offset and the suffix n on its lemmas and sensekeys.
+    Generated synsets are the template objects themselves, modified in place: consume each synset
+    before asking for the next one.
+    """
+
+    def __init__(self, templates, size=DEFAULT_SIZE, seed=DEFAULT_SEED):
+        self.templates = [(ss, ss.ID.pos, list(ss.lemmas), list(ss.sensekeys)) for ss in templates]
+        if not self.templates:
+            raise ValueError("At least one template synset is required")
+        self.size = size
+        self.seed = seed
+
+    @staticmethod
+    def from_xml(path=BENCH_TEMPLATE, **kwargs):
+        if not path:
+            raise ValueError("A Gloss WordNet XML file with template synsets is required")
+        return SyntheticWordnet(GWordnetXML([path]).synsets, **kwargs)
+
+    def synsets(self, start=0, count=None, first_offset=FIRST_OFFSET):
+        """ Generate synsets number start to start + count (all synsets by default) """
+        end = self.size if count is None else start + count
+        for idx in range(start, end):
+            copy, pos = divmod(idx, len(self.templates))
+            synset, tpos, lemmas, keys = self.templates[pos]
+            suffix = str(copy) if copy else ''
+            synset.ID = SynsetID.from_string('{:08d}-{}'.format(first_offset + idx, tpos))
+            synset.lemmas = [lemma + suffix for lemma in lemmas]
+            synset.sensekeys[:] = [key.replace('%', suffix + '%', 1) for key in keys]
+            yield synset
+
+    def generate(self, directory, fts=False):
+        """ Write WordnetSQL, OMWSQL and GWordnetSQLite databases and the workload into a directory
+
+        Case-insensitive indexes are created as `wntk upgrade' does, and full-text indexes when fts is True
+        """
+        os.makedirs(directory, exist_ok=True)
+        for filename in list(DB_FILES.values()) + [WORKLOAD_FILE]:
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                os.unlink(path)
+        rng = random.Random(self.seed)
+        writer = _SQLWriter(os.path.join(directory, DB_FILES['wnsql']), os.path.join(directory, DB_FILES['omw']))
+        workload = {'ids': [], 'keys': [], 'lemmas': [], 'words': set()}
+        gwn = GWordnetSQLite(os.path.join(directory, DB_FILES['gwn']))
+        with gwn.ctx() as ctx:
+            gwn.bulk_insert_synsets(writer.feed(self.synsets(), rng, workload), ctx=ctx)
+        writer.close()
+        for backend in BACKENDS:
+            wn = open_backend(backend, directory)
+            wn.upgrade_schema()
+            if fts:
+                wn.build_fts_index()
+        sample = random.Random(self.seed)
+        info = {'size': self.size, 'seed': self.seed, 'templates': len(self.templates), 'fts': fts}
+        for kind in ('ids', 'keys', 'lemmas', 'words'):
+            values = sorted(workload[kind])
+            info[kind] = sample.sample(values, min(WORKLOAD_SIZE, len(values)))
+        with open(os.path.join(directory, WORKLOAD_FILE), 'w') as outfile:
+            json.dump(info, outfile)
+        return info
+
+
+class _SQLWriter:
+    """ Writes generated synsets into WordnetSQL and OMW databases (batched inserts) """
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, wnsql_path, omw_path):
+        self.wn = sqlite3.connect(wnsql_path)
+        self.wn.executescript(SYNTHETIC_WNSQL_SCRIPT)
+        self.omw = sqlite3.connect(omw_path)
+        self.omw.executescript(SYNTHETIC_OMW_SCRIPT)
+        self.queries = {
+            (self.wn, 'synsets'): 'INSERT INTO synsets VALUES (?,?,?,?)',
+            (self.wn, 'words'): 'INSERT INTO words VALUES (?,?)',
+            (self.wn, 'senses'): 'INSERT INTO senses VALUES (?,?,?,?,?,?,?,?)',
+            (self.wn, 'samples'): 'INSERT INTO samples VALUES (?,?,?)',
+            (self.wn, 'semlinks'): 'INSERT INTO semlinks VALUES (?,?,?)',
+            (self.omw, 'synset'): 'INSERT INTO synset VALUES (?,?,?,?)',
+            (self.omw, 'word'): 'INSERT INTO word VALUES (?,?,?,?,?)',
+            (self.omw, 'sense'): 'INSERT INTO sense VALUES (?,?,?,?,?,?,?)',
+            (self.omw, 'synlink'): 'INSERT INTO synlink VALUES (?,?,?,?)',
+            (self.omw, 'synset_def'): 'INSERT INTO synset_def VALUES (?,?,?,?,?)',
+            (self.omw, 'synset_ex'): 'INSERT INTO synset_ex VALUES (?,?,?,?)'}
+        self.rows = {key: [] for key in self.queries}
+        self.wordids = {}
+        self.omw_wordids = {}
+        self.senseid = 0
+        self.by_pos = {}
+
+    def add(self, conn, table, row):
+        rows = self.rows[(conn, table)]
+        rows.append(row)
+        if len(rows) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        for (conn, table), rows in self.rows.items():
+            if rows:
+                conn.executemany(self.queries[(conn, table)], rows)
+                rows.clear()
+
+    def feed(self, synsets, rng, workload):
+        """ Write synsets while they are passed on to another writer (the Gloss WordNet bulk loader) """
+        for synset in synsets:
+            self.write(synset, rng, workload)
+            yield synset
+
+    def write(self, synset, rng, workload):
+        sid, pos = synset.ID, synset.ID.pos
+        key, canonical = int(sid.to_wnsql()), sid.to_canonical()
+        definition, examples = synset.definition, synset.examples
+        self.add(self.wn, 'synsets', (key, pos, 0, definition))
+        self.add(self.omw, 'synset', (canonical, pos, synset.lemma, 'pwn'))
+        self.add(self.omw, 'synset_def', (canonical, 'eng', definition, '0', None))
+        for lemma, sensekey in zip(synset.lemmas, synset.sensekeys):
+            # Zipf-like tag counts: most senses are never tagged
+            tagcount = int(rng.paretovariate(1.2)) - 1
+            if lemma not in self.wordids:
+                self.wordids[lemma] = len(self.wordids) + 1
+                self.add(self.wn, 'words', (self.wordids[lemma], lemma))
+            self.senseid += 1
+            self.add(self.wn, 'senses', (self.wordids[lemma], None, key, self.senseid, 1, 0, tagcount, sensekey))
+            if (lemma, pos) not in self.omw_wordids:
+                self.omw_wordids[(lemma, pos)] = len(self.omw_wordids) + 1
+                self.add(self.omw, 'word', (self.omw_wordids[(lemma, pos)], 'eng', lemma, None, pos))
+            self.add(self.omw, 'sense', (canonical, self.omw_wordids[(lemma, pos)], 'eng', None, 0, tagcount, 'pwn'))
+            workload['keys'].append(sensekey)
+            workload['lemmas'].append(lemma)
+        for idx, example in enumerate(examples):
+            self.add(self.wn, 'samples', (key, idx + 1, example))
+            self.add(self.omw, 'synset_ex', (canonical, 'eng', example, str(idx)))
+        # hypernym tree of each POS
+        siblings = self.by_pos.setdefault(pos, [])
+        if siblings:
+            parent_key, parent = siblings[(len(siblings) - 1) // BRANCHING]
+            self.add(self.wn, 'semlinks', (key, parent_key, 1))
+            self.add(self.wn, 'semlinks', (parent_key, key, 2))
+            self.add(self.omw, 'synlink', (canonical, parent, 'hype', 'pwn'))
+            self.add(self.omw, 'synlink', (parent, canonical, 'hypo', 'pwn'))
+        siblings.append((key, canonical))
+        workload['ids'].append(canonical)
+        if definition:
+            workload['words'].update(_WORD.findall(definition.lower()))
+
+    def close(self):
+        self.flush()
+        self.wn.executescript(SYNTHETIC_WNSQL_INDEXES)
+        self.omw.executescript(SYNTHETIC_OMW_INDEXES)
+        for conn in (self.wn, self.omw):
+            conn.commit()
+            conn.close()
+
+
+def generate(templates, directory, size=DEFAULT_SIZE, seed=DEFAULT_SEED, fts=False):
+    """ Generate a synthetic Wordnet of size synsets from template synsets (see SyntheticWordnet) """
+    return SyntheticWordnet(templates, size=size, seed=seed).generate(directory, fts=fts)
+
+
+def read_workload(directory):
+    with open(os.path.join(directory, WORKLOAD_FILE)) as infile:
+        return json.load(infile)
+
+
+# -----------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------
+
+def summarize(backend, benchmark, latencies, items):
+    """ Throughput and latency (in milliseconds) of a benchmark """
+    total = sum(latencies)
+    samples = sorted(latencies)
+    result = {'backend': backend, 'benchmark': benchmark, 'ops': len(latencies), 'items': items,
+              'total': total, 'ops_per_sec': len(latencies) / total if total else 0.0,
+              'items_per_sec': items / total if total else 0.0,
+              'mean': total / len(latencies) * 1000 if latencies else 0.0,
+              'max': samples[-1] * 1000 if samples else 0.0}
+    for p in (50, 90, 99):
+        result['p{}'.format(p)] = percentile(samples, p) * 1000
+    return result
+
+
+def measure(operations, warmup=0):
+    """ Run operations (functions without arguments which return the number of items they produced)
+
+    Returns (latencies in seconds, total items)
+    """
+    for op in operations[:warmup]:
+        op()
+    latencies = []
+    items = 0
+    for op in operations:
+        started = time.perf_counter()
+        items += op()
+        latencies.append(time.perf_counter() - started)
+    return latencies, items
+
+
+def open_backend(backend, directory):
+    path = os.path.join(directory, DB_FILES[backend])
+    if backend == 'wnsql':
+        return WordnetSQL(path)
+    elif backend == 'omw':
+        return OMWSQL(path)
+    else:
+        return GWordnetSQLite(path)
+
+
+def _size(result):
+    return 0 if result is None else len(result) if hasattr(result, '__len__') else 1
+
+
+def _lookups(wn, benchmark, workload, ops, rng, ctx):
+    """ Operations of a lookup benchmark (one function per query) """
+    if benchmark == 'get_synset':
+        return [lambda q=q: _size(wn.get_synset(q, ctx=ctx)) for q in _pick(workload['ids'], ops, rng)]
+    elif benchmark == 'get_by_key':
+        return [lambda q=q: _size(wn.get_by_key(q, ctx=ctx)) for q in _pick(workload['keys'], ops, rng)]
+    elif benchmark == 'search':
+        return [lambda q=q: _size(wn.search(q, ctx=ctx)) for q in _pick(workload['lemmas'], ops, rng)]
+    elif benchmark == 'search_def':
+        return [lambda q=q: _size(wn.search_def('%{}%'.format(q), ctx=ctx)) for q in _pick(workload['words'], ops, rng)]
+    elif benchmark == 'get_synsets':
+        return [lambda q=q: _size(wn.get_synsets(q, ctx=ctx))
+                for q in (rng.sample(workload['ids'], min(HYDRATION_SIZE, len(workload['ids']))) for _ in range(ops))]
+    raise ValueError("Unknown benchmark {}".format(benchmark))
+
+
+def _pick(values, count, rng):
+    return [rng.choice(values) for _ in range(count)] if values else []
+
+
+def _inserts(benchmark, synthetic, ops, db_path):
+    """ Operations of insert benchmarks on an empty Gloss WordNet SQLite database """
+    gwn = GWordnetSQLite(db_path)
+    size = INSERT_SIZE if benchmark == 'insert_synsets' else BULK_INSERT_SIZE
+    operations = []
+    for idx in range(ops):
+        def op(start=idx * size):
+            synsets = synthetic.synsets(start=start, count=size)
+            if benchmark == 'insert_synsets':
+                gwn.insert_synsets(synsets)
+            else:
+                gwn.bulk_insert_synsets(synsets, create_indexes=False)
+            return size
+        operations.append(op)
+    return operations
+
+
+def run_benchmarks(directory, backends=BACKENDS, benchmarks=BENCHMARKS, ops=DEFAULT_OPS, seed=DEFAULT_SEED,
+                   template=BENCH_TEMPLATE, warmup=10):
+    """ Run benchmarks on the synthetic Wordnet in directory, returns a JSON-serializable dict """
+    workload = read_workload(directory)
+    results = []
+    for backend in backends:
+        wn = open_backend(backend, directory)
+        with wn.ctx() as ctx:
+            for benchmark in benchmarks:
+                if benchmark in ('insert_synsets', 'bulk_insert_synsets'):
+                    continue
+                getLogger().info("Running {} on {}".format(benchmark, backend))
+                operations = _lookups(wn, benchmark, workload, ops, random.Random(seed), ctx)
+                try:
+                    results.append(summarize(backend, benchmark, *measure(operations, warmup=warmup)))
+                except WordnetFeatureNotSupported:
+                    # e.g. there is no sensekey in OMW
+                    getLogger().info("{} is not supported by {}".format(benchmark, backend))
+    # inserts are only supported by Gloss WordNet SQLite
+    if 'gwn' in backends and template:
+        synthetic = SyntheticWordnet.from_xml(template, seed=seed)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for benchmark in benchmarks:
+                if benchmark in ('insert_synsets', 'bulk_insert_synsets'):
+                    getLogger().info("Running {} on gwn".format(benchmark))
+                    operations = _inserts(benchmark, synthetic, ops, os.path.join(tmpdir, benchmark + '.db'))
+                    results.append(summarize('gwn', benchmark, *measure(operations)))
+    return {'meta': run_info(workload, ops, seed), 'results': results}
+
+
+def run_info(workload, ops, seed):
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'yawlib': __version__,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'synsets': workload['size'],
+            'fts': workload.get('fts', False),
+            'ops': ops,
+            'seed': seed}
+
+
+def write_results(results, path=None):
+    """ Write benchmark results as JSON into a file (or stdout) """
+    if path:
+        with open(path, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+def read_results(path):
+    with open(path) as infile:
+        return json.load(infile)
+
+
+def compare_results(old, new):
+    """ Ratio of throughput and p50/p99 latency (new / old) of benchmarks which are in both results """
+    previous = {(r['backend'], r['benchmark']): r for r in old['results']}
+    rows = []
+    for r in new['results']:
+        o = previous.get((r['backend'], r['benchmark']))
+        if o is None:
+            continue
+        rows.append({'backend': r['backend'], 'benchmark': r['benchmark'],
+                     'ops_per_sec': r['ops_per_sec'] / o['ops_per_sec'] if o['ops_per_sec'] else None,
+                     'p50': r['p50'] / o['p50'] if o['p50'] else None,
+                     'p99': r['p99'] / o['p99'] if o['p99'] else None})
+    return rows
+
+
+def report(results):
+    """ Benchmark results as a text table """
+    lines = ['{:<6} {:<20} {:>6} {:>10} {:>12} {:>9} {:>9} {:>9}'.format(
+        'db', 'benchmark', 'ops', 'ops/s', 'items/s', 'p50 ms', 'p90 ms', 'p99 ms')]
+    for r in results['results']:
+        lines.append('{:<6} {:<20} {:>6} {:>10.1f} {:>12.1f} {:>9.3f} {:>9.3f} {:>9.3f}'.format(
+            r['backend'], r['benchmark'], r['ops'], r['ops_per_sec'], r['items_per_sec'], r['p50'], r['p90'], r['p99']))
+    return '\n'.join(lines)
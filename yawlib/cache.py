@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bounded synset cache (LRU eviction with optional time-to-live) which can be shared by all Wordnet DAOs
+
+Cache keys start with the backend name and language, e.g. ('wnsql', 'eng', 112345678) for a synset
+or ('wnsql', 'eng', 'sk2sid', 'dog%1:05:00::') for a sensekey lookup,
+so that a single cache object can be given to several DAOs.
+DAOs put copies of synsets into the cache and return copies of cached synsets (see Synset.copy()),
+so callers may modify the synsets they get without affecting other callers.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import time
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_SIZE = 10000
+_MISSING = object()
+
+
+class SynsetCache:
+    """ Thread-safe LRU cache with a size bound, optional TTL (in seconds) and hit/miss counters """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=None, timer=time.monotonic):
+        if maxsize is None or maxsize <= 0:
+            raise ValueError("Cache size must be a positive number")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.__data = OrderedDict()  # key > (expiry time, value)
+        self.__lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self.__lock:
+            entry = self.__data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] is not None and entry[0] <= self.timer():
+                del self.__data[key]
+                self.expirations += 1
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        expiry = self.timer() + self.ttl if self.ttl else None
+        with self.__lock:
+            self.__data[key] = (expiry, value)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def get_or_load(self, key, loader):
+        """ Get a cached value or call loader() and cache its result (None results are not cached) """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+
+    def stats(self):
+        with self.__lock:
+            total = self.hits + self.misses
+            return {'size': len(self.__data), 'maxsize': self.maxsize, 'ttl': self.ttl,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_ratio': self.hits / total if total else 0.0,
+                    'evictions': self.evictions, 'expirations': self.expirations}
+
+    def __contains__(self, key):
+        with self.__lock:
+            entry = self.__data.get(key, _MISSING)
+            return entry is not _MISSING and (entry[0] is None or entry[0] > self.timer())
+
+    def __len__(self):
+        return len(self.__data)
+
+
+def cached(cache, key, loader):
+    """ Use cache (if it is not None) to get a value, otherwise just call loader() """
+    return loader() if cache is None else cache.get_or_load(key, loader)
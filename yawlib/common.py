@@ -9,6 +9,8 @@ Shared Wordnet features
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
+import re
+
 
 class WordnetException(Exception):
     """ Base class for Wordnet exception """
@@ -29,3 +31,62 @@ class InvalidSynsetID(WordnetException):
 
     def __init__(self, synsetid):
         self.message = "`{}' is not a valid synset ID".format(synsetid)
+
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER (for versions prior to 3.32.0)
+SQLITE_MAX_VARIABLES = 999
+
+# type code of all integer arrays (see array module), 64 bits on every platform
+# so that arrays of relgraph, gwncolumns and inmemory snapshots are interchangeable
+INT_TYPE = 'q'
+
+
+def chunks(items, size=SQLITE_MAX_VARIABLES):
+    """ Split a list into smaller lists so that each of them can be bound to a single SQLite query """
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def nocase_index_name(table, column):
+    return '{}_{}_nocase'.format(table, column)
+
+
+def create_nocase_indexes(ctx, indexes):
+    """ Create case-insensitive (COLLATE NOCASE) indexes for a list of (table, column) pairs
+
+    These indexes are used by `column = ? COLLATE NOCASE' and by `column LIKE ?' when the pattern does not start with a wildcard
+    """
+    for table, column in indexes:
+        ctx.execute('CREATE INDEX IF NOT EXISTS {idx} ON {t} ({c} COLLATE NOCASE)'.format(idx=nocase_index_name(table, column), t=table, c=column))
+
+
+def in_clause(column, values):
+    """ Build a `column IN (?, ?, ...)' condition for a list of values """
+    return '{} IN ({})'.format(column, ','.join('?' * len(values)))
+
+
+def like_to_regex(pattern):
+    """ Convert a LIKE pattern (% and _ wildcards) into a compiled regular expression (use fullmatch) """
+    parts = []
+    for c in pattern:
+        if c == '%':
+            parts.append('.*')
+        elif c == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(c))
+    return re.compile(''.join(parts), re.DOTALL)
+
+
+def is_like_pattern(text):
+    """ Check if a string contains LIKE wildcards (% or _) """
+    return '%' in text or '_' in text
+
+
+def like_prefix(pattern):
+    """ Literal prefix of a LIKE pattern (everything before the first wildcard) """
+    for idx, c in enumerate(pattern):
+        if c in '%_':
+            return pattern[:idx]
+    return pattern
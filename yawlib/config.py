@@ -69,6 +69,13 @@ def get_file(file_key):
     return _config.get(file_key).format(YAWLIB_HOME=home_dir())
 
 
+def get_optional_file(file_key):
+    """ Get a file path which may be left empty (or missing) in config, returns None in that case """
+    _config = read_config()
+    value = _config.get(file_key)
+    return value.format(YAWLIB_HOME=home_dir()) if value else None
+
+
 class YLConfig:
     # WordNet SQLite can be downloaded from:
     #       http://sourceforge.net/projects/wnsql/files/wnsql3/sqlite/3.0/
@@ -78,4 +85,13 @@ class YLConfig:
     GWN30_PATH = get_file('GWN30_PATH')
     GWN30_DB = get_file('GWN30_DB')
     OMW_DB = get_file('OMW_DB')
+    # Optional in-memory snapshots (see yawlib.inmemory, created with `wntk snapshot').
+    # When they are set, YAWOL servers use the snapshots (memory-mapped and shared by all workers) instead of SQLite
+    WN_SNAPSHOT = get_optional_file('WN_SNAPSHOT')
+    OMW_SNAPSHOT = get_optional_file('OMW_SNAPSHOT')
+    # record SQL statement statistics in YAWOL servers (see yawlib.profiling and /yawol/stats)
+    PROFILE_QUERIES = bool(read_config().get('PROFILE_QUERIES', False))
+    # HTTP caching in YAWOL servers: Cache-Control max-age (in seconds) and the number of cached responses (see yawlib.yawol.httpcache)
+    HTTP_MAX_AGE = int(read_config().get('HTTP_MAX_AGE', 86400))
+    RESPONSE_CACHE_SIZE = int(read_config().get('RESPONSE_CACHE_SIZE', 4096))
     NTUMC_PRONOUNS = read_config().get('NTUMC_PRONOUNS')
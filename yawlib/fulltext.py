@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Optional full-text search indexes (SQLite FTS5) for lemmas, definitions and examples
+
+Each index is an external-content FTS5 table named fts_<table>_<column> using the trigram tokenizer,
+so that the same LIKE patterns used by the DAOs can be answered by the index instead of a full table scan.
+Indexes are kept up to date by AFTER INSERT/UPDATE/DELETE triggers on the indexed tables.
+When an index is missing (or the SQLite library does not support FTS5 trigram) the DAOs fall back to plain LIKE.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import sqlite3
+import logging
+from collections import namedtuple
+
+from .common import WordnetFeatureNotSupported
+
+
+# trigram tokenizer is available from SQLite 3.34.0
+FTS_MIN_SQLITE_VERSION = (3, 34, 0)
+# FTS5 trigram cannot match substrings shorter than 3 characters
+MIN_SEGMENT_LENGTH = 3
+# triggers which keep an external-content index in sync with its table (see SQLite FTS5 documentation)
+TRIGGERS = {
+    'ai': "CREATE TRIGGER {n}_ai AFTER INSERT ON {t} BEGIN INSERT INTO {n}(rowid, {c}) VALUES (new.rowid, new.{c}); END",
+    'ad': "CREATE TRIGGER {n}_ad AFTER DELETE ON {t} BEGIN INSERT INTO {n}({n}, rowid, {c}) VALUES ('delete', old.rowid, old.{c}); END",
+    'au': "CREATE TRIGGER {n}_au AFTER UPDATE ON {t} BEGIN INSERT INTO {n}({n}, rowid, {c}) VALUES ('delete', old.rowid, old.{c}); "
+          "INSERT INTO {n}(rowid, {c}) VALUES (new.rowid, new.{c}); END"
+}
+__fts5_support = None
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def fts5_available():
+    """ Check if the linked SQLite library supports FTS5 with trigram tokenizer """
+    global __fts5_support
+    if __fts5_support is None:
+        __fts5_support = False
+        if sqlite3.sqlite_version_info >= FTS_MIN_SQLITE_VERSION:
+            try:
+                conn = sqlite3.connect(':memory:')
+                conn.execute("CREATE VIRTUAL TABLE fts_probe USING fts5(x, tokenize='trigram')")
+                conn.close()
+                __fts5_support = True
+            except sqlite3.Error:
+                getLogger().warning("SQLite FTS5 is not available. Full-text search indexes will not be used.")
+    return __fts5_support
+
+
+def index_name(table, column):
+    return 'fts_{}_{}'.format(table, column)
+
+
+def has_index(ctx, table, column):
+    """ Check if a full-text index for table.column exists and can be used """
+    if not fts5_available():
+        return False
+    row = ctx.select_single("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (index_name(table, column),))
+    return row is not None
+
+
+def build_index(ctx, table, column):
+    """ (Re)build a full-text index for table.column """
+    if not fts5_available():
+        raise WordnetFeatureNotSupported("SQLite FTS5 with trigram tokenizer is required for building full-text indexes")
+    name = index_name(table, column)
+    getLogger().info("Building full-text index {} on {}.{}".format(name, table, column))
+    drop_index(ctx, table, column)
+    ctx.execute("CREATE VIRTUAL TABLE {n} USING fts5({c}, content='{t}', content_rowid='rowid', tokenize='trigram')".format(n=name, c=column, t=table))
+    ctx.execute("INSERT INTO {n}({n}) VALUES ('rebuild')".format(n=name))
+    for trigger in TRIGGERS.values():
+        ctx.execute(trigger.format(n=name, c=column, t=table))
+
+
+def drop_index(ctx, table, column):
+    """ Drop a full-text index for table.column and its triggers """
+    name = index_name(table, column)
+    for suffix in TRIGGERS:
+        ctx.execute('DROP TRIGGER IF EXISTS {}_{}'.format(name, suffix))
+    ctx.execute('DROP TABLE IF EXISTS {}'.format(name))
+
+
+def build_indexes(ctx, indexes):
+    for table, column in indexes:
+        build_index(ctx, table, column)
+
+
+def drop_indexes(ctx, indexes):
+    for table, column in indexes:
+        drop_index(ctx, table, column)
+
+
+def to_match_query(pattern, escape=None):
+    """ Convert a LIKE pattern into an FTS5 MATCH query
+
+    Literal segments (between % and _ wildcards) which are long enough to be looked up in a trigram index
+    are joined as phrases. None is returned when the pattern has no usable segment.
+    """
+    segments = []
+    current = []
+    chars = iter(pattern)
+    for c in chars:
+        if escape and c == escape:
+            current.append(next(chars, ''))
+        elif c in '%_':
+            segments.append(''.join(current))
+            current = []
+        else:
+            current.append(c)
+    segments.append(''.join(current))
+    phrases = ['"{}"'.format(s.replace('"', '""')) for s in segments if len(s) >= MIN_SEGMENT_LENGTH]
+    return ' AND '.join(phrases) if phrases else None
+
+
+def _like(column, escape):
+    return "{} LIKE ? ESCAPE '{}'".format(column, escape) if escape else '{} LIKE ?'.format(column)
+
+
+def rowid_filter(ctx, table, column, pattern, escape=None):
+    """ Build a `table.rowid IN (...)' condition which uses the full-text index for table.column
+
+    Returns a tuple (condition, params) or None if the index cannot be used for this pattern
+    """
+    if to_match_query(pattern, escape=escape) is None or not has_index(ctx, table, column):
+        return None
+    return index_filter(table, column, pattern, escape=escape)
+
+
+def index_filter(table, column, pattern, escape=None):
+    """ Same as rowid_filter() for callers which have checked that the index exists (see has_index()) """
+    match_query = to_match_query(pattern, escape=escape)
+    if match_query is None:
+        return None
+    name = index_name(table, column)
+    condition = '{t}.rowid IN (SELECT rowid FROM {n} WHERE {n} MATCH ? AND {like})'.format(t=table, n=name, like=_like(column, escape))
+    return condition, [match_query, pattern]
+
+
+def search(ctx, table, column, pattern, columns, where=None, values=None, escape=None, limit=None):
+    """ Search table.column with a LIKE pattern using its full-text index. Results are ordered by relevance (bm25).
+
+    Returns a list of rows (namedtuples of columns) or None if the index cannot be used for this pattern
+    """
+    match_query = to_match_query(pattern, escape=escape)
+    if match_query is None or not has_index(ctx, table, column):
+        return None
+    name = index_name(table, column)
+    query = ['SELECT {cols} FROM {t} JOIN {n} ON {n}.rowid = {t}.rowid WHERE {n} MATCH ? AND {n}.{like}'.format(
+        cols=', '.join('{}.{}'.format(table, c) for c in columns), t=table, n=name, like=_like(column, escape))]
+    params = [match_query, pattern]
+    if where:
+        query.append('AND ({})'.format(where))
+        params.extend(values)
+    query.append('ORDER BY {}.rank'.format(name))
+    if limit:
+        query.append('LIMIT {:d}'.format(limit))
+    row_type = namedtuple(table, columns)
+    return [row_type(*row) for row in ctx.select(' '.join(query), params)]
@@ -22,6 +22,7 @@ from glosswordnet import SQLiteGWordNet
 from .gwnmodels import GlossedSynset, GlossRaw, Gloss, GlossItem, GlossGroup, SenseTag
 from .gwnxml import GWordnetXML
 from .gwnsqlite import GWordnetSQLite
+from .gwncolumns import GlossColumnStore
 
-__all__ = ['GlossedSynset', 'GWordnetXML', 'GWordnetSQLite',
+__all__ = ['GlossedSynset', 'GWordnetXML', 'GWordnetSQLite', 'GlossColumnStore',
            'GlossRaw', 'Gloss', 'GlossItem', 'GlossGroup', 'SenseTag']
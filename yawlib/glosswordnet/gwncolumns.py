@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gloss WordNet column store - Gloss items and sense tags stored as parallel integer columns
+
+Useful for corpus-wide passes (sense tag statistics, grammatical words, etc.) which would otherwise
+have to walk millions of GlossItem and SenseTag objects. GlossedSynset objects are only created on request.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+from yawlib.models import SynsetCollection, synset_key
+from yawlib.common import SynsetNotFoundException, INT_TYPE
+
+from .gwnmodels import GlossedSynset
+from .gwnxml import GWordnetXML
+
+
+def _int_id(value):
+    # objects which are not loaded from a database have string or placeholder IDs
+    return value if isinstance(value, int) else -1
+
+
+class StringPool:
+    """ Map strings to integer IDs. ID 0 is always the empty string (None is stored as '') """
+
+    def __init__(self):
+        self.strings = ['']
+        self.ids = {'': 0}
+
+    def add(self, value):
+        if not value:
+            return 0
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def get_id(self, value):
+        """ Get ID of a string or -1 if it is not in the pool (so that filtering by it matches nothing) """
+        return self.ids.get(value if value else '', -1)
+
+    def __getitem__(self, sid):
+        return self.strings[sid]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class ColumnTable:
+    """ A set of parallel integer columns """
+
+    def __init__(self, columns):
+        self.columns = {name: array(INT_TYPE) for name in columns}
+
+    def append(self, *values):
+        for col, value in zip(self.columns.values(), values):
+            col.append(value)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+
+# -------------------------------------------------------------------------------
+# Column store
+# -------------------------------------------------------------------------------
+
+class GlossColumnStore:
+    """ Gloss WordNet data (synsets, glosses, gloss items and sense tags) in columnar format
+
+    Every string value is replaced by an ID from a shared StringPool (see lookup() and value()).
+    Glosses of a synset, items and tags of a gloss are stored contiguously and located with offset columns
+    (e.g. items of gloss g are rows item_ptr[g] to item_ptr[g + 1] of the items table).
+    """
+
+    ITEM_COLUMNS = ('id', 'gloss', 'ord', 'tag', 'lemma', 'pos', 'cat', 'coll', 'rdf', 'sep', 'text', 'origid')
+    TAG_COLUMNS = ('id', 'gloss', 'item', 'cat', 'tag', 'glob', 'glemma', 'glob_id', 'coll', 'origid', 'sid', 'sk', 'lemma')
+    GLOSS_COLUMNS = ('id', 'synset', 'origid', 'cat')
+
+    def __init__(self):
+        self.pool = StringPool()
+        self.sids = []        # synset IDs (x12345678) by synset index
+        self.sid_map = {}     # synset key > synset index
+        self.terms = array(INT_TYPE)
+        self.sensekeys = array(INT_TYPE)
+        self.raw_cats = array(INT_TYPE)
+        self.raw_glosses = []
+        self.surfaces = []    # gloss surfaces by gloss index
+        self.glosses = ColumnTable(self.GLOSS_COLUMNS)
+        self.items = ColumnTable(self.ITEM_COLUMNS)
+        self.tags = ColumnTable(self.TAG_COLUMNS)
+        # offsets
+        self.term_ptr = array(INT_TYPE, [0])
+        self.sensekey_ptr = array(INT_TYPE, [0])
+        self.raw_ptr = array(INT_TYPE, [0])
+        self.gloss_ptr = array(INT_TYPE, [0])
+        self.item_ptr = array(INT_TYPE, [0])
+        self.tag_ptr = array(INT_TYPE, [0])
+
+    # ---------------------------------------------------------------------------
+    # Building
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def from_synsets(synsets):
+        """ Build a column store from GlossedSynset objects (e.g. GWordnetXML.synsets) """
+        store = GlossColumnStore()
+        for synset in synsets:
+            store.add_synset(synset)
+        return store
+
+    @staticmethod
+    def from_xml(files, memory_save=False):
+        """ Build a column store from Gloss WordNet XML files without keeping the parsed synsets """
+        return GlossColumnStore.from_synsets(GWordnetXML(memory_save=memory_save).iterfiles(files))
+
+    @staticmethod
+    def from_sqlite(gwn, ctx=None):
+        """ Build a column store from a Gloss WordNet SQLite database (see GWordnetSQLite) """
+        store = GlossColumnStore()
+        if ctx is None:
+            with gwn.ctx() as ctx:
+                store._load_sqlite(ctx)
+        else:
+            store._load_sqlite(ctx)
+        return store
+
+    def _new_synset(self, sid):
+        self.sid_map[synset_key(sid)] = len(self.sids)
+        self.sids.append(sid)
+
+    def _end_synset(self):
+        self.term_ptr.append(len(self.terms))
+        self.sensekey_ptr.append(len(self.sensekeys))
+        self.raw_ptr.append(len(self.raw_glosses))
+        self.gloss_ptr.append(len(self.glosses))
+
+    def _end_gloss(self):
+        self.item_ptr.append(len(self.items))
+        self.tag_ptr.append(len(self.tags))
+
+    def add_synset(self, synset):
+        """ Append a GlossedSynset to this store """
+        add = self.pool.add
+        self._new_synset(synset.ID.to_gwnsql())
+        synset_idx = len(self.sids) - 1
+        self.terms.extend(add(t) for t in synset.lemmas)
+        self.sensekeys.extend(add(sk) for sk in synset.sensekeys)
+        for raw in synset.raw_glosses:
+            self.raw_cats.append(add(raw.cat))
+            self.raw_glosses.append(raw.gloss)
+        for gloss in synset.glosses:
+            gloss_idx = len(self.glosses)
+            self.glosses.append(_int_id(gloss.gid), synset_idx, add(gloss.origid), add(gloss.cat))
+            self.surfaces.append(gloss.surface)
+            item_idx = {}
+            for item in gloss.items:
+                item_idx[id(item)] = len(self.items)
+                self.items.append(_int_id(item.itemid), gloss_idx, item.order, add(item.tag), add(item.lemma), add(item.pos), add(item.cat),
+                                  add(item.coll), add(item.rdf), add(item.sep), add(item.text), add(item.origid))
+            for tag in gloss.tags:
+                self.tags.append(_int_id(tag.tagid), gloss_idx, item_idx[id(tag.item)], add(tag.cat), add(tag.tag), add(tag.glob),
+                                 add(tag.glemma), add(tag.glob_id), add(tag.coll), add(tag.origid), add(tag.sid),
+                                 add(tag.sk), add(tag.lemma))
+            self._end_gloss()
+        self._end_synset()
+
+    def _load_sqlite(self, ctx):
+        add = self.pool.add
+        # all child rows are read in synset order (one cursor per table) so that they can be appended to the columns directly
+        conn = ctx.conn
+        terms = conn.execute('SELECT s.id, t.term FROM term t JOIN synset s ON s.id = t.sid ORDER BY s.rowid, t.rowid')
+        keys = conn.execute('SELECT s.id, k.sensekey FROM sensekey k JOIN synset s ON s.id = k.sid ORDER BY s.rowid, k.rowid')
+        raws = conn.execute('SELECT s.id, r.cat, r.gloss FROM gloss_raw r JOIN synset s ON s.id = r.sid ORDER BY s.rowid, r.rowid')
+        glosses = conn.execute('SELECT s.id, g.id, g.origid, g.cat, g.surface FROM gloss g JOIN synset s ON s.id = g.sid ORDER BY s.rowid, g.id')
+        items = conn.execute('''SELECT i.gid, i.id, i.ord, i.tag, i.lemma, i.pos, i.cat, i.coll, i.rdf, i.sep, i.text, i.origid
+                               FROM glossitem i JOIN gloss g ON g.id = i.gid JOIN synset s ON s.id = g.sid ORDER BY s.rowid, g.id, i.id''')
+        tags = conn.execute('''SELECT t.gid, t.id, t.itemid, t.cat, t.tag, t.glob, t.glob_lemma, t.glob_id, t.coll, t.origid, t.sid, t.sk, t.lemma
+                              FROM sensetag t JOIN gloss g ON g.id = t.gid JOIN synset s ON s.id = g.sid ORDER BY s.rowid, g.id, t.id''')
+        next_term, next_key, next_raw, next_gloss = next(terms, None), next(keys, None), next(raws, None), next(glosses, None)
+        next_item, next_tag = next(items, None), next(tags, None)
+        for (sid,) in conn.execute('SELECT id FROM synset ORDER BY rowid'):
+            self._new_synset(sid)
+            synset_idx = len(self.sids) - 1
+            while next_term is not None and next_term[0] == sid:
+                self.terms.append(add(next_term[1]))
+                next_term = next(terms, None)
+            while next_key is not None and next_key[0] == sid:
+                self.sensekeys.append(add(next_key[1]))
+                next_key = next(keys, None)
+            while next_raw is not None and next_raw[0] == sid:
+                self.raw_cats.append(add(next_raw[1]))
+                self.raw_glosses.append(next_raw[2])
+                next_raw = next(raws, None)
+            while next_gloss is not None and next_gloss[0] == sid:
+                _, gid, origid, cat, surface = next_gloss
+                gloss_idx = len(self.glosses)
+                self.glosses.append(gid, synset_idx, add(origid), add(cat))
+                self.surfaces.append(surface)
+                item_idx = {}
+                while next_item is not None and next_item[0] == gid:
+                    item_idx[next_item[1]] = len(self.items)
+                    self.items.append(next_item[1], gloss_idx, *(v if i == 0 else add(v) for i, v in enumerate(next_item[2:])))
+                    next_item = next(items, None)
+                while next_tag is not None and next_tag[0] == gid:
+                    self.tags.append(next_tag[1], gloss_idx, item_idx[next_tag[2]], *(add(v) for v in next_tag[3:]))
+                    next_tag = next(tags, None)
+                self._end_gloss()
+                next_gloss = next(glosses, None)
+            self._end_synset()
+
+    # ---------------------------------------------------------------------------
+    # Columns
+    # ---------------------------------------------------------------------------
+
+    def lookup(self, value):
+        """ Get string ID of a value (-1 if the value does not exist in this store) """
+        return self.pool.get_id(value)
+
+    def value(self, string_id):
+        return self.pool[string_id]
+
+    def column(self, table, name):
+        """ Get a column of the items, tags or glosses table (a NumPy array if NumPy is available) """
+        col = getattr(self, table)[name]
+        return np.frombuffer(col, dtype=col.typecode) if _NUMPY_AVAILABLE and len(col) else col
+
+    def select(self, table, **conditions):
+        """ Get row indices of items/tags/glosses where all columns are equal to the given values
+
+        Values of string columns are given as strings, e.g. store.select('items', pos='NN', cat='punc')
+        """
+        keys = []
+        for name, value in conditions.items():
+            keys.append((getattr(self, table)[name], value if isinstance(value, int) else self.lookup(value)))
+        size = len(getattr(self, table))
+        if _NUMPY_AVAILABLE:
+            mask = np.ones(size, dtype=bool)
+            for col, key in keys:
+                if len(col):
+                    mask &= np.frombuffer(col, dtype=col.typecode) == key
+            return np.flatnonzero(mask)
+        rows = range(size)
+        for col, key in keys:
+            rows = [r for r in rows if col[r] == key]
+        return array(INT_TYPE, rows)
+
+    def count_by(self, table, name, rows=None):
+        """ Count rows of a table (or only the selected rows) grouped by a string column
+
+        Returns a Counter of string values
+        """
+        col = getattr(self, table)[name]
+        if _NUMPY_AVAILABLE:
+            values = np.frombuffer(col, dtype=col.typecode) if len(col) else np.zeros(0, dtype=col.typecode)
+            if rows is not None:
+                values = values[np.asarray(rows, dtype=np.intp)]
+            ids, counts = np.unique(values, return_counts=True)
+            counter = Counter({self.pool[int(i)]: int(c) for i, c in zip(ids, counts)})
+        else:
+            counter = Counter(col if rows is None else (col[r] for r in rows))
+            counter = Counter({self.pool[i]: c for i, c in counter.items()})
+        return counter
+
+    def tagged_sensekeys(self):
+        """ Count tagged sensekeys in all glosses (empty sensekeys are ignored) """
+        counter = self.count_by('tags', 'sk')
+        counter.pop('', None)
+        return counter
+
+    def get_gramwords(self, synsetid, nopunc=True):
+        """ Same as GlossedSynset.get_gramwords() without creating the synset """
+        synset_idx = self._synset_idx(synsetid)
+        items = self.items
+        punc = self.lookup('punc')
+        words = []
+        for gloss_idx in range(self.gloss_ptr[synset_idx], self.gloss_ptr[synset_idx + 1]):
+            for row in range(self.item_ptr[gloss_idx], self.item_ptr[gloss_idx + 1]):
+                if nopunc and items['cat'][row] == punc:
+                    continue
+                lemma = self.pool[items['lemma'][row]]
+                if lemma:
+                    words.extend(w for w in {token.split('%')[0] for token in lemma.split('|')} if w)
+        return words
+
+    # ---------------------------------------------------------------------------
+    # Synsets
+    # ---------------------------------------------------------------------------
+
+    def _synset_idx(self, synsetid):
+        key = synset_key(synsetid)
+        if key not in self.sid_map:
+            raise SynsetNotFoundException(synsetid)
+        return self.sid_map[key]
+
+    def synset_of(self, table, row):
+        """ Get synset ID of a row in the items, tags or glosses table """
+        gloss_idx = row if table == 'glosses' else getattr(self, table)['gloss'][row]
+        return self.sids[self.glosses['synset'][gloss_idx]]
+
+    def get_synset(self, synsetid):
+        """ Create a GlossedSynset object from the columns """
+        return self._materialize(self._synset_idx(synsetid))
+
+    def get_synsets(self, synsetids):
+        return SynsetCollection(self.get_synset(sid) for sid in synsetids)
+
+    def synsets(self):
+        """ Iterate through all synsets (a new GlossedSynset object is created for each of them) """
+        for synset_idx in range(len(self.sids)):
+            yield self._materialize(synset_idx)
+
+    def _materialize(self, synset_idx):
+        pool = self.pool
+        synset = GlossedSynset(self.sids[synset_idx])
+        for i in range(self.term_ptr[synset_idx], self.term_ptr[synset_idx + 1]):
+            synset.add_lemma(pool[self.terms[i]])
+        for i in range(self.sensekey_ptr[synset_idx], self.sensekey_ptr[synset_idx + 1]):
+            synset.add_key(pool[self.sensekeys[i]])
+        for i in range(self.raw_ptr[synset_idx], self.raw_ptr[synset_idx + 1]):
+            synset.add_raw_gloss(pool[self.raw_cats[i]], self.raw_glosses[i])
+        glosses, items, tags = self.glosses.columns, self.items.columns, self.tags.columns
+        for g in range(self.gloss_ptr[synset_idx], self.gloss_ptr[synset_idx + 1]):
+            gloss = synset.add_gloss(pool[glosses['origid'][g]], pool[glosses['cat'][g]], glosses['id'][g])
+            gloss.surface = self.surfaces[g]
+            item_objs = {}
+            for r in range(self.item_ptr[g], self.item_ptr[g + 1]):
+                item_objs[r] = gloss.add_gloss_item(pool[items['tag'][r]], pool[items['lemma'][r]], pool[items['pos'][r]],
+                                                    pool[items['cat'][r]], pool[items['coll'][r]], pool[items['rdf'][r]],
+                                                    pool[items['origid'][r]], pool[items['sep'][r]], pool[items['text'][r]],
+                                                    items['id'][r])
+            for r in range(self.tag_ptr[g], self.tag_ptr[g + 1]):
+                gloss.tag_item(item_objs[tags['item'][r]], pool[tags['cat'][r]], pool[tags['tag'][r]], pool[tags['glob'][r]],
+                               pool[tags['glemma'][r]], pool[tags['glob_id'][r]], pool[tags['coll'][r]],
+                               pool[tags['origid'][r]], pool[tags['sid'][r]], pool[tags['sk'][r]], pool[tags['lemma'][r]],
+                               tags['id'][r])
+        return synset
+
+    def __len__(self):
+        return len(self.sids)
+
+    def __contains__(self, synsetid):
+        try:
+            self._synset_idx(synsetid)
+            return True
+        except Exception:
+            return False
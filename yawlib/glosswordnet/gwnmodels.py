@@ -9,11 +9,14 @@ Gloss WordNet Data Transfer Object
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
+import sys
+import copy
 import logging
 import re
 from collections import defaultdict as dd
 
 from yawlib.models import Synset
+from yawlib.lazy import LazyFields, deferred, rebuild
 from texttaglib.chirptext.leutile import StringTool
 from texttaglib.chirptext import ttl
 
@@ -29,6 +32,11 @@ def getLogger():
     return logging.getLogger(__name__)
 
 
+def strip_intern(a_str):
+    """ Same as StringTool.strip() but the result is interned (for short values which are repeated very often) """
+    return sys.intern(a_str.strip()) if a_str else ''
+
+
 # -----------------------------------------------------------------------
 # Models
 # -----------------------------------------------------------------------
@@ -37,6 +45,8 @@ class GlossedSynset(Synset):
     """ Each synset object comes with sensekeys (ref: SenseKey), terms (ref: Term), and 3 glosses (ref: GlossRaw).
     """
 
+    __slots__ = ('raw_glosses', 'glosses')
+
     def __init__(self, sid, keys=None, lemmas=None, defs=None, exes=None):
         super().__init__(sid, keys, lemmas, defs, exes)
         self.raw_glosses = []  # list of GlossRaw
@@ -100,6 +110,10 @@ class GlossedSynset(Synset):
             keys.extend(gloss.get_tagged_sensekey())
         return keys
 
+    def copy(self):
+        """ Override Synset.copy (glosses, gloss items and sense tags are copied too) """
+        return copy.deepcopy(self, {id(self.ID): self.ID})
+
     def match_surface(self, raws=None):
         """ Match tokens in each gloss to original synset def+ex string """
         raws = self.get_orig().split() if raws is None else list(raws)
@@ -181,9 +195,11 @@ class GlossRaw:
     ORIG = 'orig'
     TEXT = 'text'
 
+    __slots__ = ('synset', 'cat', 'gloss')
+
     def __init__(self, synset, cat, gloss):
         self.synset = synset
-        self.cat = StringTool.strip(cat)
+        self.cat = strip_intern(cat)
         self.gloss = StringTool.strip(gloss)
 
     def __str__(self):
@@ -224,11 +240,14 @@ class GlossRaw:
 
 
 class Gloss:
+
+    __slots__ = ('synset', 'gid', 'origid', 'cat', 'items', 'tags', 'groups', '__orig')
+
     def __init__(self, synset, origid, cat, gid):
         self.synset = synset
         self.gid = gid
         self.origid = origid  # Original ID from Gloss WordNet
-        self.cat = cat
+        self.cat = sys.intern(cat) if cat else cat
         self.items = []       # list of GlossItem objects
         self.tags = []        # Sense tags
         self.groups = []      # Other group labels
@@ -315,22 +334,79 @@ class Gloss:
         return "{Gloss('%s'|'%s') %s}" % (self.origid, self.cat, self.text())
 
 
+class LazyGlossedSynset(LazyFields, GlossedSynset):
+    """ Synset of a GWordnetSQLite DAO with deferred lemmas (with sensekeys), glosses and sense tags """
+
+    __slots__ = ('_pending', '_batch')
+    _base_class = GlossedSynset
+
+    def __init__(self, sid, **kwargs):
+        self._pending = set()
+        self._batch = None
+        super().__init__(sid, **kwargs)
+
+    lemmas = deferred(GlossedSynset, 'lemmas', 'lemmas')
+    sensekeys = deferred(GlossedSynset, 'sensekeys', 'lemmas')
+    raw_glosses = deferred(GlossedSynset, 'raw_glosses', 'glosses')
+    glosses = deferred(GlossedSynset, 'glosses', 'glosses')
+
+    def _clear(self, group):
+        """ Reset the fields of a group to their initial (empty) values """
+        if group == 'lemmas':
+            self.__dict__['lemmas'] = []
+            self._Synset__keys = []
+        elif group == 'glosses':
+            GlossedSynset.raw_glosses.__set__(self, [])
+            GlossedSynset.glosses.__set__(self, [])
+        elif group == 'tags':
+            for gloss in GlossedSynset.glosses.__get__(self):
+                Gloss.tags.__set__(gloss, [])
+
+    def add_key(self, key):
+        self._fault('lemmas')
+        super().add_key(key)
+
+    def add_gloss(self, origid, cat, gid=-1):
+        g = LazyGloss(self, origid, cat, gid)
+        self.glosses.append(g)
+        return g
+
+
+class LazyGloss(Gloss):
+    """ Gloss of a LazyGlossedSynset, sense tags are loaded on first access """
+
+    __slots__ = ()
+
+    def _fault(self, group):
+        self.synset._fault(group)
+
+    tags = deferred(Gloss, 'tags', 'tags')
+
+    def __reduce_ex__(self, protocol):
+        # pickle (and copy) as a Gloss
+        return (rebuild, (Gloss,), object.__reduce_ex__(self, max(protocol, 2))[2])
+
+
 class GlossItem:
     """ A word token (belong to a gloss)
     """
+
+    __slots__ = ('itemid', 'gloss', 'order', 'tag', 'lemma', 'pos', 'cat', 'coll', 'rdf', 'sep', 'text', 'origid')
+
     def __init__(self, gloss, tag, lemma, pos, cat, coll, rdf, origid, sep=None, text=None, itemid=-1):
         self.itemid = itemid
         self.gloss = gloss
         self.order = -1
-        self.tag = StringTool.strip(tag)
-        self.lemma = StringTool.strip(lemma)
-        self.pos = StringTool.strip(pos)
-        self.cat = StringTool.strip(cat)
-        self.coll = StringTool.strip(coll)
-        self.rdf = StringTool.strip(rdf)
-        self.sep = StringTool.strip(sep)
-        self.text = StringTool.strip(text)
-        self.origid = StringTool.strip(origid)
+        # tag, pos, cat, rdf and sep only have a handful of distinct values and most tokens (text, lemma) are repeated
+        self.tag = strip_intern(tag)
+        self.lemma = strip_intern(lemma)
+        self.pos = strip_intern(pos)
+        self.cat = strip_intern(cat)
+        self.coll = coll.strip() if coll else ''
+        self.rdf = strip_intern(rdf)
+        self.sep = strip_intern(sep)
+        self.text = strip_intern(text)
+        self.origid = origid.strip() if origid else ''
         pass
 
     def get_lemma(self):
@@ -365,6 +441,8 @@ class GlossGroup:
     """ A group tag (i.e. labelled GlossItem group)
     """
 
+    __slots__ = ('label', 'items')
+
     def __init__(self, label=''):
         self.label = label
         self.items = []    # List of GlossItem belong to this group
@@ -373,11 +451,14 @@ class GlossGroup:
 class SenseTag:
     """ Sense annotation object
     """
+
+    __slots__ = ('tagid', 'cat', 'tag', 'glob', 'glemma', 'glob_id', 'coll', 'origid', 'sid', 'gid', 'sk', 'lemma', 'item', 'itemid')
+
     def __init__(self, item, cat, tag, glob, glemma, glob_id, coll, origid, sid, sk, lemma, tagid=-1):
         self.tagid = tagid         # tag id
-        self.cat = cat             # coll, tag, etc.
-        self.tag = tag             # from glob tag
-        self.glob = glob           # from glob tag
+        self.cat = sys.intern(cat) if cat else cat  # coll, tag, etc.
+        self.tag = sys.intern(tag) if tag else tag  # from glob tag
+        self.glob = sys.intern(glob) if glob else glob  # from glob tag
         self.glemma = glemma       # from glob tag
         self.glob_id = glob_id     # from glob tag
         self.coll = coll           # from cf tag
@@ -387,6 +468,7 @@ class SenseTag:
         self.sk = sk               # from id tag
         self.lemma = lemma          # from id tag
         self.item = item            # ref to gloss item (we can access gloss obj via self.item)
+        self.itemid = None          # origid of the tagged item of a cf tag (from id tag)
 
     def __repr__(self):
         return "%s (sk:%s)" % (self.lemma, self.sk)
@@ -10,26 +10,54 @@ Gloss WordNet SQLite Data Access Object - Access Gloss WordNet in SQLite format
 # :license: MIT, see LICENSE for more details.
 
 import os
+import re
 import logging
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 from texttaglib.puchikarui import Schema, with_ctx, escape_like
+from texttaglib.chirptext.leutile import uniquify
 
-from yawlib.models import SynsetCollection, SynsetID, Synset
+from yawlib.models import SynsetCollection, SynsetID, Synset, synset_key
 from yawlib.common import SynsetNotFoundException, WordnetFeatureNotSupported
 from yawlib.common import WordnetException
-
-from .gwnmodels import GlossedSynset
+from yawlib.common import SQLITE_MAX_VARIABLES, chunks, in_clause, create_nocase_indexes
+from yawlib import fulltext
+from yawlib.cache import cached
+from yawlib.pool import PooledSchema
+from yawlib.profiling import ProfiledSchema
+from yawlib.lookup import BatchLookup, select_patterns, match_patterns
+from yawlib.lazy import field_groups, defer
+
+from .gwnmodels import GlossedSynset, LazyGlossedSynset
 from .gwnmodels import GlossItem
+from .gwnxml import GWordnetXML, synset_ranges
 
 # -------------------------------------------------------------------------------
 # Configuration
 # -------------------------------------------------------------------------------
 
 SETUP_SCRIPT = os.path.join(os.path.dirname(__file__), 'script', 'gwn_setup.sql')
+# number of pending rows before a bulk writer flushes them to the database
+BULK_BATCH_SIZE = 50000
+# XML files larger than this are split into byte-range shards for parallel import
+SHARD_SIZE = 16 * 1024 * 1024
+INDEX_PATTERN = re.compile(r'CREATE INDEX IF NOT EXISTS (?P<name>\w+) ON .*;')
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def setup_indexes(setup_file=SETUP_SCRIPT):
+    """ Get (index name, CREATE INDEX statement) pairs from a setup script """
+    with open(setup_file) as script:
+        return [(m.group('name'), m.group(0)) for m in INDEX_PATTERN.finditer(script.read())]
+
+
 # -------------------------------------------------------------------------------
 # Schema
 # -------------------------------------------------------------------------------
@@ -49,14 +77,117 @@ class GWordnetSchema(Schema):
         self.add_table('sensetag', 'id cat tag glob glob_lemma glob_id coll sid gid sk origid lemma itemid'.split())
 
 
+# -------------------------------------------------------------------------------
+# Bulk loader
+# -------------------------------------------------------------------------------
+
+class GWordnetBulkWriter:
+    """ Write synsets to a Gloss WordNet SQLite database in large executemany() batches
+
+    Gloss, gloss item and sense tag IDs are assigned client-side (continuing from the largest IDs in the database)
+    so that child rows can be written without waiting for lastrowid.
+    Call flush() after the last synset has been written.
+    """
+
+    TABLES = ('synset', 'term', 'sensekey', 'gloss_raw', 'gloss', 'glossitem', 'sensetag')
+
+    def __init__(self, schema, ctx, batch_size=BULK_BATCH_SIZE):
+        self.ctx = ctx
+        self.batch_size = batch_size
+        self.queries = {}
+        for name in self.TABLES:
+            columns = getattr(schema, name).columns
+            self.queries[name] = 'INSERT INTO {} ({}) VALUES ({})'.format(name, ','.join(columns), ','.join('?' * len(columns)))
+        self.rows = {name: [] for name in self.TABLES}
+        self.pending = 0
+        self.synset_count = 0
+        self.next_gid = self._next_id('gloss')
+        self.next_itemid = self._next_id('glossitem')
+        self.next_tagid = self._next_id('sensetag')
+
+    def _next_id(self, table):
+        return self.ctx.select_scalar('SELECT COALESCE(MAX(id), 0) FROM {}'.format(table)) + 1
+
+    def write(self, synset):
+        rows = self.rows
+        sid = synset.ID.to_gwnsql()
+        rows['synset'].append((sid, synset.ID.offset, synset.ID.pos))
+        rows['term'].extend((sid, term) for term in synset.lemmas)
+        rows['sensekey'].extend((sid, sk) for sk in synset.sensekeys)
+        rows['gloss_raw'].extend((sid, gr.cat, gr.gloss) for gr in synset.raw_glosses)
+        for gloss in synset.glosses:
+            gloss.gid = self.next_gid
+            self.next_gid += 1
+            rows['gloss'].append((gloss.gid, gloss.origid, sid, gloss.cat, gloss.surface))
+            for item in gloss.items:
+                item.itemid = self.next_itemid
+                self.next_itemid += 1
+                rows['glossitem'].append((item.itemid, item.order, gloss.gid, item.tag, item.lemma, item.pos, item.cat,
+                                          item.coll, item.rdf, item.sep, item.text, item.origid))
+            for tag in gloss.tags:
+                tag.tagid = self.next_tagid
+                self.next_tagid += 1
+                rows['sensetag'].append((tag.tagid, tag.cat, tag.tag, tag.glob, tag.glemma, tag.glob_id, tag.coll, '',
+                                         gloss.gid, tag.sk, tag.origid, tag.lemma, tag.item.itemid))
+        self.synset_count += 1
+        self.pending = sum(len(r) for r in rows.values())
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def write_all(self, synsets):
+        for synset in synsets:
+            self.write(synset)
+        return self
+
+    def flush(self):
+        for name in self.TABLES:
+            if self.rows[name]:
+                self.ctx.cur.executemany(self.queries[name], self.rows[name])
+                self.rows[name] = []
+        self.pending = 0
+        self.ctx.commit()
+
+
+def build_shard(shard_path, filename, start, end, memory_save=False):
+    """ Parse a byte range of a Gloss WordNet XML file into a new SQLite shard (process pool worker) """
+    xmlwn = GWordnetXML(memory_save=memory_save)
+    # shards are only read once when they are merged, so they do not need any index
+    return GWordnetSQLite(shard_path).bulk_insert_synsets(xmlwn.iterparse_range(filename, start, end), create_indexes=False)
+
+
 # -------------------------------------------------------------------------------
 # Features
 # -------------------------------------------------------------------------------
 
-class GWordnetSQLite(GWordnetSchema):
+class GWordnetSQLite(ProfiledSchema, PooledSchema, GWordnetSchema, BatchLookup):
+
+    # backend name in cache keys
+    BACKEND = 'gwn'
 
-    def __init__(self, db_path, **kwargs):
+    # (table, column) pairs which can be indexed for full-text search
+    FTS_INDEXES = (('term', 'term'), ('gloss_raw', 'gloss'))
+    # case-insensitive indexes for term and sensekey lookup (also created by gwn_setup.sql)
+    NOCASE_INDEXES = (('term', 'term'), ('sensekey', 'sensekey'))
+    # field groups which can be deferred (see yawlib.lazy), sense tags belong to gloss items
+    FIELD_GROUPS = ('lemmas', 'glosses', 'tags')
+    FIELD_ALIASES = {'sensekeys': 'lemmas', 'definition': 'glosses', 'examples': 'glosses'}
+    # search() escapes wildcards, so lemma queries of lookup_many() are matched as they are
+    LEMMA_PATTERNS = False
+
+    def __init__(self, db_path, cache=None, pool_size=None, profile=False, **kwargs):
         super().__init__(data_source=db_path, **kwargs)
+        # an optional SynsetCache (see yawlib.cache), which may be shared with other DAOs
+        self.cache = cache
+        # borrow read-only connections from a pool instead of opening one per call (see yawlib.pool)
+        # pooled connections cannot be used for inserting synsets
+        if pool_size:
+            self.enable_pool(pool_size)
+        # record SQL statement statistics (see yawlib.profiling)
+        if profile:
+            self.enable_profiling()
+
+    def cache_key(self, *parts):
+        return (self.BACKEND, 'eng') + parts
 
     @with_ctx
     def insert_synset(self, synset, ctx=None):
@@ -97,79 +228,219 @@ class GWordnetSQLite(GWordnetSchema):
                                         tag.glob_id, tag.coll, '', gloss.gid, tag.sk,
                                         tag.origid, tag.lemma, tag.item.itemid)
 
+    def ensure_sid(self, synsetid):
+        """ Convert a synset ID to Gloss WordNet SQLite format (x12345678) """
+        if isinstance(synsetid, SynsetID):
+            return synsetid.to_gwnsql()
+        else:
+            return SynsetID.from_string(str(synsetid)).to_gwnsql()
+
+    @contextmanager
+    def bulk_mode(self, ctx, create_indexes=True):
+        """ Prepare a context for building the database
+
+        Indexes from the setup script are dropped and only created again after the load (unless create_indexes is False),
+        and journal_mode/synchronous are switched off while the build runs.
+        """
+        ctx.commit()
+        journal_mode = ctx.select_scalar('PRAGMA journal_mode')
+        synchronous = ctx.select_scalar('PRAGMA synchronous')
+        indexes = setup_indexes()
+        for name, _ in indexes:
+            ctx.execute('DROP INDEX IF EXISTS {}'.format(name))
+        ctx.execute('PRAGMA journal_mode=OFF')
+        ctx.execute('PRAGMA synchronous=OFF')
+        try:
+            yield ctx
+            ctx.commit()
+        finally:
+            if create_indexes:
+                getLogger().info("Creating indexes")
+                for _, create_index in indexes:
+                    ctx.execute(create_index)
+                ctx.commit()
+            ctx.execute('PRAGMA journal_mode={}'.format(journal_mode))
+            ctx.execute('PRAGMA synchronous={:d}'.format(synchronous))
+
+    @with_ctx
+    def bulk_insert_synsets(self, synsets, batch_size=BULK_BATCH_SIZE, create_indexes=True, ctx=None):
+        """ Store synsets using batched executemany() inserts (for building a new database)
+
+        This produces the same rows as insert_synsets() but is much faster for large collections
+        """
+        with self.bulk_mode(ctx, create_indexes=create_indexes):
+            writer = GWordnetBulkWriter(self, ctx, batch_size=batch_size)
+            writer.write_all(synsets)
+            writer.flush()
+        return writer.synset_count
+
+    @with_ctx
+    def merge_shards(self, shard_paths, ctx=None):
+        """ Copy synsets from Gloss WordNet SQLite shards (in the given order) into this database
+
+        Gloss, gloss item and sense tag IDs of each shard are shifted to continue from the largest IDs in this database
+        """
+        merge_queries = (
+            'INSERT INTO synset SELECT * FROM shard.synset ORDER BY rowid',
+            'INSERT INTO term SELECT * FROM shard.term ORDER BY rowid',
+            'INSERT INTO sensekey SELECT * FROM shard.sensekey ORDER BY rowid',
+            'INSERT INTO gloss_raw SELECT * FROM shard.gloss_raw ORDER BY rowid',
+            'INSERT INTO gloss SELECT id + :gid, origid, sid, cat, surface FROM shard.gloss ORDER BY id',
+            'INSERT INTO glossitem SELECT id + :itemid, ord, gid + :gid, tag, lemma, pos, cat, coll, rdf, sep, text, origid FROM shard.glossitem ORDER BY id',
+            'INSERT INTO sensetag SELECT id + :tagid, cat, tag, glob, glob_lemma, glob_id, coll, sid, gid + :gid, sk, origid, lemma, itemid + :itemid FROM shard.sensetag ORDER BY id')
+        count = 0
+        with self.bulk_mode(ctx):
+            for shard_path in shard_paths:
+                getLogger().info("Merging {}".format(shard_path))
+                offsets = {'gid': ctx.select_scalar('SELECT COALESCE(MAX(id), 0) FROM gloss'),
+                           'itemid': ctx.select_scalar('SELECT COALESCE(MAX(id), 0) FROM glossitem'),
+                           'tagid': ctx.select_scalar('SELECT COALESCE(MAX(id), 0) FROM sensetag')}
+                ctx.execute('ATTACH DATABASE ? AS shard', (shard_path,))
+                try:
+                    count += ctx.select_scalar('SELECT COUNT(*) FROM shard.synset')
+                    for query in merge_queries:
+                        ctx.cur.execute(query, offsets)
+                    ctx.commit()
+                finally:
+                    ctx.execute('DETACH DATABASE shard')
+        return count
+
+    @with_ctx
+    def parallel_insert_files(self, files, workers=None, shard_size=SHARD_SIZE, memory_save=False, tmpdir=None, ctx=None):
+        """ Import Gloss WordNet XML files using a pool of worker processes
+
+        Each file (or each byte-range shard of a large file) is parsed into a temporary SQLite shard by a worker
+        and the shards are merged in order, so the result is the same as importing the files one after another.
+        """
+        tasks = [(filename, start, end) for filename in files for start, end in synset_ranges(filename, shard_size)]
+        with tempfile.TemporaryDirectory(dir=tmpdir) as shard_dir, ProcessPoolExecutor(max_workers=workers) as pool:
+            shard_paths = [os.path.join(shard_dir, 'shard{}.db'.format(idx)) for idx in range(len(tasks))]
+            futures = [pool.submit(build_shard, path, filename, start, end, memory_save=memory_save)
+                       for path, (filename, start, end) in zip(shard_paths, tasks)]
+
+            def ready_shards():
+                # shards are merged in order as soon as they are ready
+                for path, future in zip(shard_paths, futures):
+                    future.result()
+                    yield path
+            return self.merge_shards(ready_shards(), ctx=ctx)
+
     @with_ctx
     def get_synset(self, synsetid, ctx=None, **kwargs):
-        ss = GlossedSynset(synsetid)
-        synsetid = ss.ID.to_gwnsql()
-        if not ctx.synset.by_id(synsetid):
+        synsetid = self.ensure_sid(synsetid)
+        synsets = self.get_synsets((synsetid,), ctx=ctx, **kwargs)
+        if not synsets:
             raise SynsetNotFoundException(synsetid)
-        # terms = lemmas;
-        terms = ctx.term.select(where='sid=?', values=(synsetid,))
-        for term in terms:
-            ss.add_lemma(term.term)
-        # sensekey;
-        sks = ctx.sensekey.select(where='sid=?', values=(synsetid,))
-        for sk in sks:
-            ss.add_key(sk.sensekey)
-        # gloss_raw | sid cat gloss
-        rgs = ctx.gloss_raw.select(where='sid=?', values=(synsetid,))
-        for rg in rgs:
-            ss.add_raw_gloss(rg.cat, rg.gloss)
-        # gloss; DB: id origid sid cat | OBJ: gid origid cat
-        glosses = ctx.gloss.select(where='sid=?', values=(synsetid,))
-        for gl in glosses:
-            gloss = ss.add_gloss(gl.origid, gl.cat, gl.id)
-            gloss.surface = gl.surface
-            # glossitem;
-            # OBJ | gloss, order, tag, lemma, pos, cat, coll, rdf, origid, sep, text
-            # DB  | id ord gid tag lemma pos cat coll rdf sep text origid
-            glossitems = ctx.glossitem.select(where='gid=?', values=(gl.id,))
-            item_map = {}
-            for gi in glossitems:
-                item = gloss.add_gloss_item(gi.tag, gi.lemma, gi.pos, gi.cat, gi.coll, gi.rdf, gi.origid, gi.sep, gi.text, gi.id)
-                item_map[item.itemid] = item
-            # sensetag;
-            # OBJ: tagid cat, tag, glob, glemma, gid, coll, origid, sid, sk, lemma
-            # DB: id cat tag glob glob_lemma glob_id coll sid gid sk origid lemma itemid
-            tags = ctx.sensetag.select(where='gid=?', values=(gl.id,))
-            for tag in tags:
-                gloss.tag_item(item_map[tag.itemid], tag.cat, tag.tag, tag.glob, tag.glob_lemma,
-                               tag.glob_id, tag.coll, tag.origid, tag.sid, tag.sk, tag.lemma, tag.id)
-        return ss
+        return synsets.synsets[0]
 
     @with_ctx
     def results_to_synsets(self, results, synsets=None, ctx=None, **kwargs):
         if synsets is None:
             synsets = SynsetCollection()
-        for result in results:
-            ss = self.get_synset(synsetid=result.ID, ctx=ctx, **kwargs)
-            synsets.add(ss)
-        return synsets
+        return synsets.merge(self.get_synsets((result.ID for result in results), ctx=ctx, **kwargs))
+
+    @with_ctx
+    def get_synsets(self, synsetids, fields=None, strict=False, ctx=None, **kwargs):
+        """ Get synsets by synsetids
+
+        Terms, sensekeys, raw glosses, glosses, gloss items and sense tags of all synsets
+        are fetched with one query per table (per chunk of synset IDs) and then stitched together in memory.
+        When fields is given, only these field groups (see FIELD_GROUPS) are fetched now and
+        the others are fetched on first access (see yawlib.lazy).
+        Synset IDs that cannot be found are ignored (the same as the other DAOs),
+        or a SynsetNotFoundException is raised for the first of them when strict is True.
+        """
+        sids = uniquify([self.ensure_sid(sid) for sid in synsetids])
+        groups = field_groups(self, fields)
+        synset_map = {}
+        missing = sids
+        if self.cache is not None:
+            missing = []
+            for sid in sids:
+                ss = self.cache.get(self.cache_key(synset_key(sid)))
+                if ss is None:
+                    missing.append(sid)
+                else:
+                    # callers may modify their synsets, so the cached ones are copied
+                    synset_map[sid] = ss.copy()
+        loaded = {}
+        synset_class = GlossedSynset if groups is None else LazyGlossedSynset
+        for chunk in chunks(missing):
+            for row in ctx.synset.select(in_clause('ID', chunk), chunk, columns=('ID',)):
+                loaded[row.ID] = synset_class(row.ID)
+        if groups is None:
+            for group in self.FIELD_GROUPS:
+                self._load_fields(group, loaded, ctx=ctx)
+            # only complete synsets are cached
+            if self.cache is not None:
+                for sid, ss in loaded.items():
+                    self.cache.put(self.cache_key(synset_key(sid)), ss.copy())
+        elif loaded:
+            defer(self, loaded.values(), groups, ctx=ctx)
+        synset_map.update(loaded)
+        if strict:
+            for sid in sids:
+                if sid not in synset_map:
+                    raise SynsetNotFoundException(sid)
+        return SynsetCollection(synset_map[sid] for sid in sids if sid in synset_map)
 
     @with_ctx
-    def get_synsets(self, synsetids, ctx=None, **kwargs):
-        """ Get synsets by synsetids """
-        synsets = SynsetCollection()
-        for sid in synsetids:
-            ss = self.get_synset(sid, ctx=ctx, **kwargs)
-            synsets.add(ss)
-        return synsets
+    def _load_fields(self, group, synset_map, ctx=None):
+        """ Fetch a field group (see FIELD_GROUPS) of synsets (a dict of synset ID > synset) """
+        for chunk in chunks(list(synset_map)):
+            sid_filter = in_clause('sid', chunk)
+            gid_filter = 'gid IN (SELECT id FROM gloss WHERE {})'.format(sid_filter)
+            if group == 'lemmas':
+                # terms = lemmas;
+                for term in ctx.term.select(sid_filter, chunk, orderby='rowid'):
+                    synset_map[term.sid].add_lemma(term.term)
+                # sensekey;
+                for sk in ctx.sensekey.select(sid_filter, chunk, orderby='rowid'):
+                    synset_map[sk.sid].add_key(sk.sensekey)
+            elif group == 'glosses':
+                # gloss_raw | sid cat gloss
+                for rg in ctx.gloss_raw.select(sid_filter, chunk, orderby='rowid'):
+                    synset_map[rg.sid].add_raw_gloss(rg.cat, rg.gloss)
+                # gloss; DB: id origid sid cat | OBJ: gid origid cat
+                gloss_map = {}
+                for gl in ctx.gloss.select(sid_filter, chunk, orderby='id'):
+                    gloss = synset_map[gl.sid].add_gloss(gl.origid, gl.cat, gl.id)
+                    gloss.surface = gl.surface
+                    gloss_map[gl.id] = gloss
+                # glossitem;
+                # OBJ | gloss, order, tag, lemma, pos, cat, coll, rdf, origid, sep, text
+                # DB  | id ord gid tag lemma pos cat coll rdf sep text origid
+                for gi in ctx.glossitem.select(gid_filter, chunk, orderby='id'):
+                    gloss_map[gi.gid].add_gloss_item(gi.tag, gi.lemma, gi.pos, gi.cat, gi.coll, gi.rdf, gi.origid, gi.sep, gi.text, gi.id)
+            elif group == 'tags':
+                # tags are attached to gloss items (deferred glosses are loaded first)
+                gloss_map = {gloss.gid: gloss for sid in chunk for gloss in synset_map[sid].glosses}
+                item_map = {item.itemid: item for gloss in gloss_map.values() for item in gloss.items}
+                # sensetag;
+                # OBJ: tagid cat, tag, glob, glemma, gid, coll, origid, sid, sk, lemma
+                # DB: id cat tag glob glob_lemma glob_id coll sid gid sk origid lemma itemid
+                for tag in ctx.sensetag.select(gid_filter, chunk, orderby='id'):
+                    gloss_map[tag.gid].tag_item(item_map[tag.itemid], tag.cat, tag.tag, tag.glob, tag.glob_lemma,
+                                                tag.glob_id, tag.coll, tag.origid, tag.sid, tag.sk, tag.lemma, tag.id)
 
     @with_ctx
     def get_by_key(self, sensekey, ctx=None, **kwargs):
+        def find_sid():
+            results = ctx.synset.select(where='id IN (SELECT sid FROM sensekey where sensekey=? COLLATE NOCASE)', values=(sensekey,))
+            if len(results) == 0:
+                raise SynsetNotFoundException("Could not find any synset with provided key {}".format(sensekey))
+            elif len(results) > 1:
+                raise WordnetException("Found more than one synsetID with provided key {}".format(sensekey))
+            return results[0].ID
         # synset;
-        results = ctx.synset.select(where='id IN (SELECT sid FROM sensekey where lower(sensekey)=?)', values=(sensekey.lower(),))
-        if len(results) == 0:
-            raise SynsetNotFoundException("Could not find any synset with provided key {}".format(sensekey))
-        elif len(results) > 1:
-            raise WordnetException("Found more than one synsetID with provided key {}".format(sensekey))
-        else:
-            return self.get_synset(results[0].ID, ctx=ctx)
+        return self.get_synset(cached(self.cache, self.cache_key('sk2sid', sensekey), find_sid), fields=kwargs.get('fields'), ctx=ctx)
 
     @with_ctx
     def get_by_keys(self, sensekeys, ctx=None, **kwargs):
-        where = 'id IN (SELECT sid FROM sensekey where lower(sensekey) IN (%s))' % ','.join(['?'] * len(sensekeys))
-        results = ctx.synset.select(where=where, values=[k.lower() for k in sensekeys])
+        results = []
+        for chunk in chunks(sensekeys):
+            where = 'id IN (SELECT sid FROM sensekey where {})'.format(in_clause('sensekey COLLATE NOCASE', chunk))
+            results.extend(ctx.synset.select(where=where, values=chunk, columns=('ID',)))
         return self.results_to_synsets(results, ctx=ctx, **kwargs)
 
     @with_ctx
@@ -180,36 +451,52 @@ class GWordnetSQLite(GWordnetSchema):
     @with_ctx
     def search(self, lemma, pos=None, deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
         like_phrase = ' LIKE ? '
+        escape = None
         if '%' in lemma or '_' in lemma:
             like_phrase = " LIKE ? ESCAPE '@'"
             lemma = escape_like(lemma)
-        if ignore_case:
-            query = ['ID IN (SELECT sid FROM term WHERE lower(term) {})'.format(like_phrase)]
-            params = [lemma.lower()]
-        else:
-            query = ['ID IN (SELECT sid FROM term WHERE term {})'.format(like_phrase)]
-            params = [lemma]
-        if pos:
-            query.append('pos = ?')
-            params.append(pos)
-        # query synsetids
-        results = ctx.synset.select(' AND '.join(query), params, columns=('ID',))
+            escape = '@'
+
+        def find_sids():
+            fts_filter = fulltext.rowid_filter(ctx, 'term', 'term', lemma, escape=escape) if ignore_case else None
+            if fts_filter:
+                query = ['ID IN (SELECT sid FROM term WHERE {})'.format(fts_filter[0])]
+                params = fts_filter[1]
+            else:
+                # LIKE is case-insensitive and can use the term_term_nocase index
+                query = ['ID IN (SELECT sid FROM term WHERE term {})'.format(like_phrase)]
+                params = [lemma]
+            if pos:
+                query.append('pos = ?')
+                params.append(pos)
+            # query synsetids
+            return tuple(x.ID for x in ctx.synset.select(' AND '.join(query), params, columns=('ID',)))
+        sids = cached(self.cache, self.cache_key('search', lemma, pos, ignore_case), find_sids)
         if deep_select:
-            return self.results_to_synsets(results, ctx=ctx, synsets=synsets)
+            if synsets is None:
+                synsets = SynsetCollection()
+            return synsets.merge(self.get_synsets(sids, fields=kwargs.get('fields'), ctx=ctx))
         else:
-            return SynsetCollection(synsets=(Synset(x.ID) for x in results))
+            return SynsetCollection(synsets=(Synset(sid) for sid in sids))
 
     @with_ctx
     def search_cat(self, query, cat='def', deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
+        # use full-text index (ranked by relevance) if it is available
+        results = None
         if ignore_case:
-            where = ['lower(gloss) LIKE ? AND cat=?']
-            params = [query.lower(), cat]
-        else:
-            where = ['gloss LIKE ? AND cat=?']
-            params = [query, cat]
-        # query synsetids
-        results = ctx.gloss_raw.select(' AND '.join(where), params, columns=('sid AS ID',))
-        return self.results_to_synsets(results, ctx=ctx, synsets=synsets)
+            results = fulltext.search(ctx, 'gloss_raw', 'gloss', query, columns=('sid',), where='gloss_raw.cat=?', values=[cat])
+        if results is None:
+            if ignore_case:
+                where = ['lower(gloss) LIKE ? AND cat=?']
+                params = [query.lower(), cat]
+            else:
+                where = ['gloss LIKE ? AND cat=?']
+                params = [query, cat]
+            # query synsetids
+            results = ctx.gloss_raw.select(' AND '.join(where), params, columns=('sid',))
+        if synsets is None:
+            synsets = SynsetCollection()
+        return synsets.merge(self.get_synsets((result.sid for result in results), fields=kwargs.get('fields'), ctx=ctx))
 
     @with_ctx
     def search_def(self, query, deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
@@ -219,6 +506,36 @@ class GWordnetSQLite(GWordnetSchema):
     def search_ex(self, query, deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
         return self.search_cat(query, cat='ex', deep_select=deep_select, ignore_case=ignore_case, synsets=synsets, ctx=ctx, **kwargs)
 
+    def _sensekey_sids(self, sensekeys, ctx=None):
+        for chunk in chunks(sensekeys):
+            yield from ctx.select('SELECT sensekey, sid FROM sensekey WHERE {}'.format(in_clause('sensekey COLLATE NOCASE', chunk)), chunk)
+
+    def _lemma_sids(self, patterns, pos=None, lang='eng', ctx=None):
+        # terms are not searched by pattern (search() escapes wildcards)
+        query = 'SELECT term.term, term.sid FROM term JOIN synset ON synset.ID = term.sid WHERE '
+        params = []
+        if pos:
+            query += 'synset.pos = ? AND '
+            params.append(pos)
+        rows = []
+        for chunk in chunks(patterns, SQLITE_MAX_VARIABLES - len(params)):
+            rows.extend(ctx.select(query + in_clause('term.term COLLATE NOCASE', chunk), params + chunk))
+        return match_patterns(rows, patterns, literal=True)
+
+    def _text_sids(self, field, patterns, lang='eng', ctx=None):
+        rows = select_patterns(ctx, 'SELECT gloss, sid FROM gloss_raw WHERE cat=? AND {}', 'gloss_raw', 'gloss', patterns, [field], lower=True)
+        return match_patterns(rows, patterns)
+
+    @with_ctx
+    def upgrade_schema(self, ctx=None):
+        """ Create case-insensitive indexes for databases which were built by older versions of yawlib """
+        create_nocase_indexes(ctx, self.NOCASE_INDEXES)
+
+    @with_ctx
+    def build_fts_index(self, ctx=None):
+        """ Build full-text search indexes for terms and raw glosses """
+        fulltext.build_indexes(ctx, self.FTS_INDEXES)
+
     @with_ctx
     def hypernyms(self, synsetid, deep_select=False, ctx=None):
         raise WordnetFeatureNotSupported("This feature is not available for this Wordnet")
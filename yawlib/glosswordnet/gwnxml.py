@@ -9,6 +9,8 @@ Gloss WordNet XML Data Access Object - Access Gloss WordNet in XML format
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
+import io
+import mmap
 import logging
 try:
     from lxml import etree
@@ -32,6 +34,30 @@ from .gwnmodels import GlossRaw
 
 # -----------------------------------------------------------------------
 
+SYNSET_TAG = b'<synset '
+ROOT_END_TAG = b'</wordnet>'
+
+
+def synset_ranges(filename, shard_size):
+    """ Split an XML file into byte ranges of about shard_size bytes, each of them starting with a <synset> tag
+
+    Returns a list of (start, end) offsets which can be parsed by GWordnetXML.iterparse_range()
+    """
+    with open(filename, 'rb') as infile, mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        first = data.find(SYNSET_TAG)
+        last = data.rfind(ROOT_END_TAG)
+        if first < 0 or last < first:
+            return []
+        ranges = []
+        start = first
+        while start < last:
+            end = data.find(SYNSET_TAG, start + max(shard_size, 1), last)
+            if end < 0:
+                end = last
+            ranges.append((start, end))
+            start = end
+        return ranges
+
 
 class GWordnetXML:
     """ GWordNet XML Data Access Object
@@ -53,21 +79,52 @@ class GWordnetXML:
     def read(self, filename):
         """ Read all synsets from an XML file
         """
+        for synset in self.iterparse(filename):
+            self.synsets.add(synset)
+        return self.synsets
+
+    def iterfiles(self, files):
+        """ Yield synsets from multiple XML files one by one (see iterparse())
+        """
+        for filename in files:
+            yield from self.iterparse(filename)
+
+    def iterparse(self, filename):
+        """ Yield synsets from an XML file as soon as each <synset> element is parsed
+
+        Parsed elements are discarded so that memory usage does not grow with the size of the file.
+        Yielded synsets are not added to self.synsets.
+        """
         logging.info('Loading %s' % filename)
         with open(filename, 'rb') as infile:
-            tree = etree.iterparse(infile)
-            c = Counter()
-            for event, element in tree:
-                if event == 'end' and element.tag == 'synset':
-                    synset = self.parse_synset(element)
-                    element.clear()
-                    self.synsets.add(synset)
-                # end if end-synset
-                c.count(element.tag)
+            yield from self._iterparse(infile)
 
+    def iterparse_range(self, filename, start, end):
+        """ Yield synsets from a byte range of an XML file (see synset_ranges())
+        """
+        logging.info('Loading %s [%d:%d]' % (filename, start, end))
+        with open(filename, 'rb') as infile:
+            infile.seek(start)
+            fragment = infile.read(end - start)
+        yield from self._iterparse(io.BytesIO(b'<wordnet>' + fragment + ROOT_END_TAG))
+
+    def _iterparse(self, infile):
+        tree = etree.iterparse(infile, events=('end',))
+        c = Counter()
+        for event, element in tree:
             if self.verbose:
-                c.summarise()
-            return self.synsets
+                c.count(element.tag)
+            if element.tag == 'synset':
+                synset = self.parse_synset(element)
+                element.clear()
+                if _LXML_AVAILABLE:
+                    # cleared elements are still referenced by the root node
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+                yield synset
+            # end if end-synset
+        if self.verbose:
+            c.summarise()
 
     def parse_synset(self, element):
         synset = GlossedSynset(element.get('id'))
@@ -98,11 +98,13 @@ CREATE INDEX IF NOT EXISTS synset_pos ON synset (pos);
 
 CREATE INDEX IF NOT EXISTS term_sid ON term (sid);
 CREATE INDEX IF NOT EXISTS term_term ON term (term);
+CREATE INDEX IF NOT EXISTS term_term_nocase ON term (term COLLATE NOCASE);
 
 CREATE INDEX IF NOT EXISTS gloss_raw_sid ON gloss_raw (sid);
 
 CREATE INDEX IF NOT EXISTS sensekey_sid ON sensekey (sid);
 CREATE INDEX IF NOT EXISTS sensekey_sensekey ON sensekey (sensekey);
+CREATE INDEX IF NOT EXISTS sensekey_sensekey_nocase ON sensekey (sensekey COLLATE NOCASE);
 
 CREATE INDEX IF NOT EXISTS gloss_id ON gloss (id);
 CREATE INDEX IF NOT EXISTS gloss_sid ON gloss (sid);
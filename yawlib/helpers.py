@@ -23,7 +23,11 @@ from yawlib import GWordnetXML as GWNXML
 from yawlib import GWordnetSQLite as GWNSQL
 from yawlib import WordnetSQL as WSQL
 from yawlib.common import InvalidSynsetID, WordnetFeatureNotSupported, SynsetNotFoundException
+from yawlib.common import chunks, is_like_pattern
+from yawlib import serializer
 from yawlib.omwsql import OMWSQL
+from yawlib.inmemory import InMemoryWordnet
+from yawlib.pool import DEFAULT_POOL_SIZE
 
 try:
     from lxml import etree
@@ -37,6 +41,10 @@ except Exception:
 ########################################################################
 
 MOCKUP_SYNSETS_DATA = (FileHelper.abspath('data/test.xml'),)
+# number of items of bulk requests (YAWOL) which are looked up together
+BULK_CHUNK_SIZE = 100
+# maximum number of items in a bulk request
+MAX_BULK_ITEMS = 10000
 logger = logging.getLogger()
 
 
@@ -132,7 +140,7 @@ def search_wn_full_text(wn, query, pos=None, lang='eng', auto_wrap=True, ctx=Non
     except (WordnetFeatureNotSupported, SynsetNotFoundException):
         pass
     # else, search by lemma or definition
-    if auto_wrap and '%' not in query and '?' not in query:
+    if auto_wrap and not is_like_pattern(query):
         query = '%{}%'.format(query)
     # 1. by lemma
     synsets = wn.search(query, pos, lang=lang, ctx=ctx)
@@ -261,30 +269,109 @@ def glosstag_files(merged_folder):
             os.path.join(merged_folder, 'noun.xml')]
 
 
-def get_gwnxml(args):
+def gwnxml_files(args):
     if args.mockup:
-        return GWNXML(args.mockup_files)
+        return args.mockup_files
     else:
         merged_folder = os.path.join(os.path.expanduser(args.gloss_xml), 'merged')
-        gwn_xml = GWNXML(glosstag_files(merged_folder))
-        return gwn_xml
+        return glosstag_files(merged_folder)
+
 
+def get_gwnxml(args):
+    return GWNXML(gwnxml_files(args))
 
-def get_gwn(args=None):
+
+def get_gwn(args=None, cache=None, pool_size=None, profile=False):
     gdb = args.glossdb if args else YLConfig.GWN30_DB
-    gwn = GWNSQL(gdb)
+    gwn = GWNSQL(gdb, cache=cache, pool_size=pool_size, profile=profile)
     return gwn
 
 
-def get_wn(args=None):
+def get_wn(args=None, cache=None, pool_size=None, profile=False):
     wnsql = args.wnsql if args else YLConfig.WNSQL30_PATH
-    wn = WSQL(wnsql)
+    wn = WSQL(wnsql, cache=cache, pool_size=pool_size, profile=profile)
     return wn
 
 
-def get_omw(args=None):
+def get_omw(args=None, cache=None, pool_size=None, profile=False):
     db_path = args.omw if args is not None and args.omw else YLConfig.OMW_DB
-    return OMWSQL(db_path)
+    return OMWSQL(db_path, cache=cache, pool_size=pool_size, profile=profile)
+
+
+def get_snapshot(path, use_mmap=True):
+    """ Open a Wordnet snapshot (memory-mapped by default so that it is shared between processes) """
+    return InMemoryWordnet.load(path, use_mmap=use_mmap)
+
+
+def get_server_wn(cache=None, pool_size=DEFAULT_POOL_SIZE, profile=None):
+    """ Wordnet for YAWOL servers: the configured WN_SNAPSHOT if there is one, otherwise WordnetSQL with a connection pool """
+    if YLConfig.WN_SNAPSHOT:
+        return get_snapshot(YLConfig.WN_SNAPSHOT)
+    return get_wn(cache=cache, pool_size=pool_size, profile=YLConfig.PROFILE_QUERIES if profile is None else profile)
+
+
+def get_server_omw(cache=None, pool_size=DEFAULT_POOL_SIZE, profile=None):
+    """ OMW for YAWOL servers: the configured OMW_SNAPSHOT if there is one, otherwise OMWSQL with a connection pool """
+    if YLConfig.OMW_SNAPSHOT:
+        return get_snapshot(YLConfig.OMW_SNAPSHOT)
+    return get_omw(cache=cache, pool_size=pool_size, profile=YLConfig.PROFILE_QUERIES if profile is None else profile)
+
+
+def wn_stats(wn):
+    """ Runtime statistics of a Wordnet DAO: connection pool, synset cache and SQL statements (when they are enabled) """
+    pool = getattr(wn, 'pool', None)
+    cache = getattr(wn, 'cache', None)
+    profiler = getattr(wn, 'profiler', None)
+    return {'backend': getattr(wn, 'BACKEND', type(wn).__name__),
+            'pool': pool.stats() if pool is not None else None,
+            'cache': cache.stats() if cache is not None else None,
+            'queries': profiler.stats() if profiler is not None else None}
+
+
+def bulk_get_synsets(wn, synsetids, fallback=None, chunk_size=BULK_CHUNK_SIZE, **kwargs):
+    """ Get synsets in chunks with one get_synsets() call per chunk (and per Wordnet)
+
+    Synsets which cannot be found in wn are looked up in fallback (e.g. OMW) if it is provided.
+    Yield (synsetid, Synset or None) pairs in input order as soon as each chunk is done.
+    """
+    for chunk in chunks(synsetids, chunk_size):
+        valid = [sid for sid in chunk if SynsetID.from_string(sid, default=None) is not None]
+        synsets = wn.get_synsets(valid, **kwargs)
+        missing = [sid for sid in valid if sid not in synsets]
+        if missing and fallback is not None:
+            synsets.merge(fallback.get_synsets(missing, **kwargs))
+        for sid in chunk:
+            yield sid, synsets.by_sid(sid) if sid in valid else None
+
+
+def bulk_search(wn, queries, fallback=None, chunk_size=BULK_CHUNK_SIZE, **kwargs):
+    """ Search synset IDs, sensekeys and lemmas in chunks with one lookup_many() call per chunk (and per Wordnet)
+
+    Queries without results in wn are searched in fallback (e.g. OMW) if it is provided.
+    Yield (query, SynsetCollection) pairs in input order as soon as each chunk is done.
+    """
+    for chunk in chunks(queries, chunk_size):
+        results = wn.lookup_many(chunk, **kwargs)
+        missing = [query for query, synsets in results.items() if not synsets]
+        if missing and fallback is not None:
+            results.update((q, synsets) for q, synsets in fallback.lookup_many(missing, **kwargs).items() if synsets)
+        for query in chunk:
+            yield query, results[query]
+
+
+def parse_bulk_items(data):
+    """ Check the JSON body of a bulk request (an array of strings), raise ValueError if it is invalid """
+    if not isinstance(data, list) or not all(isinstance(item, str) for item in data):
+        raise ValueError("Request body must be a JSON array of strings")
+    if len(data) > MAX_BULK_ITEMS:
+        raise ValueError("Too many items (maximum is {})".format(MAX_BULK_ITEMS))
+    return data
+
+
+def to_ndjson(objects):
+    """ Serialize objects as newline-delimited JSON (one line per object, bytes are used as encoded JSON) """
+    for obj in objects:
+        yield (obj if isinstance(obj, bytes) else serializer.dumps(obj)) + b'\n'
 
 
 def add_wordnet_config(parser):
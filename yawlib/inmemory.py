@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Read-only in-memory Wordnet built from WordnetSQL, OMWSQL or GWordnetSQLite
+
+An InMemoryWordnet has the same lookup API as the SQLite DAOs (get_synset, get_by_key, search, hypernyms, ...)
+but all data are stored in flat integer arrays and a single UTF-8 string blob.
+It can be saved as a binary snapshot (no pickle) and loaded again without rebuilding any index:
+
+    wn = InMemoryWordnet.build(WordnetSQL(YLConfig.WNSQL30_PATH))
+    wn.save('wn30.snapshot')
+    wn = InMemoryWordnet.load('wn30.snapshot')
+
+Snapshot layout: magic bytes, header length (uint64), JSON header, then all sections aligned to 8 bytes.
+When a snapshot is loaded with use_mmap=True, all sections are read directly from the memory-mapped file,
+so that every process which opens the same snapshot (e.g. web server workers) shares the same physical pages.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import sys
+import json
+import mmap
+import logging
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+from texttaglib.chirptext.leutile import uniquify
+
+from .models import POS, SynsetID, Synset, SynsetCollection, synset_key, KEY_POS_BASE
+from .common import WordnetException, WordnetFeatureNotSupported, SynsetNotFoundException, INT_TYPE
+from .common import like_to_regex, like_prefix
+from .wordnetsql import WordnetSQL
+from .omwsql import OMWSQL
+from .glosswordnet import GWordnetSQLite
+from .relgraph import RelationGraph, HierarchyQueries
+from .lookup import BatchLookup
+
+
+# -------------------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------------------
+
+SNAPSHOT_MAGIC = b'YAWLSNAP'
+SNAPSHOT_VERSION = 2
+ALIGNMENT = 8
+# relations which are stored in snapshots
+RELATIONS = ('hype', 'hypo', 'hypehypo')
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def _padding(size):
+    return -size % ALIGNMENT
+
+
+class _StringColumn:
+    """ A sequence view of an array of string IDs (so that it can be searched with bisect) """
+
+    def __init__(self, wn, ids):
+        self.wn = wn
+        self.ids = ids
+
+    def __getitem__(self, idx):
+        return self.wn.string(self.ids[idx])
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# -------------------------------------------------------------------------------
+# Snapshot builder
+# -------------------------------------------------------------------------------
+
+class SnapshotBuilder:
+    """ Collect synsets from any source and turn them into snapshot sections """
+
+    def __init__(self, langs=('eng',)):
+        self.langs = list(langs)
+        self.sensekeys = {}  # synset key > [sensekeys]
+        self.sense_tagcounts = {}  # synset key > [tag count of each sensekey]
+        self.tagcounts = defaultdict(int)
+        self.lang_data = {lang: defaultdict(lambda: ([], [], [])) for lang in self.langs}  # key > (lemmas, defs, exes)
+        self.links = {rel: defaultdict(list) for rel in RELATIONS}
+
+    def add_synset(self, sid):
+        key = synset_key(sid)
+        if key not in self.sensekeys:
+            self.sensekeys[key] = []
+            self.sense_tagcounts[key] = []
+        return key
+
+    def add_key(self, sid, sensekey, tagcount=0):
+        key = synset_key(sid)
+        self.sensekeys[key].append(sensekey)
+        self.sense_tagcounts[key].append(tagcount or 0)
+        self.tagcounts[key] += tagcount or 0
+
+    def add_lemma(self, sid, lemma, lang='eng'):
+        self.lang_data[lang][synset_key(sid)][0].append(lemma)
+
+    def add_def(self, sid, definition, lang='eng'):
+        self.lang_data[lang][synset_key(sid)][1].append(definition)
+
+    def add_example(self, sid, example, lang='eng'):
+        self.lang_data[lang][synset_key(sid)][2].append(example)
+
+    def add_link(self, rel, sid1, sid2):
+        self.links[rel][synset_key(sid1)].append(synset_key(sid2))
+
+    def to_sections(self):
+        strings = []
+        string_ids = {}
+
+        def sid_of(value):
+            value = value if value else ''
+            sid = string_ids.get(value)
+            if sid is None:
+                sid = string_ids[value] = len(strings)
+                strings.append(value)
+            return sid
+        sid_of('')  # ID 0 is the empty string
+
+        keys = sorted(self.sensekeys)
+        idx_map = {key: idx for idx, key in enumerate(keys)}
+        sections = {'keys': array(INT_TYPE, keys),
+                    'tagcount': array(INT_TYPE, (self.tagcounts[key] for key in keys))}
+
+        def add_csr(name, rows):
+            ptr = array(INT_TYPE, [0])
+            values = array(INT_TYPE)
+            for row in rows:
+                values.extend(row)
+                ptr.append(len(values))
+            sections[name + '_ptr'] = ptr
+            sections[name] = values
+
+        def add_index(name, pairs):
+            # sorted (lowercased string, synset index) pairs
+            pairs = sorted({(text.lower(), idx) for text, idx in pairs if text})
+            sections[name] = array(INT_TYPE, (sid_of(text) for text, _ in pairs))
+            sections[name + '_synset'] = array(INT_TYPE, (idx for _, idx in pairs))
+
+        add_csr('sensekeys', ([sid_of(sk) for sk in self.sensekeys[key]] for key in keys))
+        add_csr('sense_tagcount', (self.sense_tagcounts[key] for key in keys))
+        add_index('sensekey_index', ((sk, idx_map[key]) for key in keys for sk in self.sensekeys[key]))
+        for lang in self.langs:
+            data = self.lang_data[lang]
+            empty = ((), (), ())
+            for field, col in (('lemmas', 0), ('defs', 1), ('exes', 2)):
+                add_csr('{}.{}'.format(lang, field), ([sid_of(x) for x in data.get(key, empty)[col]] for key in keys))
+            add_index('{}.lemma_index'.format(lang), ((lemma, idx_map[key]) for key in keys for lemma in data.get(key, empty)[0]))
+        for rel in RELATIONS:
+            links = self.links[rel]
+            add_csr('rel.' + rel, ([idx_map[k] for k in uniquify(links.get(key, ())) if k in idx_map] for key in keys))
+        # strings
+        blob = bytearray()
+        string_ptr = array(INT_TYPE, [0])
+        for text in strings:
+            blob.extend(text.encode('utf-8'))
+            string_ptr.append(len(blob))
+        sections['strings'] = memoryview(bytes(blob))
+        sections['string_ptr'] = string_ptr
+        return sections
+
+
+def _extract_wnsql(builder, wn, ctx):
+    for row in ctx.ss.select(columns=('synsetid', 'definition')):
+        builder.add_synset(row.synsetid)
+        if row.definition:
+            builder.add_def(row.synsetid, row.definition)
+    for row in ctx.wordsense.select(columns=('synsetid', 'lemma', 'sensekey', 'tagcount'), orderby='synsetid, senseid'):
+        builder.add_lemma(row.synsetid, row.lemma)
+        builder.add_key(row.synsetid, row.sensekey, row.tagcount)
+    for row in ctx.ex.select(columns=('synsetid', 'sample'), orderby='synsetid, sampleid'):
+        builder.add_example(row.synsetid, row.sample)
+    rels = {'hype': set(wn.HYPERNYM_LINKS), 'hypo': set(wn.HYPONYM_LINKS), 'hypehypo': set(wn.HYPEHYPO_LINKS)}
+    for row in ctx.semlinks.select(columns=('synset1id', 'synset2id', 'linkid'), orderby='rowid'):
+        for rel, linkids in rels.items():
+            if row.linkid in linkids:
+                builder.add_link(rel, row.synset1id, row.synset2id)
+
+
+def _extract_omw(builder, omw, ctx):
+    for row in ctx.ss.select(columns=('synset',)):
+        builder.add_synset(row.synset)
+    for lang in builder.langs:
+        query = 'SELECT DISTINCT sense.synset, word.lemma, word.wordid FROM sense JOIN word ON word.wordid = sense.wordid WHERE word.lang=? ORDER BY sense.synset, word.wordid'
+        for synset, lemma, _ in ctx.select(query, (lang,)):
+            builder.add_lemma(synset, lemma, lang=lang)
+        for row in ctx.sdef.select('lang=?', (lang,), columns=('synset', 'def'), orderby='rowid'):
+            builder.add_def(row.synset, row[1], lang=lang)
+        for row in ctx.sex.select('lang=?', (lang,), columns=('synset', 'def'), orderby='rowid'):
+            builder.add_example(row.synset, row[1], lang=lang)
+    for row in ctx.synlink.select("link IN ('hype', 'hypo')", columns=('synset1', 'synset2', 'link'), orderby='rowid'):
+        builder.add_link(row.link, row.synset1, row.synset2)
+        builder.add_link('hypehypo', row.synset1, row.synset2)
+
+
+def _extract_gwn(builder, gwn, ctx):
+    for row in ctx.synset.select(columns=('ID',)):
+        builder.add_synset(row.ID)
+    for row in ctx.term.select(columns=('sid', 'term'), orderby='rowid'):
+        builder.add_lemma(row.sid, row.term)
+    for row in ctx.sensekey.select(columns=('sid', 'sensekey'), orderby='rowid'):
+        builder.add_key(row.sid, row.sensekey)
+    has_def = set()
+    for row in ctx.gloss.select("cat IN ('def', 'ex')", columns=('sid', 'cat', 'surface'), orderby='id'):
+        if row.cat == 'ex':
+            builder.add_example(row.sid, row.surface)
+        elif row.sid not in has_def:
+            # GlossedSynset.definition is the first definition gloss
+            has_def.add(row.sid)
+            builder.add_def(row.sid, row.surface)
+
+
+# -------------------------------------------------------------------------------
+# In-memory Wordnet
+# -------------------------------------------------------------------------------
+
+class InMemoryWordnet(HierarchyQueries, BatchLookup):
+    """ Read-only Wordnet with all synsets, lemma/sensekey indexes and hypernym/hyponym links in memory
+
+    Synsets are sorted by their integer keys and identified by their position (synset index).
+    Variable-length fields (lemmas, sensekeys, definitions, examples, links) are stored as CSR arrays,
+    e.g. lemmas of synset i are string IDs eng.lemmas[eng.lemmas_ptr[i]:eng.lemmas_ptr[i + 1]]
+    """
+
+    # backend name in cache keys
+    BACKEND = 'memory'
+    # snapshot file (when it was loaded from a file)
+    path = None
+
+    def __init__(self, sections, langs=('eng',), source=None, buffer=None):
+        self.sections = sections
+        self.buffer = buffer  # the mmap object of a memory-mapped snapshot
+        self._graph = None
+        self.langs = list(langs)
+        self.source = source
+        self._keys = sections['keys']
+        self._tagcount = sections['tagcount']
+        self._strings = sections['strings']
+        self._string_ptr = sections['string_ptr']
+        self._sensekey_index = _StringColumn(self, sections['sensekey_index'])
+        self._lemma_index = {lang: _StringColumn(self, sections['{}.lemma_index'.format(lang)]) for lang in self.langs}
+
+    # ---------------------------------------------------------------------------
+    # Building, saving and loading
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def build(source, langs=None, ctx=None):
+        """ Build an in-memory Wordnet from a WordnetSQL, OMWSQL or GWordnetSQLite object """
+        if isinstance(source, OMWSQL):
+            extract = _extract_omw
+            langs = langs if langs else ('eng',)
+        elif isinstance(source, WordnetSQL):
+            extract = _extract_wnsql
+        elif isinstance(source, GWordnetSQLite):
+            extract = _extract_gwn
+        else:
+            raise WordnetFeatureNotSupported("Cannot build an in-memory Wordnet from {}".format(type(source).__name__))
+        if extract is not _extract_omw and langs and list(langs) != ['eng']:
+            raise WordnetFeatureNotSupported("{} only provides English data".format(type(source).__name__))
+        builder = SnapshotBuilder(langs if langs else ('eng',))
+        if ctx is None:
+            with source.ctx() as ctx:
+                extract(builder, source, ctx)
+        else:
+            extract(builder, source, ctx)
+        return InMemoryWordnet(builder.to_sections(), langs=builder.langs, source=source.BACKEND)
+
+    def save(self, path):
+        """ Save this Wordnet as a binary snapshot """
+        names = sorted(self.sections)
+        offset = 0
+        section_info = []
+        for name in names:
+            section = self.sections[name]
+            size = len(section) * section.itemsize
+            section_info.append([name, section.typecode if isinstance(section, array) else section.format, offset, size])
+            offset += size + _padding(size)
+        header = json.dumps({'version': SNAPSHOT_VERSION, 'byteorder': sys.byteorder, 'langs': self.langs,
+                             'source': self.source, 'sections': section_info}).encode('utf-8')
+        with open(path, 'wb') as outfile:
+            outfile.write(SNAPSHOT_MAGIC)
+            outfile.write(len(header).to_bytes(8, 'little'))
+            outfile.write(header)
+            outfile.write(b'\0' * _padding(len(header)))
+            for name in names:
+                data = self.sections[name].tobytes()
+                outfile.write(data)
+                outfile.write(b'\0' * _padding(len(data)))
+
+    @staticmethod
+    def from_buffer(buf):
+        """ Create an in-memory Wordnet from snapshot bytes (sections are memoryviews of buf, nothing is copied) """
+        buf = memoryview(buf)
+        magic_size = len(SNAPSHOT_MAGIC)
+        if bytes(buf[:magic_size]) != SNAPSHOT_MAGIC:
+            raise WordnetException("Invalid Wordnet snapshot")
+        header_size = int.from_bytes(buf[magic_size:magic_size + 8], 'little')
+        header_start = magic_size + 8
+        header = json.loads(bytes(buf[header_start:header_start + header_size]).decode('utf-8'))
+        if header['version'] != SNAPSHOT_VERSION:
+            raise WordnetException("Unsupported snapshot version {}".format(header['version']))
+        if header['byteorder'] != sys.byteorder:
+            raise WordnetException("Snapshot was created on a {}-endian machine".format(header['byteorder']))
+        data_start = header_start + header_size + _padding(header_size)
+        sections = {}
+        for name, typecode, offset, size in header['sections']:
+            start = data_start + offset
+            sections[name] = buf[start:start + size].cast(typecode)
+        return InMemoryWordnet(sections, langs=header['langs'], source=header['source'], buffer=buf.obj)
+
+    @staticmethod
+    def load(path, use_mmap=False):
+        """ Load a binary snapshot
+
+        With use_mmap=True the file is memory-mapped (read-only) instead of being read into private memory
+        """
+        with open(path, 'rb') as infile:
+            if use_mmap:
+                wn = InMemoryWordnet.from_buffer(mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                wn = InMemoryWordnet.from_buffer(infile.read())
+        wn.path = path
+        return wn
+
+    def close(self):
+        """ Release all sections (and unmap the snapshot file). This object cannot be used afterwards. """
+        for section in self.sections.values():
+            if isinstance(section, memoryview):
+                section.release()
+        self.sections = {}
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.buffer = None
+
+    @contextmanager
+    def ctx(self):
+        """ There is no database connection, this is only for compatibility with the SQLite DAOs """
+        yield None
+
+    # ---------------------------------------------------------------------------
+    # Low level access
+    # ---------------------------------------------------------------------------
+
+    def string(self, sid):
+        return str(self._strings[self._string_ptr[sid]:self._string_ptr[sid + 1]], 'utf-8')
+
+    def _strings_of(self, name, idx):
+        ptr = self.sections[name + '_ptr']
+        values = self.sections[name]
+        return [self.string(values[i]) for i in range(ptr[idx], ptr[idx + 1])]
+
+    def _ints_of(self, name, idx):
+        ptr = self.sections[name + '_ptr']
+        return self.sections[name][ptr[idx]:ptr[idx + 1]]
+
+    def index_of(self, synsetid):
+        """ Get the synset index of a synset ID or None if it does not exist """
+        key = synset_key(synsetid)
+        idx = bisect_left(self._keys, key)
+        return idx if idx < len(self._keys) and self._keys[idx] == key else None
+
+    def _check_lang(self, lang):
+        if lang not in self._lemma_index:
+            raise WordnetFeatureNotSupported("Language {} is not available in this Wordnet".format(lang))
+
+    def _synset_at(self, idx, lang):
+        prefix = lang + '.'
+        return Synset(SynsetID.from_key(self._keys[idx]),
+                      keys=self._strings_of('sensekeys', idx),
+                      lemmas=self._strings_of(prefix + 'lemmas', idx),
+                      defs=self._defs_of(idx, lang),
+                      exes=self._strings_of(prefix + 'exes', idx),
+                      tagcount=self._tagcount[idx], lang=lang)
+
+    def _defs_of(self, idx, lang):
+        defs = self._strings_of(lang + '.defs', idx)
+        if defs and self.source == WordnetSQL.BACKEND:
+            # WordnetSQL definitions are stored as they are in the database and split when they are read (see Synset.definition)
+            return [x.strip() for x in defs[0].split(';')]
+        return defs
+
+    def _collect(self, indices, lang, synsets=None):
+        if synsets is None:
+            synsets = SynsetCollection()
+        for idx in uniquify(indices):
+            if SynsetID.from_key(self._keys[idx]) not in synsets:
+                synsets.add(self._synset_at(idx, lang))
+        return synsets
+
+    def __len__(self):
+        return len(self._keys)
+
+    # ---------------------------------------------------------------------------
+    # DAO API
+    # ---------------------------------------------------------------------------
+
+    def get_synset(self, synsetid, lang='eng', ctx=None, **kwargs):
+        self._check_lang(lang)
+        idx = self.index_of(synsetid)
+        return self._synset_at(idx, lang) if idx is not None else None
+
+    def get_synsets(self, synsetids, lang='eng', ctx=None, **kwargs):
+        """ Get synsets by synsetids (unknown synset IDs are ignored) """
+        self._check_lang(lang)
+        indices = (self.index_of(sid) for sid in synsetids)
+        return self._collect([idx for idx in indices if idx is not None], lang)
+
+    def _find_sensekey(self, sensekey):
+        sensekey = sensekey.lower()
+        idx = bisect_left(self._sensekey_index, sensekey)
+        if idx < len(self._sensekey_index) and self._sensekey_index[idx] == sensekey:
+            return self.sections['sensekey_index_synset'][idx]
+        return None
+
+    def sk2sid(self, sensekey, ctx=None, **kwargs):
+        idx = self._find_sensekey(sensekey)
+        return SynsetID.from_key(self._keys[idx]) if idx is not None else None
+
+    def get_by_key(self, sensekey, lang='eng', ctx=None, **kwargs):
+        self._check_lang(lang)
+        idx = self._find_sensekey(sensekey)
+        if idx is None:
+            raise SynsetNotFoundException("Could not find any synset with provided key {}".format(sensekey))
+        return self._synset_at(idx, lang)
+
+    def get_by_keys(self, sensekeys, lang='eng', ctx=None, **kwargs):
+        self._check_lang(lang)
+        indices = (self._find_sensekey(sk) for sk in sensekeys)
+        return self._collect([idx for idx in indices if idx is not None], lang)
+
+    def _pos_filter(self, pos):
+        if not pos:
+            return None
+        posnums = {int(POS.pos2num(p)) for p in (('a', 's') if pos == 'a' else (pos,))}
+        return lambda idx: self._keys[idx] // KEY_POS_BASE in posnums
+
+    def _search_index(self, index, synset_col, pattern):
+        """ Find synset indices of strings in a sorted string index which match a LIKE pattern """
+        pattern = pattern.lower()
+        prefix = like_prefix(pattern)
+        if prefix == pattern:
+            # exact match
+            start = bisect_left(index, pattern)
+            for i in range(start, len(index)):
+                if index[i] != pattern:
+                    break
+                yield synset_col[i]
+            return
+        matcher = like_to_regex(pattern)
+        for i in range(bisect_left(index, prefix) if prefix else 0, len(index)):
+            text = index[i]
+            if not text.startswith(prefix):
+                break
+            if matcher.fullmatch(text):
+                yield synset_col[i]
+
+    def get_synsets_by_lemma(self, lemma, lang='eng', ctx=None, **kwargs):
+        """ Get the senses of a lemma (exact match, see WordnetSQL.get_synsets_by_lemma())
+
+        Each synset holds only this lemma with the sensekeys and tag count of its sense
+        """
+        self._check_lang(lang)
+        index = self._lemma_index[lang]
+        synset_col = self.sections['{}.lemma_index_synset'.format(lang)]
+        key_lemma = lemma.replace(' ', '_').lower()
+        synsets = SynsetCollection()
+        start = bisect_left(index, lemma.lower())
+        for i in range(start, len(index)):
+            if index[i] != lemma.lower():
+                break
+            idx = synset_col[i]
+            if lemma not in self._strings_of('{}.lemmas'.format(lang), idx):
+                continue
+            senses = [(sk, count) for sk, count in zip(self._strings_of('sensekeys', idx), self._ints_of('sense_tagcount', idx))
+                      if sk.split('%')[0].lower() == key_lemma]
+            prefix = lang + '.'
+            synsets.add(Synset(SynsetID.from_key(self._keys[idx]), keys=[sk for sk, _ in senses], lemmas=[lemma],
+                               defs=self._defs_of(idx, lang), exes=self._strings_of(prefix + 'exes', idx),
+                               tagcount=sum(count for _, count in senses), lang=lang))
+        return synsets
+
+    def search(self, lemma, pos=None, lang='eng', deep_select=True, synsets=None, ignore_case=True, ctx=None, **kwargs):
+        """ Search synsets by lemma (a LIKE pattern) """
+        self._check_lang(lang)
+        indices = self._search_index(self._lemma_index[lang], self.sections['{}.lemma_index_synset'.format(lang)], lemma)
+        if not ignore_case:
+            # the lemma index is lower-cased, check the original lemmas
+            matcher = like_to_regex(lemma)
+            name = lang + '.lemmas'
+            indices = (idx for idx in indices if any(matcher.fullmatch(text) for text in self._strings_of(name, idx)))
+        pos_filter = self._pos_filter(pos)
+        if pos_filter is not None:
+            indices = filter(pos_filter, indices)
+        return self._collect(list(indices), lang, synsets=synsets)
+
+    def search_text(self, field, query, lang='eng', ignore_case=True, synsets=None):
+        """ Search synsets by text in definitions (field='defs') or examples (field='exes') """
+        self._check_lang(lang)
+        matcher = like_to_regex(query.lower() if ignore_case else query)
+        normalize = str.lower if ignore_case else str
+        name = '{}.{}'.format(lang, field)
+        ptr = self.sections[name + '_ptr']
+        values = self.sections[name]
+        indices = []
+        for idx in range(len(self._keys)):
+            for i in range(ptr[idx], ptr[idx + 1]):
+                if matcher.fullmatch(normalize(self.string(values[i]))):
+                    indices.append(idx)
+                    break
+        return self._collect(indices, lang, synsets=synsets)
+
+    def search_def(self, query, deep_select=True, ignore_case=True, lang='eng', synsets=None, ctx=None, **kwargs):
+        return self.search_text('defs', query, lang=lang, ignore_case=ignore_case, synsets=synsets)
+
+    def search_ex(self, query, deep_select=True, ignore_case=True, lang='eng', synsets=None, ctx=None, **kwargs):
+        return self.search_text('exes', query, lang=lang, ignore_case=ignore_case, synsets=synsets)
+
+    def _sensekey_sids(self, sensekeys, ctx=None):
+        for sensekey in sensekeys:
+            idx = self._find_sensekey(sensekey)
+            if idx is not None:
+                yield sensekey, self._keys[idx]
+
+    def _lemma_sids(self, patterns, pos=None, lang='eng', ctx=None):
+        self._check_lang(lang)
+        index, synset_col = self._lemma_index[lang], self.sections['{}.lemma_index_synset'.format(lang)]
+        pos_filter = self._pos_filter(pos)
+        for pattern in patterns:
+            for idx in self._search_index(index, synset_col, pattern):
+                if pos_filter is None or pos_filter(idx):
+                    yield pattern, self._keys[idx]
+
+    def _text_sids(self, field, patterns, lang='eng', ctx=None):
+        """ Match all patterns in one scan of definitions or examples """
+        self._check_lang(lang)
+        matchers = [(pattern, like_to_regex(pattern.lower())) for pattern in patterns]
+        name = '{}.{}'.format(lang, 'defs' if field == 'def' else 'exes')
+        ptr = self.sections[name + '_ptr']
+        values = self.sections[name]
+        for idx in range(len(self._keys)):
+            texts = [self.string(values[i]).lower() for i in range(ptr[idx], ptr[idx + 1])]
+            for pattern, matcher in matchers:
+                if any(matcher.fullmatch(text) for text in texts):
+                    yield pattern, self._keys[idx]
+
+    def _links(self, synsetid, rel, lang, deep_select):
+        idx = self.index_of(synsetid)
+        indices = self._ints_of('rel.' + rel, idx) if idx is not None else ()
+        if deep_select:
+            self._check_lang(lang)
+            return self._collect(indices, lang)
+        else:
+            return [Synset(SynsetID.from_key(self._keys[i])) for i in indices]
+
+    def hypernyms(self, synsetid, lang='eng', deep_select=True, ctx=None, **kwargs):
+        return self._links(synsetid, 'hype', lang, deep_select)
+
+    def hyponyms(self, synsetid, lang='eng', deep_select=True, ctx=None, **kwargs):
+        return self._links(synsetid, 'hypo', lang, deep_select)
+
+    def hypehypo(self, synsetid, ctx=None, **kwargs):
+        """ Synset keys of all hypernyms and hyponyms of a synset (a set of integers, the same as WordnetSQL.hypehypo) """
+        idx = self.index_of(synsetid)
+        return {self._keys[i] for i in self._ints_of('rel.hypehypo', idx)} if idx is not None else set()
+
+    def relation_graph(self, ctx=None):
+        """ Hypernym graph of all synsets (built from the hypernym links of this Wordnet on first use) """
+        if self._graph is None:
+            ptr, links = self.sections['rel.hype_ptr'], self.sections['rel.hype']
+            edges = ((self._keys[idx], self._keys[links[i]]) for idx in range(len(self._keys)) for i in range(ptr[idx], ptr[idx + 1]))
+            self._graph = RelationGraph.from_edges(edges, nodes=self._keys)
+        return self._graph
+
+    def get_tagcount(self, synsetid, ctx=None, **kwargs):
+        idx = self.index_of(synsetid)
+        return self._tagcount[idx] if idx is not None else None
+
+    def get_tagcounts(self, ctx=None, **kwargs):
+        """ Tag counts of all synsets (synset key > tag count) """
+        return dict(zip(self._keys, self._tagcount))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lazy synsets with deferred field groups
+
+Most callers only need the lemma or the definition of a synset. The SQLite DAOs (WordnetSQL, OMWSQL and
+GWordnetSQLite) accept a fields argument in get_synset(), get_synsets(), get_by_key(), get_by_keys(),
+the search functions and lookup_many():
+
+    wn.get_synsets(sids)                      # eager (default): all field groups are loaded
+    wn.get_synsets(sids, fields=('lemmas',))  # lemmas and sensekeys now, everything else on first access
+    wn.get_synsets(sids, fields=())           # ID and POS only
+
+Field groups are listed in the FIELD_GROUPS of each DAO ('lemmas', 'definition', 'examples' for WordnetSQL
+and OMWSQL, 'lemmas', 'glosses', 'tags' for GWordnetSQLite). InMemoryWordnet accepts fields but always returns
+complete synsets. A deferred group is loaded on first access for all synsets
+which were fetched by the same call (one query per chunk of synsets instead of one query per synset).
+Lazy synsets keep a reference to their DAO until all of their field groups are loaded.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import threading
+
+from .models import Synset
+from .common import WordnetException
+
+
+def field_groups(wn, fields):
+    """ Normalise the fields argument of a DAO to a set of field groups (None means eager loading) """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = (fields,)
+    aliases = getattr(wn, 'FIELD_ALIASES', {})
+    groups = set()
+    for field in fields:
+        group = aliases.get(field, field)
+        if group not in wn.FIELD_GROUPS:
+            raise WordnetException("Unknown field group {} (available: {})".format(field, ', '.join(wn.FIELD_GROUPS)))
+        groups.add(group)
+    return groups
+
+
+def deferred(base, name, group):
+    """ Property which loads a field group before reading the attribute name of base
+
+    The attribute is a slot or a property of base, or an instance attribute (kept in __dict__)
+    """
+    descriptor = getattr(base, name, None)
+    if descriptor is None:
+        def fget(self):
+            self._fault(group)
+            return self.__dict__[name]
+
+        def fset(self, value):
+            self.__dict__[name] = value
+        return property(fget, fset)
+
+    def fget(self):
+        self._fault(group)
+        return descriptor.__get__(self, type(self))
+
+    def fset(self, value):
+        descriptor.__set__(self, value)
+    return property(fget, fset, doc=descriptor.__doc__)
+
+
+def defer(wn, synsets, fields, ctx=None):
+    """ Attach lazy synsets to a new FaultBatch and load the field groups in fields right away """
+    batch = FaultBatch(wn, synsets)
+    for group in wn.FIELD_GROUPS:
+        if group in fields:
+            batch.load(group, ctx=ctx)
+    return batch
+
+
+def rebuild(cls):
+    """ Create an empty object of a class (for unpickling lazy objects as their base classes) """
+    return cls.__new__(cls)
+
+
+class FaultBatch:
+    """ Lazy synsets which were fetched together and load their deferred field groups together """
+
+    def __init__(self, wn, synsets):
+        self.wn = wn
+        self.synsets = list(synsets)
+        self._lock = threading.RLock()
+        self._filling = set()  # groups which are being loaded by the thread that holds the lock
+        for ss in self.synsets:
+            ss._pending = set(wn.FIELD_GROUPS)
+            ss._batch = self
+
+    def load(self, group, ctx=None):
+        """ Load a field group of all synsets in this batch which have not loaded it yet """
+        with self._lock:
+            if group in self._filling:
+                # the DAO is filling this group (e.g. add_lemma() reads synset.lemmas)
+                return
+            targets = [ss for ss in self.synsets if group in ss._pending]
+            if not targets:
+                return
+            self._filling.add(group)
+            try:
+                try:
+                    self.wn._load_fields(group, {self.wn.ensure_sid(ss.ID): ss for ss in targets}, ctx=ctx)
+                except Exception:
+                    # drop partially loaded values, the group stays deferred and will be loaded again
+                    for ss in targets:
+                        ss._clear(group)
+                    raise
+                for ss in targets:
+                    ss._pending.discard(group)
+                    if not ss._pending:
+                        ss._batch = None
+                self.synsets = [ss for ss in self.synsets if ss._pending]
+            finally:
+                self._filling.discard(group)
+
+
+class LazyFields:
+    """ Mixin for lazy synset classes (which define _pending and _batch slots and _clear()) """
+
+    __slots__ = ()
+
+    def _fault(self, group):
+        if group in self._pending:
+            batch = self._batch
+            if batch is not None:
+                batch.load(group)
+
+    def deferred_fields(self):
+        """ Field groups which have not been loaded yet """
+        return frozenset(self._pending)
+
+    def load_fields(self, *groups):
+        """ Load deferred field groups (all of them by default) of this synset and the others in its batch """
+        for group in (groups if groups else tuple(self._pending)):
+            self._fault(group)
+        return self
+
+    def __reduce_ex__(self, protocol):
+        # pickle (and copy) as a fully loaded synset of the base class
+        self.load_fields()
+        state, slots = object.__reduce_ex__(self, max(protocol, 2))[2]
+        slots = {name: value for name, value in slots.items() if name not in ('_pending', '_batch')}
+        return (rebuild, (self._base_class,), (state, slots))
+
+
+class LazySynset(LazyFields, Synset):
+    """ Synset of a WordnetSQL DAO with deferred lemmas (with sensekeys and tag count), definition and examples """
+
+    __slots__ = ('_pending', '_batch')
+    _base_class = Synset
+
+    def __init__(self, sid, **kwargs):
+        self._pending = set()
+        self._batch = None
+        super().__init__(sid, **kwargs)
+
+    lemmas = deferred(Synset, 'lemmas', 'lemmas')
+    sensekeys = deferred(Synset, 'sensekeys', 'lemmas')
+    tagcount = deferred(Synset, 'tagcount', 'lemmas')
+    definition = deferred(Synset, 'definition', 'definition')
+    definitions = deferred(Synset, 'definitions', 'definition')
+    examples = deferred(Synset, 'examples', 'examples')
+
+    def _clear(self, group):
+        """ Reset the fields of a group to their initial (empty) values """
+        if group == 'lemmas':
+            self.__dict__['lemmas'] = []
+            self.__dict__['tagcount'] = 0
+            self._Synset__keys = []
+        elif group == 'definition':
+            self._Synset__defs = []
+        elif group == 'examples':
+            self._Synset__exes = []
+
+    def add_key(self, key):
+        self._fault('lemmas')
+        super().add_key(key)
+
+    def add_def(self, definition):
+        self._fault('definition')
+        super().add_def(definition)
+
+    def add_example(self, example):
+        self._fault('examples')
+        super().add_example(example)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batched lookup of mixed queries (synset IDs, sensekeys and lemma/text patterns)
+
+lookup_many() classifies all queries up front and runs one grouped query per query type
+instead of one search_wn_full_text() call (up to six statements) per query:
+
+    results = wn.lookup_many(['02084071-n', 'dog%1:05:00::', 'cat', 'a member of the genus%'])
+    results['cat']  # SynsetCollection
+
+The number of statements depends on the number of query types, not on the number of queries
+(large batches are split into chunks to stay under SQLite's limits). When a column has a full-text index
+(see yawlib.fulltext), each pattern which can use it is looked up with one indexed statement instead.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import re
+from collections import OrderedDict
+
+from texttaglib.puchikarui import with_ctx
+from texttaglib.chirptext.leutile import uniquify
+
+from .models import SynsetID, SynsetCollection, synset_key
+from . import fulltext
+from .common import WordnetFeatureNotSupported, chunks, like_to_regex, is_like_pattern
+
+
+# lemma%ss_type:lex_filenum:lex_id:head_word:head_id, see https://wordnet.princeton.edu/documentation/senseidx5wn
+SENSEKEY_FORMAT = re.compile(r'(?P<lemma>[^%\s]+)%(?P<sstype>[1-5]):(?P<lexfile>\d{2}):(?P<lexid>\d{2}):(?P<head>[^:\s]*):(?P<headid>\d*)')
+# query types
+SYNSET_ID = 'id'
+SENSEKEY = 'key'
+TEXT = 'text'
+# number of LIKE patterns in one statement (OR chains are limited by SQLITE_MAX_EXPR_DEPTH)
+LIKE_CHUNK_SIZE = 100
+
+
+def classify(query):
+    """ Type of a query: SYNSET_ID, SENSEKEY or TEXT (lemma, definition or example) """
+    if SynsetID.WNSQL_FORMAT.fullmatch(query) or SynsetID.CANONICAL_FORMAT.fullmatch(query):
+        return SYNSET_ID
+    elif SENSEKEY_FORMAT.fullmatch(query):
+        return SENSEKEY
+    else:
+        return TEXT
+
+
+def like_any(column, patterns):
+    """ Build a `(column LIKE ? OR column LIKE ? ...)' condition for a list of patterns """
+    return '({})'.format(' OR '.join(['{} LIKE ?'.format(column)] * len(patterns)))
+
+
+def select_like_any(ctx, query, column, patterns, params=()):
+    """ Run query (a template with one {} for the condition) for each chunk of LIKE patterns
+
+    params are the values of the placeholders before the condition
+    """
+    for chunk in chunks(patterns, LIKE_CHUNK_SIZE):
+        yield from ctx.select(query.format(like_any(column, chunk)), list(params) + chunk)
+
+
+def select_patterns(ctx, query, table, column, patterns, params=(), lower=False):
+    """ Run query (a template with one {} for the condition) for a list of LIKE patterns on table.column
+
+    Patterns which can use the full-text index of table.column are looked up with one statement each,
+    the others with select_like_any() (on lower(column) and lowercased patterns when lower is True)
+    """
+    rest = patterns
+    if fulltext.has_index(ctx, table, column):
+        rest = []
+        for pattern in patterns:
+            fts_filter = fulltext.index_filter(table, column, pattern)
+            if fts_filter:
+                yield from ctx.select(query.format(fts_filter[0]), list(params) + fts_filter[1])
+            else:
+                rest.append(pattern)
+    if rest:
+        if lower:
+            yield from select_like_any(ctx, query, 'lower({}.{})'.format(table, column), [p.lower() for p in rest], params)
+        else:
+            yield from select_like_any(ctx, query, '{}.{}'.format(table, column), rest, params)
+
+
+def match_patterns(rows, patterns, literal=False):
+    """ Find out which patterns a list of (text, synsetid) rows were selected by
+
+    Patterns are case-insensitive LIKE patterns (or strings when literal is True).
+    Yield (pattern, synsetid) pairs.
+    """
+    if literal:
+        lookup = {}
+        for pattern in patterns:
+            lookup.setdefault(pattern.lower(), []).append(pattern)
+        for text, sid in rows:
+            if text is not None:
+                for pattern in lookup.get(text.lower(), ()):
+                    yield pattern, sid
+    else:
+        matchers = [(pattern, like_to_regex(pattern.lower())) for pattern in patterns]
+        for text, sid in rows:
+            if text is not None:
+                text = text.lower()
+                for pattern, matcher in matchers:
+                    if matcher.fullmatch(text):
+                        yield pattern, sid
+
+
+class BatchLookup:
+    """ Mixin for DAOs: lookup_many()
+
+    DAOs implement _sensekey_sids(), _lemma_sids() and _text_sids() with one grouped query each
+    """
+
+    # lemma queries are LIKE patterns (otherwise they are matched as they are and never wrapped)
+    LEMMA_PATTERNS = True
+
+    @with_ctx
+    def lookup_many(self, queries, pos=None, lang='eng', auto_wrap=True, fields=None, ctx=None, **kwargs):
+        """ Look up a list of synset IDs, sensekeys and lemma/text patterns at once
+
+        Each query is resolved the same way as helpers.search_wn_full_text(): synset IDs and sensekeys
+        which cannot be found are searched as text, text queries (wrapped as %query% when auto_wrap is True
+        and there is no % or _ wildcard) are searched in lemmas (filtered by pos), then definitions and examples.
+        Lemmas of DAOs which do not search lemmas by pattern (see LEMMA_PATTERNS) are matched without wrapping.
+        fields selects the field groups which are loaded up front (see yawlib.lazy).
+        Return an OrderedDict of query > SynsetCollection (in input order)
+        """
+        queries = uniquify(list(queries))
+        groups = {SYNSET_ID: [], SENSEKEY: [], TEXT: []}
+        for query in queries:
+            groups[classify(query)].append(query)
+        found = {}  # query > synset IDs
+        # 1. synset IDs
+        synsets = self.get_synsets(groups[SYNSET_ID], lang=lang, fields=fields, ctx=ctx) if groups[SYNSET_ID] else SynsetCollection()
+        for query in groups[SYNSET_ID]:
+            if query in synsets:
+                found[query] = [query]
+            else:
+                groups[TEXT].append(query)
+        # 2. sensekeys
+        if groups[SENSEKEY]:
+            try:
+                key_map = {}
+                for sensekey, sid in self._sensekey_sids(groups[SENSEKEY], ctx=ctx):
+                    key_map.setdefault(sensekey.lower(), sid)
+            except WordnetFeatureNotSupported:
+                key_map = {}
+            for query in groups[SENSEKEY]:
+                if query.lower() in key_map:
+                    found[query] = [key_map[query.lower()]]
+                else:
+                    groups[TEXT].append(query)
+        # 3. lemmas, definitions and examples
+        if groups[TEXT]:
+            patterns = OrderedDict()  # query > pattern
+            for query in groups[TEXT]:
+                wrap = auto_wrap and not is_like_pattern(query)
+                patterns[query] = '%{}%'.format(query) if wrap else query
+            lemmas = patterns if self.LEMMA_PATTERNS else OrderedDict((query, query) for query in patterns)
+            lemma_matches = {lemma: [] for lemma in lemmas.values()}
+            for lemma, sid in self._lemma_sids(uniquify(lemmas.values()), pos=pos, lang=lang, ctx=ctx):
+                lemma_matches[lemma].append(sid)
+            unique_patterns = uniquify(patterns.values())
+            matches = {pattern: [] for pattern in unique_patterns}
+            for field in ('def', 'ex'):
+                for pattern, sid in self._text_sids(field, unique_patterns, lang=lang, ctx=ctx):
+                    matches[pattern].append(sid)
+            for query, pattern in patterns.items():
+                found[query] = lemma_matches[lemmas[query]] + matches[pattern]
+        # get synset objects of sensekeys and text queries
+        found = {query: uniquify([synset_key(sid) for sid in sids]) for query, sids in found.items()}
+        missing = uniquify([key for keys in found.values() for key in keys if key not in synsets])
+        if missing:
+            synsets.merge(self.get_synsets(missing, lang=lang, fields=fields, ctx=ctx))
+        results = OrderedDict()
+        for query in queries:
+            results[query] = SynsetCollection((synsets[key] for key in found.get(query, ()) if key in synsets), lang=lang)
+        return results
+
+    def _sensekey_sids(self, sensekeys, ctx=None):
+        """ Find synset IDs of sensekeys, yield (sensekey, synsetid) pairs """
+        raise WordnetFeatureNotSupported("This function is not available for this Wordnet")
+
+    def _lemma_sids(self, patterns, pos=None, lang='eng', ctx=None):
+        """ Search lemmas by a list of patterns, yield (pattern, synsetid) pairs """
+        raise NotImplementedError
+
+    def _text_sids(self, field, patterns, lang='eng', ctx=None):
+        """ Search definitions (field='def') or examples (field='ex') by a list of patterns, yield (pattern, synsetid) pairs """
+        raise NotImplementedError
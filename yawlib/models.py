@@ -9,11 +9,12 @@ Shared data models
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
-import json
 import re
-import copy
+import json
+from functools import lru_cache
 from texttaglib.chirptext.leutile import uniquify
 from .common import WordnetException, InvalidSynsetID
+from . import serializer
 
 ########################################################################
 
@@ -45,14 +46,73 @@ class POS(object):
             return POS.pos2num_map[pos]
 
 
+# maximum number of parsed synset ID strings to be kept (WordNet 3.0 has 117,659 synsets)
+SYNSETID_CACHE_SIZE = 250000
+# synset keys are POS number * KEY_POS_BASE + offset (i.e. the WordNet SQL format, 112345678)
+KEY_POS_BASE = 100000000
+
+
 class SynsetID(object):
+    """ Immutable synset ID (offset + POS)
+
+    Each synset ID has an integer key with the POS number as its highest digit followed by the offset
+    (e.g. 112345678 for 12345678-n, the same as WordNet SQL synset IDs). Keys fit in 32 bits and are used for
+    comparing synset IDs and for looking up synsets in collections and caches.
+    SynsetIDs are hashed and compared as canonical strings: a SynsetID equals other SynsetIDs, Synsets and
+    its canonical string (e.g. '12345678-n'), so any of them can be used for the same dictionary key.
+    Other formats and integer keys must be parsed first (SynsetID.from_string() or synset_key()).
+    SynsetID.from_string() and SynsetID.from_key() return shared instances for repeated values.
+    """
 
     WNSQL_FORMAT = re.compile(r'(?P<pos>[123456nvarsx])(?P<offset>\d{8})')
     CANONICAL_FORMAT = re.compile(r'(?P<offset>\d{8})-?(?P<pos>[nvasrx])')
 
+    __slots__ = ('offset', 'pos', '_key', '_canonical', '_hash')
+
     def __init__(self, offset, pos):
-        self.offset = offset
-        self.pos = pos
+        set_attr = object.__setattr__
+        set_attr(self, 'offset', offset)
+        set_attr(self, 'pos', pos)
+        set_attr(self, '_key', int(POS.pos2num(pos)) * KEY_POS_BASE + int(offset))
+        set_attr(self, '_canonical', "{}-{}".format(offset, pos))
+        # same hash as the canonical string so that SynsetID and '12345678-n' can be used for the same dictionary key
+        set_attr(self, '_hash', hash(self._canonical))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SynsetID objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("SynsetID objects are immutable")
+
+    def __copy__(self):
+        clone = object.__new__(SynsetID)
+        for name in SynsetID.__slots__:
+            object.__setattr__(clone, name, getattr(self, name))
+        return clone
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __reduce__(self):
+        return (SynsetID, (self.offset, self.pos))
+
+    @property
+    def key(self):
+        """ Integer key of this synset ID (POS number followed by offset, e.g. 112345678) """
+        return self._key
+
+    def __int__(self):
+        return self._key
+
+    @staticmethod
+    def from_key(key, **kwargs):
+        """ Get SynsetID object of an integer synset key (e.g. 112345678) """
+        sid = _synsetid_from_key(key)
+        if sid is not None:
+            return sid
+        elif 'default' in kwargs:
+            return kwargs['default']
+        raise InvalidSynsetID("Invalid synset key (provided: {})".format(key))
 
     @staticmethod
     def from_string(synsetid, **kwargs):
@@ -61,56 +121,47 @@ class SynsetID(object):
             if 'default' in kwargs:
                 return kwargs['default']
             raise InvalidSynsetID("synsetid cannot be None")
-        m = SynsetID.WNSQL_FORMAT.match(str(synsetid))
-        if m:
-            # WNSQL_FORMAT
-            offset = m.group('offset')
-            pos = m.group('pos')
-            if pos in POS.NUMS:
-                pos = POS.num2pos(pos)
-            return SynsetID(offset, pos)
-        else:
-            # try canonical format
-            m = SynsetID.CANONICAL_FORMAT.match(str(synsetid))
-            if m:
-                offset = m.group('offset')
-                pos = m.group('pos')
-                return SynsetID(offset, pos)
-            else:
-                if 'default' in kwargs:
-                    return kwargs['default']
-                raise InvalidSynsetID("Invalid synsetid format (provided: {})".format(synsetid))
+        if isinstance(synsetid, SynsetID):
+            return synsetid
+        sid = _synsetid_from_key(synsetid) if type(synsetid) is int else _parse_synsetid(str(synsetid))
+        if sid is not None:
+            return sid
+        elif 'default' in kwargs:
+            return kwargs['default']
+        raise InvalidSynsetID("Invalid synsetid format (provided: {})".format(synsetid))
 
     def to_canonical(self):
         """ Wordnet synset ID (canonical format: 12345678-x)
         """
-        return "{offset}-{pos}".format(offset=self.offset, pos=self.pos)
+        return self._canonical
 
     def to_wnsql(self):
         """WordNet SQLite synsetID format (112345678)
            Reference: https://sourceforge.net/projects/wnsql/"""
-        return "{posnum}{offset}".format(offset=self.offset, posnum=POS.pos2num(self.pos))
+        return str(self._key)
 
     def to_gwnsql(self):
         """Gloss WordNet SQLite synsetID format (x12345678)"""
         return "{pos}{offset}".format(offset=self.offset, pos=self.pos)
 
     def __hash__(self):
-        return hash(self.to_canonical())
+        return self._hash
 
     def __eq__(self, other):
-        # make sure that the other instance is a SynsetID object
-        if other and isinstance(other, Synset):
-            other = other.ID
-        if other and not isinstance(other, SynsetID):
-            other = SynsetID.from_string(str(other))
-        return other is not None and self.offset == other.offset and self.pos == other.pos
+        # same representation as __hash__ (canonical string)
+        if isinstance(other, SynsetID):
+            return self._key == other._key
+        elif isinstance(other, Synset):
+            return other.ID is not None and self._key == other.ID._key
+        elif isinstance(other, str):
+            return self._canonical == other
+        return False
 
     def __lt__(self, other):
         # make sure that the other instance is a SynsetID object
         if other and not isinstance(other, SynsetID):
             other = SynsetID.from_string(str(other))
-        return other is not None and self.offset < other.offset and self.pos < other.pos
+        return other is not None and self._key < other._key
 
     def __repr__(self):
         return self.to_canonical()
@@ -119,6 +170,44 @@ class SynsetID(object):
         return repr(self)
 
 
+@lru_cache(maxsize=SYNSETID_CACHE_SIZE)
+def _parse_synsetid(synsetid):
+    """ Parse a synset ID string (None if it is invalid) """
+    m = SynsetID.WNSQL_FORMAT.match(synsetid)
+    if m:
+        # WNSQL_FORMAT
+        pos = m.group('pos')
+    else:
+        # try canonical format
+        m = SynsetID.CANONICAL_FORMAT.match(synsetid)
+        if not m:
+            return None
+        pos = m.group('pos')
+    posnum = pos if pos in POS.NUMS else POS.pos2num(pos)
+    # different strings of the same synset share the same SynsetID object
+    return _synsetid_from_key(int(posnum) * KEY_POS_BASE + int(m.group('offset')))
+
+
+@lru_cache(maxsize=SYNSETID_CACHE_SIZE)
+def _synsetid_from_key(key):
+    """ Create SynsetID from an integer key (None if it is invalid) """
+    posnum, offset = divmod(key, KEY_POS_BASE)
+    pos = POS.num2pos_map.get(str(posnum))
+    return SynsetID('{:08d}'.format(offset), pos) if pos else None
+
+
+def synset_key(synsetid):
+    """ Get integer key of a synset ID (SynsetID object, Synset, integer key or a synset ID string) """
+    if type(synsetid) is int:
+        # integer keys are validated like strings (POS number followed by an 8-digit offset)
+        return SynsetID.from_key(synsetid)._key
+    elif isinstance(synsetid, SynsetID):
+        return synsetid._key
+    elif isinstance(synsetid, Synset):
+        return synsetid.ID._key
+    return SynsetID.from_string(synsetid)._key
+
+
 class Synset(object):
 
     def __init__(self, sid, keys=None, lemmas=None, defs=None, exes=None, tagcount=0, lemma=None, lang='eng'):
@@ -139,10 +228,8 @@ class Synset(object):
 
     @ID.setter
     def ID(self, value):
-        if isinstance(value, SynsetID):
-            self.__sid = copy.copy(value)
-        else:
-            self.__sid = SynsetID.from_string(value)
+        # SynsetID objects are immutable and shared
+        self.__sid = SynsetID.from_string(value)
 
     @property
     def definition(self):
@@ -226,6 +313,11 @@ class Synset(object):
         """ An alias of synset.examples """
         return self.examples
 
+    def copy(self):
+        """ A copy of this synset which does not share any list with it """
+        return Synset(self.ID, keys=list(self.__keys), lemmas=list(self.lemmas) if self.lemmas is not None else None,
+                      defs=list(self.__defs), exes=list(self.__exes), tagcount=self.tagcount, lang=self.lang)
+
     def get_tokens(self):
         tokens = []
         tokens.extend(self.lemmas)
@@ -242,6 +334,10 @@ class Synset(object):
                 'tagcount': self.tagcount,
                 'examples': self.examples}
 
+    def to_json_bytes(self):
+        """ Compact UTF-8 JSON of this synset (see yawlib.serializer) """
+        return serializer.synset_json(self)
+
     def to_json_str(self):
         return json.dumps(self.to_json())
 
@@ -263,8 +359,9 @@ class SynsetCollection(object):
     """
     def __init__(self, synsets=None, lang='eng'):
         self.synsets = []
-        self.sid_map = {}
-        self.sk_map = {}
+        self.sid_map = {}  # synset key > synset
+        self._sk_map = {}
+        self._unindexed = []  # synsets which have not been added to sk_map yet
         if synsets:
             for synset in synsets:
                 self.add(synset)
@@ -272,27 +369,32 @@ class SynsetCollection(object):
 
     def add(self, synset):
         self.synsets.append(synset)
-        self.sid_map[synset.ID] = synset
-        for key in synset.sensekeys:
-            self.sk_map[key] = synset
+        self.sid_map[synset.ID._key] = synset
+        self._unindexed.append(synset)
         return self
 
+    @property
+    def sk_map(self):
+        """ sensekey > synset, built on first use so that adding lazy synsets does not load their sensekeys """
+        if self._unindexed:
+            for synset in self._unindexed:
+                for key in synset.sensekeys:
+                    self._sk_map[key] = synset
+            self._unindexed = []
+        return self._sk_map
+
     def __getitem__(self, sid):
-        if not isinstance(sid, SynsetID):
-            sid = SynsetID.from_string(sid)
-        return self.sid_map[sid]
+        return self.sid_map[synset_key(sid)]
 
     def __contains__(self, sid):
-        if not isinstance(sid, SynsetID):
-            sid = SynsetID.from_string(sid)
-        return sid in self.sid_map
+        return synset_key(sid) in self.sid_map
 
     def __len__(self):
         return self.count()
 
     def by_sid(self, sid):
-        if sid and sid in self.sid_map:
-            return self.sid_map[str(sid)]
+        if sid and sid in self:
+            return self[sid]
         else:
             return None
 
@@ -321,5 +423,12 @@ class SynsetCollection(object):
     def to_json(self):
         return [x.to_json() for x in self]
 
+    def to_json_bytes(self):
+        return serializer.synsets_json(self)
+
+    def iter_json(self, chunk_size=serializer.DEFAULT_CHUNK_SIZE):
+        """ Stream the JSON array of this collection as chunks of bytes """
+        return serializer.iter_synsets_json(self, chunk_size=chunk_size)
+
     def to_json_str(self):
         return json.dumps(self.to_json())
@@ -11,8 +11,17 @@ Open Multi-lingual WordNet - SQLite adaptor
 
 import logging
 from texttaglib.puchikarui import Schema, with_ctx
-from yawlib.models import SynsetID, Synset, SynsetCollection
+from texttaglib.chirptext.leutile import uniquify
+from yawlib.models import SynsetID, Synset, SynsetCollection, synset_key
 from yawlib.common import WordnetFeatureNotSupported, InvalidSynsetID
+from yawlib.common import chunks, in_clause, create_nocase_indexes
+from yawlib import fulltext
+from yawlib.cache import cached
+from yawlib.relgraph import RelationGraph, HierarchyQueries
+from yawlib.pool import PooledSchema
+from yawlib.profiling import ProfiledSchema
+from yawlib.lookup import BatchLookup, select_patterns, match_patterns
+from yawlib.lazy import LazySynset, field_groups, defer
 
 
 def getLogger():
@@ -30,36 +39,99 @@ class OMWNTUMCSchema(Schema):
         self.add_table('synset_ex', 'synset lang def sid'.split(), alias='sex')
 
 
-class OMWSQL(OMWNTUMCSchema):
-    def __init__(self, db_path, *args, **kwargs):
+class OMWSQL(ProfiledSchema, PooledSchema, OMWNTUMCSchema, HierarchyQueries, BatchLookup):
+
+    # backend name in cache keys
+    BACKEND = 'omw'
+
+    # (table, column) pairs which can be indexed for full-text search
+    FTS_INDEXES = (('word', 'lemma'), ('synset_def', 'def'), ('synset_ex', 'def'))
+    # case-insensitive indexes for lemma lookup
+    NOCASE_INDEXES = (('word', 'lemma'),)
+    # synlink.link values of hypernym links (hypernym, instance hypernym) in the relation graph
+    HYPERNYM_LINKS = ('hype', 'inst')
+    # field groups which can be deferred (see yawlib.lazy)
+    FIELD_GROUPS = ('lemmas', 'definition', 'examples')
+    FIELD_ALIASES = {'definitions': 'definition'}
+
+    def __init__(self, db_path, *args, cache=None, pool_size=None, profile=False, **kwargs):
         super().__init__(db_path, *args, **kwargs)
         self.db_path = db_path
+        # an optional SynsetCache (see yawlib.cache), which may be shared with other DAOs
+        self.cache = cache
+        # borrow read-only connections from a pool instead of opening one per call (see yawlib.pool)
+        if pool_size:
+            self.enable_pool(pool_size)
+        # record SQL statement statistics (see yawlib.profiling)
+        if profile:
+            self.enable_profiling()
+        self._graph = None
+
+    def cache_key(self, lang, *parts):
+        return (self.BACKEND, lang) + parts
 
     @with_ctx
-    def get_synset(self, synsetid, lang='eng', ctx=None):
-        synsetid = self.ensure_sid(synsetid)
-        res = ctx.synset.by_id(synsetid)
-        synset = Synset(res.synset, lang=lang)
-        # select lemma
-        words = ctx.word.select('wordid in (SELECT wordid FROM sense WHERE synset=?) and lang=?', (synsetid, lang))
-        synset.lemmas.extend((w.lemma for w in words))
-        # select defs
-        def_rows = ctx.sdef.select("synset=? AND lang=?", (synsetid, lang))
-        for row in def_rows:
-            synset.definitions.append(row._2)
-        # examples
-        exes = ctx.sex.select('synset=? and lang=?', (synsetid, lang))
-        synset.examples.extend([e._2 for e in exes])
-        return synset
-
-    @with_ctx
-    def get_synsets(self, synsetids, lang='eng', ctx=None):
-        ''' Get synsets by synsetids '''
-        synsets = SynsetCollection()
-        for sid in synsetids:
-            ss = self.get_synset(sid, lang=lang, ctx=ctx)
-            synsets.add(ss)
-        return synsets
+    def get_synset(self, synsetid, lang='eng', fields=None, ctx=None):
+        synsets = self.get_synsets((synsetid,), lang=lang, fields=fields, ctx=ctx)
+        return synsets.synsets[0] if synsets else None
+
+    @with_ctx
+    def get_synsets(self, synsetids, lang='eng', fields=None, ctx=None):
+        """ Get synsets by synsetids
+
+        Synsets, lemmas, definitions and examples are fetched for the whole list using IN (...) queries
+        (split into chunks to stay under SQLite's variable limit) and then assembled in memory.
+        When fields is given, only these field groups (see FIELD_GROUPS) are fetched now and
+        the others are fetched on first access (see yawlib.lazy).
+        Synset IDs that cannot be found are ignored.
+        """
+        sids = uniquify([self.ensure_sid(sid) for sid in synsetids])
+        groups = field_groups(self, fields)
+        synset_map = {}
+        missing = sids
+        if self.cache is not None:
+            missing = []
+            for sid in sids:
+                ss = self.cache.get(self.cache_key(lang, synset_key(sid)))
+                if ss is None:
+                    missing.append(sid)
+                else:
+                    # callers may modify their synsets, so the cached ones are copied
+                    synset_map[sid] = ss.copy()
+        loaded = {}
+        synset_class = Synset if groups is None else LazySynset
+        for chunk in chunks(missing):
+            for row in ctx.synset.select(in_clause('synset', chunk), chunk, columns=('synset',)):
+                loaded[row.synset] = synset_class(row.synset, lang=lang)
+        if groups is None:
+            for group in self.FIELD_GROUPS:
+                self._load_fields(group, loaded, ctx=ctx)
+            # only complete synsets are cached
+            if self.cache is not None:
+                for sid, ss in loaded.items():
+                    self.cache.put(self.cache_key(lang, synset_key(sid)), ss.copy())
+        elif loaded:
+            defer(self, loaded.values(), groups, ctx=ctx)
+        synset_map.update(loaded)
+        return SynsetCollection((synset_map[sid] for sid in sids if sid in synset_map), lang=lang)
+
+    @with_ctx
+    def _load_fields(self, group, synset_map, ctx=None):
+        """ Fetch a field group (see FIELD_GROUPS) of synsets (a dict of synset ID > synset of the same language) """
+        if not synset_map:
+            return
+        lang = next(iter(synset_map.values())).lang
+        for chunk in chunks(list(synset_map)):
+            if group == 'lemmas':
+                query = 'SELECT DISTINCT sense.synset, word.wordid, word.lemma FROM word JOIN sense ON sense.wordid = word.wordid WHERE word.lang=? AND {} ORDER BY word.wordid'
+                for sid, _, lemma in ctx.select(query.format(in_clause('sense.synset', chunk)), [lang] + chunk):
+                    synset_map[sid].lemmas.append(lemma)
+            elif group == 'definition':
+                for row in ctx.sdef.select('lang=? AND {}'.format(in_clause('synset', chunk)), [lang] + chunk, columns=('synset', 'def'), orderby='rowid'):
+                    synset_map[row.synset].definitions.append(row[1])
+            elif group == 'examples':
+                for row in ctx.sex.select('lang=? AND {}'.format(in_clause('synset', chunk)), [lang] + chunk, columns=('synset', 'def'), orderby='rowid'):
+                    synset_map[row.synset].examples.append(row[1])
 
     def ensure_sid(self, synsetid):
         if isinstance(synsetid, SynsetID):
@@ -82,39 +154,63 @@ class OMWSQL(OMWNTUMCSchema):
     def sk2sid(self, sensekey, ctx=None):
         raise WordnetFeatureNotSupported("This function is not available for this Wordnet")
 
-    @with_ctx
-    def hypernyms(self, synsetid, lang='eng', deep_select=True, ctx=None):
+    def _links(self, synsetid, links, lang, deep_select, ctx):
+        """ Get synsets linked to a synset (links is a tuple of link types, e.g. ('hype',)) """
         synsetid = self.ensure_sid(synsetid)
-        synsetids = ctx.synlink.select("synset1=? and link='hype'", (synsetid,), columns=('synset2',))
+
+        def find_links():
+            where = "synset1=? and link in ({})".format(','.join('?' * len(links)))
+            return tuple(x.synset2 for x in ctx.synlink.select(where, (synsetid,) + links, columns=('synset2',)))
+        synsetids = cached(self.cache, self.cache_key(lang, 'links', links, synset_key(synsetid)), find_links)
         if deep_select:
-            return self.get_synsets(synsetids=(x.synset2 for x in synsetids), lang=lang, ctx=ctx)
+            return self.get_synsets(synsetids=synsetids, lang=lang, ctx=ctx)
         else:
             return [Synset(sid) for sid in synsetids]
 
+    @with_ctx
+    def hypernyms(self, synsetid, lang='eng', deep_select=True, ctx=None):
+        return self._links(synsetid, ('hype',), lang, deep_select, ctx)
+
     @with_ctx
     def hyponyms(self, synsetid, lang='eng', deep_select=True, ctx=None):
-        synsetid = self.ensure_sid(synsetid)
-        synsetids = ctx.synlink.select("synset1=? and link='hypo'", (synsetid,), columns=('synset2',))
-        if deep_select:
-            return self.get_synsets(synsetids=(x.synset2 for x in synsetids), lang=lang, ctx=ctx)
-        else:
-            return [Synset(sid) for sid in synsetids]
+        return self._links(synsetid, ('hypo',), lang, deep_select, ctx)
 
     @with_ctx
     def hypehypo(self, synsetid, lang='eng', deep_select=True, ctx=None):
-        synsetid = self.ensure_sid(synsetid)
-        synsetids = ctx.synlink.select("synset1=? and link in ('hypo', 'hype')", (synsetid,), columns=('synset2',))
-        if deep_select:
-            return self.get_synsets(synsetids=(x.synset2 for x in synsetids), lang=lang, ctx=ctx)
-        else:
-            return [Synset(sid) for sid in synsetids]
+        return self._links(synsetid, ('hypo', 'hype'), lang, deep_select, ctx)
+
+    @with_ctx
+    def relation_graph(self, ctx=None):
+        """ Hypernym graph of all synsets (built from synlink on first use and then kept in memory) """
+        if self._graph is None:
+            where = "link in ({})".format(','.join('?' * len(self.HYPERNYM_LINKS)))
+            links = ctx.synlink.select(where, self.HYPERNYM_LINKS, columns=('synset1', 'synset2'))
+            synsets = ctx.ss.select(columns=('synset',))
+            self._graph = RelationGraph.from_edges(links, nodes=(row.synset for row in synsets))
+        return self._graph
+
+    @with_ctx
+    def get_tagcounts(self, lang='eng', ctx=None, **kwargs):
+        """ Sense frequencies of all synsets (canonical synset ID > sum of sense.freq) """
+        rows = ctx.select('SELECT synset, SUM(freq) FROM sense WHERE lang=? GROUP BY synset', (lang,))
+        return {sid: count for sid, count in rows}
 
     @with_ctx
     def search(self, lemma, pos=None, lang='eng', deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
-        if ignore_case:
-            wid_filter = ['lower(lemma) LIKE ?', 'lang=?']
-            params = [lemma.lower(), lang]
+        senses = cached(self.cache, self.cache_key(lang, 'search', lemma, pos, ignore_case),
+                        lambda: self._search_senses(lemma, pos, lang, ignore_case, ctx))
+        if synsets is None:
+            synsets = SynsetCollection()
+        # senses are filtered by lang
+        return synsets.merge(self.get_synsets([sid for sid, _ in senses if sid not in synsets], lang=lang, fields=kwargs.get('fields'), ctx=ctx))
+
+    def _search_senses(self, lemma, pos, lang, ignore_case, ctx):
+        fts_filter = fulltext.rowid_filter(ctx, 'word', 'lemma', lemma) if ignore_case else None
+        if fts_filter:
+            wid_filter = [fts_filter[0], 'lang=?']
+            params = fts_filter[1] + [lang]
         else:
+            # LIKE is case-insensitive and can use the word_lemma_nocase index
             wid_filter = ['lemma LIKE ?', 'lang=?']
             params = [lemma, lang]
         if pos is not None:
@@ -125,44 +221,61 @@ class OMWSQL(OMWNTUMCSchema):
         query.append('lang=?')
         params.append(lang)
         senses = ctx.sense.select(' AND '.join(query), params, columns=('synset', 'lang',))
-        if synsets is None:
-            synsets = SynsetCollection()
-        for sense in senses:
-            if sense.synset not in synsets:
-                synsets.add(self.get_synset(sense.synset, lang=sense.lang, ctx=ctx))
-        return synsets
+        return tuple((sense.synset, sense.lang) for sense in senses)
 
     @with_ctx
-    def search_def(self, query, deep_select=True, ignore_case=True, lang='eng', synsets=None, ctx=None, **kwargs):
+    def search_text(self, table, query, ignore_case=True, lang='eng', synsets=None, fields=None, ctx=None):
+        """ Search synsets by text in synset_def or synset_ex table
+
+        The full-text index of the table is used when it is available (results are ranked by relevance),
+        otherwise the table will be scanned using LIKE
+        """
+        rows = None
         if ignore_case:
-            where = ['lower(def) LIKE ?', 'lang=?']
-            params = [query.lower(), lang]
-        else:
-            where = ['def LIKE ?', 'lang=?']
-            params = [query, lang]
-        synsetinfos = ctx.sdef.select(' AND '.join(where), params, columns=('synset',))
+            rows = fulltext.search(ctx, table, 'def', query, columns=('synset',), where='{}.lang=?'.format(table), values=[lang])
+        if rows is None:
+            if ignore_case:
+                where = ['lower(def) LIKE ?', 'lang=?']
+                params = [query.lower(), lang]
+            else:
+                where = ['def LIKE ?', 'lang=?']
+                params = [query, lang]
+            rows = getattr(ctx, table).select(' AND '.join(where), params, columns=('synset',))
         if synsets is None:
             synsets = SynsetCollection()
-        for sinfo in synsetinfos:
-            if sinfo.synset not in synsets:
-                synsets.add(self.get_synset(sinfo.synset, lang=lang, ctx=ctx))
-        return synsets
+        return synsets.merge(self.get_synsets([r.synset for r in rows if r.synset not in synsets], lang=lang, fields=fields, ctx=ctx))
+
+    @with_ctx
+    def search_def(self, query, deep_select=True, ignore_case=True, lang='eng', synsets=None, ctx=None, **kwargs):
+        return self.search_text('synset_def', query, ignore_case=ignore_case, lang=lang, synsets=synsets, fields=kwargs.get('fields'), ctx=ctx)
 
     @with_ctx
     def search_ex(self, query, deep_select=True, ignore_case=True, lang='eng', synsets=None, ctx=None, **kwargs):
-        if ignore_case:
-            where = ['lower(def) LIKE ?', 'lang=?']
-            params = [query.lower(), lang]
-        else:
-            where = ['def LIKE ?', 'lang=?']
-            params = [query, lang]
-        synsetinfos = ctx.sex.select(' AND '.join(where), params, columns=('synset',))
-        if synsets is None:
-            synsets = SynsetCollection()
-        for sinfo in synsetinfos:
-            if sinfo.synset not in synsets:
-                synsets.add(self.get_synset(sinfo.synset, lang=lang, ctx=ctx))
-        return synsets
+        return self.search_text('synset_ex', query, ignore_case=ignore_case, lang=lang, synsets=synsets, fields=kwargs.get('fields'), ctx=ctx)
+
+    def _lemma_sids(self, patterns, pos=None, lang='eng', ctx=None):
+        query = 'SELECT word.lemma, sense.synset FROM word JOIN sense ON sense.wordid = word.wordid WHERE word.lang=? AND sense.lang=? AND '
+        params = [lang, lang]
+        if pos is not None:
+            query += 'word.pos = ? AND '
+            params.append(pos)
+        rows = select_patterns(ctx, query + '{}', 'word', 'lemma', patterns, params)
+        return match_patterns(rows, patterns)
+
+    def _text_sids(self, field, patterns, lang='eng', ctx=None):
+        table = 'synset_def' if field == 'def' else 'synset_ex'
+        rows = select_patterns(ctx, 'SELECT def, synset FROM {} WHERE lang=? AND {{}}'.format(table), table, 'def', patterns, [lang], lower=True)
+        return match_patterns(rows, patterns)
+
+    @with_ctx
+    def upgrade_schema(self, ctx=None):
+        """ Create case-insensitive indexes for lemma lookup """
+        create_nocase_indexes(ctx, self.NOCASE_INDEXES)
+
+    @with_ctx
+    def build_fts_index(self, ctx=None):
+        """ Build full-text search indexes for lemmas, definitions and examples """
+        fulltext.build_indexes(ctx, self.FTS_INDEXES)
 
     @with_ctx
     def get_synset_def(self, sid_str, lang='eng', ctx=None):
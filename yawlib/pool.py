@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pool of long-lived read-only SQLite connections for Wordnet DAOs
+
+Connections are opened lazily (up to the pool size) with `mode=ro' URIs (optionally `immutable=1')
+and tuned with cache_size and mmap_size pragmas, so that SQLite's page cache survives between calls.
+They are handed out as execution contexts which can be given to any DAO method (ctx=...).
+Closing a pooled context returns its connection to the pool.
+
+    pool = ConnectionPool(wn, size=4)
+    with pool.acquire() as ctx:
+        wn.get_synset('01775164-v', ctx=ctx)
+
+DAOs (WordnetSQL, OMWSQL, GWordnetSQLite) can also borrow from their own pool for every call
+without ctx, see PooledSchema.enable_pool() and the pool_size argument of their constructors.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+from texttaglib.puchikarui.puchikarui import ExecutionContext
+
+from .common import WordnetException
+
+
+DEFAULT_POOL_SIZE = 4
+# page cache of each connection in KiB (PRAGMA cache_size=-N)
+DEFAULT_CACHE_SIZE = 65536
+# maximum number of bytes of the database file to be memory-mapped (PRAGMA mmap_size)
+DEFAULT_MMAP_SIZE = 268435456
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+class PoolTimeout(WordnetException):
+
+    def __init__(self, timeout):
+        self.message = "No connection was available after {} seconds".format(timeout)
+
+
+class PooledContext(ExecutionContext):
+    """ An execution context which uses a pooled connection, close() returns the connection to its pool """
+
+    def __init__(self, conn, schema, pool):
+        # ExecutionContext.__init__ is not called because it opens a new connection
+        self.conn = conn
+        self.cur = conn.cursor()
+        self.schema = schema
+        self.auto_commit = False
+        self.pool = pool
+        self.depth = 0  # number of nested checkouts by the owner thread
+
+    def close(self):
+        if self.depth > 0:
+            self.pool.release(self)
+
+    def disconnect(self):
+        """ Close the underlying connection """
+        try:
+            self.conn.close()
+        except Exception:
+            getLogger().exception("Error while closing pooled connection")
+        self.conn = None
+
+
+class ConnectionPool:
+    """ Thread-safe pool of read-only connections to the database of a DAO (WordnetSQL, OMWSQL, GWordnetSQLite)
+
+    A thread which already holds a connection of this pool gets the same connection again (nested calls
+    cannot dead-lock). Use immutable=True only if the database file is never modified while it is open.
+    """
+
+    def __init__(self, schema, size=DEFAULT_POOL_SIZE, db_path=None, immutable=False,
+                 cache_size=DEFAULT_CACHE_SIZE, mmap_size=DEFAULT_MMAP_SIZE):
+        if size is None or size <= 0:
+            raise ValueError("Pool size must be a positive number")
+        self.schema = schema
+        self.db_path = db_path if db_path else schema.ds.path
+        self.size = size
+        self.immutable = immutable
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.__idle = queue.LifoQueue()  # the most recently used connection has the warmest page cache
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__opened = 0
+        self.__closed = False
+        # metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def uri(self):
+        uri = '{}?mode=ro'.format(Path(self.db_path).absolute().as_uri())
+        return uri + '&immutable=1' if self.immutable else uri
+
+    def connect(self):
+        """ Open a new read-only connection """
+        # connections are used by one thread at a time but not always by the thread which opened them
+        conn = sqlite3.connect(self.uri(), uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if self.cache_size:
+            conn.execute('PRAGMA cache_size=-{:d}'.format(self.cache_size))
+        if self.mmap_size:
+            conn.execute('PRAGMA mmap_size={:d}'.format(self.mmap_size))
+        return conn
+
+    def acquire(self, timeout=None):
+        """ Borrow a context (use it in a with statement or close() it to give it back) """
+        if self.__closed:
+            raise WordnetException("Connection pool was closed")
+        ctx = getattr(self.__local, 'ctx', None)
+        if ctx is not None:
+            ctx.depth += 1
+            return ctx
+        started = time.perf_counter()
+        waited = False
+        try:
+            ctx = self.__idle.get_nowait()
+        except queue.Empty:
+            with self.__lock:
+                opening = self.__opened < self.size
+                if opening:
+                    self.__opened += 1
+            if opening:
+                try:
+                    ctx = PooledContext(self.connect(), self.schema, self)
+                except Exception:
+                    with self.__lock:
+                        self.__opened -= 1
+                    raise
+            else:
+                waited = True
+                try:
+                    ctx = self.__idle.get(timeout=timeout)
+                except queue.Empty:
+                    with self.__lock:
+                        self.timeouts += 1
+                    raise PoolTimeout(timeout)
+        elapsed = time.perf_counter() - started
+        with self.__lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.total_wait += elapsed
+                self.max_wait = max(self.max_wait, elapsed)
+        ctx.depth = 1
+        self.__local.ctx = ctx
+        return ctx
+
+    def release(self, ctx):
+        ctx.depth -= 1
+        if ctx.depth > 0:
+            return
+        self.__local.ctx = None
+        if self.__closed:
+            ctx.disconnect()
+        else:
+            self.__idle.put(ctx)
+
+    def close(self):
+        """ Close all idle connections (connections in use are closed when they are released) """
+        self.__closed = True
+        while True:
+            try:
+                self.__idle.get_nowait().disconnect()
+            except queue.Empty:
+                break
+
+    @property
+    def opened(self):
+        return self.__opened
+
+    @property
+    def idle(self):
+        return self.__idle.qsize()
+
+    def stats(self):
+        """ Pool usage and checkout wait-time metrics (in seconds) """
+        with self.__lock:
+            return {'size': self.size, 'opened': self.__opened, 'idle': self.idle,
+                    'in_use': self.__opened - self.idle,
+                    'checkouts': self.checkouts, 'waits': self.waits, 'timeouts': self.timeouts,
+                    'total_wait': self.total_wait, 'max_wait': self.max_wait,
+                    'avg_wait': self.total_wait / self.waits if self.waits else 0.0}
+
+
+class PooledSchema:
+    """ Mixin for DAOs: ctx() borrows a connection from the pool of this DAO when the pool is enabled
+
+    Pooled connections are read-only, don't enable the pool on a DAO which is used for inserting data.
+    """
+
+    pool = None
+
+    def enable_pool(self, size=DEFAULT_POOL_SIZE, **kwargs):
+        if self.pool is not None:
+            self.pool.close()
+        self.pool = ConnectionPool(self, size=size, **kwargs)
+        return self.pool
+
+    def disable_pool(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def ctx(self):
+        """ Borrow a pooled context or open a new one if there is no pool """
+        return self.pool.acquire() if self.pool is not None else super().ctx()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in SQL instrumentation for Wordnet DAOs
+
+When profiling is enabled on a DAO (WordnetSQL, OMWSQL, GWordnetSQLite), every statement which is executed
+through its execution contexts is recorded by statement template (IN lists of any length share one template)
+with its call count, rows returned, total and percentile latency, and the EXPLAIN QUERY PLAN of its first execution.
+
+    wn = WordnetSQL(YLConfig.WNSQL30_PATH)
+    profiler = wn.enable_profiling()
+    wn.search('dog')
+    print(profiler.report())
+
+Latency includes fetching all rows (rows are fetched eagerly while profiling is enabled).
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import re
+import math
+import time
+import random
+import logging
+import threading
+
+
+# number of latency samples kept for each statement template (reservoir sampling)
+SAMPLE_SIZE = 1024
+PERCENTILES = (50, 90, 99)
+
+_IN_LIST = re.compile(r'\b(IN\s*)\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_LIKE_ANY = re.compile(r'\((\S+ LIKE \?)(?: OR \1)*\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def normalize_query(query):
+    """ Statement template of a query: whitespace is collapsed, IN lists of placeholders become `IN (?, ...)'
+    and chains of LIKE conditions on a column (see yawlib.lookup) become `(column LIKE ? OR ...)'
+    """
+    query = _IN_LIST.sub(r'\1(?, ...)', _SPACES.sub(' ', query).strip())
+    return _LIKE_ANY.sub(r'(\1 OR ...)', query)
+
+
+def percentile(samples, p):
+    """ Nearest-rank percentile of sorted samples (0.0 if there is none) """
+    if not samples:
+        return 0.0
+    rank = math.ceil(p / 100.0 * len(samples))
+    return samples[min(max(rank, 1), len(samples)) - 1]
+
+
+class QueryStats:
+    """ Statistics of a statement template """
+
+    def __init__(self, template):
+        self.template = template
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        self.plan = None
+
+    def record(self, elapsed, rows):
+        self.calls += 1
+        self.rows += rows
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(elapsed)
+        else:
+            pos = random.randrange(self.calls)
+            if pos < SAMPLE_SIZE:
+                self.samples[pos] = elapsed
+
+    def percentile(self, p):
+        """ Latency percentile (in seconds) """
+        return percentile(sorted(self.samples), p)
+
+    def to_dict(self):
+        stats = {'template': self.template, 'calls': self.calls, 'rows': self.rows,
+                 'total': self.total, 'mean': self.total / self.calls if self.calls else 0.0, 'max': self.max}
+        for p in PERCENTILES:
+            stats['p{}'.format(p)] = self.percentile(p)
+        stats['plan'] = self.plan
+        return stats
+
+
+class FetchedCursor:
+    """ Rows of a profiled query which were fetched eagerly, with the cursor API used by puchikarui and yawlib """
+
+    def __init__(self, cursor, rows):
+        self.description = cursor.description
+        self.lastrowid = cursor.lastrowid
+        self.rowcount = cursor.rowcount
+        self.__rows = rows
+        self.__pos = 0
+
+    def fetchone(self):
+        if self.__pos >= len(self.__rows):
+            return None
+        self.__pos += 1
+        return self.__rows[self.__pos - 1]
+
+    def fetchmany(self, size=1):
+        rows = self.__rows[self.__pos:self.__pos + size]
+        self.__pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.__rows[self.__pos:]
+        self.__pos = len(self.__rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+class QueryProfiler:
+    """ Thread-safe collector of statement statistics, which can be shared by several DAOs """
+
+    def __init__(self, explain=True):
+        self.explain = explain
+        self.__stats = {}
+        self.__lock = threading.Lock()
+
+    def attach(self, ctx):
+        """ Record all statements executed by an execution context (pooled contexts stay attached) """
+        if ctx.__dict__.get('_profiler') is not self:
+            execute = type(ctx).execute.__get__(ctx)
+            ctx.execute = lambda query, params=None: self.execute(ctx, execute, query, params)
+            ctx._profiler = self
+        return ctx
+
+    def _explain(self, ctx, query, params):
+        try:
+            rows = ctx.conn.execute('EXPLAIN QUERY PLAN ' + query, params if params else ()).fetchall()
+            return [row[-1] for row in rows]
+        except Exception as e:
+            # e.g. statements which cannot be explained
+            getLogger().debug("Could not explain query {} (error: {})".format(query, e))
+            return []
+
+    def execute(self, ctx, execute, query, params=None):
+        if getattr(ctx.schema, 'profiler', self) is not self:
+            # profiling was disabled on the DAO after this (pooled) context was attached
+            return execute(query, params)
+        template = normalize_query(query)
+        with self.__lock:
+            stats = self.__stats.get(template)
+            if stats is None:
+                stats = self.__stats[template] = QueryStats(template)
+                first = True
+            else:
+                first = False
+        if first and self.explain:
+            stats.plan = self._explain(ctx, query, params)
+        started = time.perf_counter()
+        cursor = execute(query, params)
+        if cursor.description is not None:
+            rows = cursor.fetchall()
+            cursor, count = FetchedCursor(cursor, rows), len(rows)
+        else:
+            count = max(cursor.rowcount, 0)
+        elapsed = time.perf_counter() - started
+        with self.__lock:
+            stats.record(elapsed, count)
+        return cursor
+
+    def stats(self, sort_by='total'):
+        """ Statistics of all statement templates (list of dicts, slowest first) """
+        with self.__lock:
+            items = [s.to_dict() for s in self.__stats.values()]
+        return sorted(items, key=lambda s: s[sort_by], reverse=True)
+
+    def reset(self):
+        with self.__lock:
+            self.__stats.clear()
+
+    def report(self, sort_by='total', limit=None, plans=False):
+        """ Statement statistics as a text table (latency in milliseconds) """
+        lines = ['{:>7} {:>8} {:>10} {:>8} {:>8} {:>8} {:>8}  {}'.format('calls', 'rows', 'total', 'mean', 'p50', 'p90', 'p99', 'statement')]
+        for s in self.stats(sort_by=sort_by)[:limit]:
+            lines.append('{:>7} {:>8} {:>10.2f} {:>8.3f} {:>8.3f} {:>8.3f} {:>8.3f}  {}'.format(
+                s['calls'], s['rows'], s['total'] * 1000, s['mean'] * 1000,
+                s['p50'] * 1000, s['p90'] * 1000, s['p99'] * 1000, s['template']))
+            if plans and s['plan']:
+                lines.extend(' ' * 67 + step for step in s['plan'])
+        return '\n'.join(lines)
+
+
+class ProfiledSchema:
+    """ Mixin for DAOs: when profiling is enabled, all contexts of this DAO record their statements """
+
+    profiler = None
+
+    def enable_profiling(self, profiler=None):
+        """ Start recording statements (into a new profiler or a shared one) """
+        if profiler is None:
+            profiler = self.profiler if self.profiler is not None else QueryProfiler()
+        self.profiler = profiler
+        return profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+
+    def instrument(self, ctx):
+        """ Attach the profiler of this DAO (if profiling is enabled) to a context which was not created by ctx() """
+        return self.profiler.attach(ctx) if self.profiler is not None else ctx
+
+    def ctx(self):
+        return self.instrument(super().ctx())
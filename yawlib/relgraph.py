@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hypernym/hyponym graph stored as CSR integer arrays with a precomputed transitive closure
+
+The graph is built once from hypernym links (semlinks, synlink, in-memory snapshots) and answers
+hierarchy queries (ancestors, depth, path to root, shortest path, lowest common hypernyms) without any database query.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+from .models import SynsetID, synset_key
+from .common import SynsetNotFoundException, INT_TYPE
+from .similarity import Similarity
+
+
+def _csr(rows):
+    ptr = array(INT_TYPE, [0])
+    values = array(INT_TYPE)
+    for row in rows:
+        values.extend(row)
+        ptr.append(len(values))
+    return ptr, values
+
+
+class RelationGraph:
+    """ Hypernym graph of synsets
+
+    Nodes are synsets sorted by their integer keys and identified by their position (node index).
+    Hypernyms of node i are parents[parent_ptr[i]:parent_ptr[i + 1]] (children are stored the same way).
+    The closure of node i lists all of its ancestors (sorted by node index) with their distances.
+    """
+
+    def __init__(self, keys, parent_ptr, parents):
+        self.keys = keys
+        self.parent_ptr = parent_ptr
+        self.parents = parents
+        self.child_ptr, self.children = self._reverse()
+        self.min_depth = array(INT_TYPE, [0]) * len(keys)
+        self.max_depth = array(INT_TYPE, [0]) * len(keys)
+        self.closure_ptr, self.closure, self.closure_dist = self._build_closure()
+
+    @staticmethod
+    def from_edges(edges, nodes=()):
+        """ Build a graph from (synset, hypernym) pairs. Synsets without any link can be added with nodes """
+        links = {}
+        for sid in nodes:
+            links.setdefault(synset_key(sid), set())
+        for sid, hypernym in edges:
+            parent = synset_key(hypernym)
+            links.setdefault(parent, set())
+            links.setdefault(synset_key(sid), set()).add(parent)
+        keys = array(INT_TYPE, sorted(links))
+        idx_map = {key: idx for idx, key in enumerate(keys)}
+        parent_ptr, parents = _csr(sorted(idx_map[p] for p in links[key]) for key in keys)
+        return RelationGraph(keys, parent_ptr, parents)
+
+    def _reverse(self):
+        rows = [[] for _ in self.keys]
+        for idx in range(len(self.keys)):
+            for parent in self.parents_of(idx):
+                rows[parent].append(idx)
+        return _csr(rows)
+
+    def _build_closure(self):
+        """ Compute ancestors and depths of all nodes, parents first (Kahn's algorithm) """
+        size = len(self.keys)
+        closures = [None] * size
+        pending = array(INT_TYPE, (self.parent_ptr[i + 1] - self.parent_ptr[i] for i in range(size)))
+        queue = deque(i for i in range(size) if not pending[i])
+        while queue:
+            idx = queue.popleft()
+            closure = {}
+            min_depth, max_depth = None, 0
+            for parent in self.parents_of(idx):
+                closure[parent] = 1
+                for anc, dist in closures[parent].items():
+                    if closure.get(anc, dist + 2) > dist + 1:
+                        closure[anc] = dist + 1
+                min_depth = self.min_depth[parent] + 1 if min_depth is None else min(min_depth, self.min_depth[parent] + 1)
+                max_depth = max(max_depth, self.max_depth[parent] + 1)
+            closures[idx] = closure
+            self.min_depth[idx] = min_depth or 0
+            self.max_depth[idx] = max_depth
+            for child in self.children_of(idx):
+                pending[child] -= 1
+                if not pending[child]:
+                    queue.append(child)
+        for idx in range(size):
+            if closures[idx] is None:
+                # hypernym cycle (should not happen in WordNet), walk up without the topological order
+                closures[idx] = self._walk(idx, self.parents_of)
+                self.min_depth[idx] = min((d for a, d in closures[idx].items() if not self.parent_count(a)), default=0)
+                self.max_depth[idx] = self.min_depth[idx]
+        closure_ptr, closure = _csr(sorted(c) for c in closures)
+        closure_dist = array(INT_TYPE, (closures[idx][anc] for idx in range(size) for anc in sorted(closures[idx])))
+        return closure_ptr, closure, closure_dist
+
+    def _walk(self, idx, neighbours):
+        """ Breadth-first search, returns {node index: distance} (not including idx) """
+        distances = {idx: 0}
+        queue = deque((idx,))
+        while queue:
+            node = queue.popleft()
+            for n in neighbours(node):
+                if n not in distances:
+                    distances[n] = distances[node] + 1
+                    queue.append(n)
+        del distances[idx]
+        return distances
+
+    # ---------------------------------------------------------------------------
+    # Node access
+    # ---------------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, synsetid):
+        return self.find(synsetid) is not None
+
+    def find(self, synsetid):
+        """ Get node index of a synset or None if it is not in the graph """
+        key = synset_key(synsetid)
+        idx = bisect_left(self.keys, key)
+        return idx if idx < len(self.keys) and self.keys[idx] == key else None
+
+    def index_of(self, synsetid):
+        idx = self.find(synsetid)
+        if idx is None:
+            raise SynsetNotFoundException(synsetid)
+        return idx
+
+    def sid(self, idx):
+        return SynsetID.from_key(self.keys[idx])
+
+    def parents_of(self, idx):
+        return self.parents[self.parent_ptr[idx]:self.parent_ptr[idx + 1]]
+
+    def children_of(self, idx):
+        return self.children[self.child_ptr[idx]:self.child_ptr[idx + 1]]
+
+    def parent_count(self, idx):
+        return self.parent_ptr[idx + 1] - self.parent_ptr[idx]
+
+    def distance_to(self, idx, ancestor):
+        """ Length of the shortest hypernym path from node idx up to ancestor (None if it is not an ancestor) """
+        if idx == ancestor:
+            return 0
+        start, end = self.closure_ptr[idx], self.closure_ptr[idx + 1]
+        pos = bisect_left(self.closure, ancestor, start, end)
+        return self.closure_dist[pos] if pos < end and self.closure[pos] == ancestor else None
+
+    def _closure_of(self, idx):
+        """ {ancestor index: distance} including idx itself (distance 0) """
+        start, end = self.closure_ptr[idx], self.closure_ptr[idx + 1]
+        closure = dict(zip(self.closure[start:end], self.closure_dist[start:end]))
+        closure[idx] = 0
+        return closure
+
+    # ---------------------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------------------
+
+    def hypernyms(self, synsetid):
+        return [self.sid(i) for i in self.parents_of(self.index_of(synsetid))]
+
+    def hyponyms(self, synsetid):
+        return [self.sid(i) for i in self.children_of(self.index_of(synsetid))]
+
+    def roots(self):
+        return [self.sid(i) for i in range(len(self.keys)) if not self.parent_count(i)]
+
+    def ancestors(self, synsetid):
+        """ All hypernyms (transitive closure), nearest first """
+        idx = self.index_of(synsetid)
+        start, end = self.closure_ptr[idx], self.closure_ptr[idx + 1]
+        pairs = sorted(zip(self.closure_dist[start:end], self.closure[start:end]))
+        return [self.sid(anc) for _, anc in pairs]
+
+    def descendants(self, synsetid):
+        """ All hyponyms (transitive closure), nearest first """
+        distances = self._walk(self.index_of(synsetid), self.children_of)
+        return [self.sid(idx) for idx in sorted(distances, key=lambda i: (distances[i], i))]
+
+    def depth(self, synsetid):
+        """ Length of the shortest path from a synset to a root """
+        return self.min_depth[self.index_of(synsetid)]
+
+    def longest_depth(self, synsetid):
+        """ Length of the longest path from a synset to a root """
+        return self.max_depth[self.index_of(synsetid)]
+
+    def path_to_root(self, synsetid):
+        """ Shortest hypernym path from a synset (included) to a root """
+        idx = self.index_of(synsetid)
+        path = [idx]
+        while self.parent_count(idx):
+            idx = min(self.parents_of(idx), key=lambda p: (self.min_depth[p], p))
+            path.append(idx)
+        return [self.sid(i) for i in path]
+
+    def _common(self, synsetid1, synsetid2):
+        idx1, idx2 = self.index_of(synsetid1), self.index_of(synsetid2)
+        closure1, closure2 = self._closure_of(idx1), self._closure_of(idx2)
+        return idx1, idx2, {anc: closure1[anc] + closure2[anc] for anc in closure1.keys() & closure2.keys()}
+
+    def shortest_path_distance(self, synsetid1, synsetid2):
+        """ Number of links on the shortest path between two synsets through a common hypernym (None if there is none) """
+        _, _, common = self._common(synsetid1, synsetid2)
+        return min(common.values()) if common else None
+
+    def _path_up(self, idx, ancestor):
+        path = [idx]
+        while idx != ancestor:
+            dist = self.distance_to(idx, ancestor)
+            idx = next(p for p in self.parents_of(idx) if self.distance_to(p, ancestor) == dist - 1)
+            path.append(idx)
+        return path
+
+    def shortest_path(self, synsetid1, synsetid2):
+        """ Shortest path (list of synset IDs) from synsetid1 up to a common hypernym and down to synsetid2 """
+        idx1, idx2, common = self._common(synsetid1, synsetid2)
+        if not common:
+            return None
+        subsumer = min(common, key=lambda anc: (common[anc], -self.max_depth[anc], anc))
+        path = self._path_up(idx1, subsumer) + self._path_up(idx2, subsumer)[-2::-1]
+        return [self.sid(i) for i in path]
+
+    def lowest_common_hypernyms(self, synsetid1, synsetid2):
+        """ Deepest common hypernyms of two synsets (a synset is considered to be its own hypernym) """
+        _, _, common = self._common(synsetid1, synsetid2)
+        if not common:
+            return []
+        deepest = max(self.max_depth[anc] for anc in common)
+        return [self.sid(anc) for anc in sorted(common) if self.max_depth[anc] == deepest]
+
+
+class HierarchyQueries:
+    """ Hierarchy queries and similarity measures for Wordnet DAOs which implement relation_graph() and get_tagcounts() """
+
+    _similarity = None
+
+    def similarity(self, ctx=None, **kwargs):
+        """ Similarity measures on the hypernym graph, with information content from tag counts (built once) """
+        if self._similarity is None:
+            self._similarity = Similarity(self.relation_graph(ctx=ctx), self.get_tagcounts(ctx=ctx))
+        return self._similarity
+
+    def similarity_matrix(self, measure, synsetids1, synsetids2=None, ctx=None, **kwargs):
+        """ Similarity matrix (measure: path, wup, lch, res or lin) of two lists of synset IDs """
+        return self.similarity(ctx=ctx).matrix(measure, synsetids1, synsetids2)
+
+    def ancestors(self, synsetid, ctx=None, **kwargs):
+        return self.relation_graph(ctx=ctx).ancestors(synsetid)
+
+    def descendants(self, synsetid, ctx=None, **kwargs):
+        return self.relation_graph(ctx=ctx).descendants(synsetid)
+
+    def depth(self, synsetid, ctx=None, **kwargs):
+        return self.relation_graph(ctx=ctx).depth(synsetid)
+
+    def path_to_root(self, synsetid, ctx=None, **kwargs):
+        return self.relation_graph(ctx=ctx).path_to_root(synsetid)
+
+    def shortest_path(self, synsetid1, synsetid2, ctx=None, **kwargs):
+        return self.relation_graph(ctx=ctx).shortest_path(synsetid1, synsetid2)
+
+    def lowest_common_hypernyms(self, synsetid1, synsetid2, ctx=None, **kwargs):
+        return self.relation_graph(ctx=ctx).lowest_common_hypernyms(synsetid1, synsetid2)
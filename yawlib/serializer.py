@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fast JSON serialization of synsets
+
+orjson is used when it is installed (pip install yawlib[orjson]), otherwise the standard json module.
+Both produce compact UTF-8 JSON (bytes) of synsets (Synset, GlossedSynset, OMW synsets in any language):
+
+    synset.to_json_bytes()
+    synsets.to_json_bytes()
+    for chunk in synsets.iter_json():  # stream a large collection
+        ...
+
+Synsets are mutable, so their JSON is not cached here. Servers cache whole responses instead
+(see yawlib.yawol.httpcache).
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# number of synsets in each chunk of iter_synsets_json()
+DEFAULT_CHUNK_SIZE = 64
+JSON_ENCODER = 'orjson' if orjson is not None else 'json'
+
+
+def dumps(obj):
+    """ Encode an object as compact UTF-8 JSON (bytes) """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def synset_json(synset):
+    """ Encoded JSON of a synset """
+    return dumps(synset.to_json())
+
+
+def synsets_json(synsets):
+    """ Encoded JSON array of synsets """
+    return b'[' + b','.join(synset_json(ss) for ss in synsets) + b']'
+
+
+def iter_synsets_json(synsets, chunk_size=DEFAULT_CHUNK_SIZE):
+    """ Encode a JSON array of synsets as a sequence of chunks (bytes), each of them holds up to chunk_size synsets """
+    buffer = [b'[']
+    count = 0
+    for ss in synsets:
+        if count:
+            buffer.append(b',')
+        buffer.append(synset_json(ss))
+        count += 1
+        if count % chunk_size == 0:
+            yield b''.join(buffer)
+            buffer = []
+    buffer.append(b']')
+    yield b''.join(buffer)
+
+
+def object_json(fields):
+    """ Encode a JSON object from (key, value) pairs, values which are bytes are used as encoded JSON """
+    return b'{' + b','.join(dumps(key) + b':' + (value if isinstance(value, bytes) else dumps(value))
+                            for key, value in fields) + b'}'
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch semantic similarity measures (path, Wu-Palmer, Leacock-Chodorow, Resnik, Lin) on a RelationGraph
+
+All measures take two lists of synset IDs and return a similarity matrix (a NumPy array when NumPy is available,
+otherwise a list of lists). Pairs are not compared one by one: the ancestors of all synsets in both lists are
+grouped by hypernym and each common hypernym updates a whole block of the matrix at once.
+Pairs without any common hypernym (e.g. different POS) and unknown synsets get 0.0.
+
+Information content is computed from tag counts (e.g. WordnetSQL.get_tagcounts()) with add-one smoothing,
+the frequency of a synset includes the frequencies of all of its hyponyms.
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import math
+from collections import defaultdict
+
+try:
+    import numpy as np
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+from .models import KEY_POS_BASE
+
+
+MEASURES = ('path', 'wup', 'lch', 'res', 'lin')
+
+
+class Similarity:
+    """ Similarity measures on a hypernym graph with precomputed depths and information content """
+
+    def __init__(self, graph, tagcounts=None, use_numpy=_NUMPY_AVAILABLE):
+        self.graph = graph
+        self.use_numpy = use_numpy
+        size = len(graph)
+        self.posnums = [graph.keys[idx] // KEY_POS_BASE for idx in range(size)]
+        # depth counted in nodes (a root has depth 1)
+        self.depths = [graph.max_depth[idx] + 1 for idx in range(size)]
+        self.taxonomy_depth = {}
+        for idx, posnum in enumerate(self.posnums):
+            self.taxonomy_depth[posnum] = max(self.taxonomy_depth.get(posnum, 0), self.depths[idx])
+        self.ic = self._information_content(tagcounts if tagcounts else {})
+
+    def _information_content(self, tagcounts):
+        g = self.graph
+        counts = [0] * len(g)
+        for sid, count in tagcounts.items():
+            idx = g.find(sid)
+            if idx is not None:
+                counts[idx] = count or 0
+        freqs = [c + 1 for c in counts]
+        totals = defaultdict(int)
+        for idx, count in enumerate(counts):
+            totals[self.posnums[idx]] += count + 1
+            for pos in range(g.closure_ptr[idx], g.closure_ptr[idx + 1]):
+                freqs[g.closure[pos]] += count + 1
+        return [-math.log(freq / totals[self.posnums[idx]]) for idx, freq in enumerate(freqs)]
+
+    def information_content(self, synsetid):
+        return self.ic[self.graph.index_of(synsetid)]
+
+    # ---------------------------------------------------------------------------
+    # Matrix computation
+    # ---------------------------------------------------------------------------
+
+    def _ancestor_table(self, synsetids):
+        """ {ancestor index: ([row indices], [distances])} for all synsets (each synset is its own ancestor) """
+        g = self.graph
+        table = defaultdict(lambda: ([], []))
+        nodes = []
+        for row, sid in enumerate(synsetids):
+            idx = g.find(sid)
+            nodes.append(idx)
+            if idx is None:
+                continue
+            rows, dists = table[idx]
+            rows.append(row)
+            dists.append(0)
+            for pos in range(g.closure_ptr[idx], g.closure_ptr[idx + 1]):
+                rows, dists = table[g.closure[pos]]
+                rows.append(row)
+                dists.append(g.closure_dist[pos])
+        return table, nodes
+
+    def _best(self, synsetids1, synsetids2, score, maximize=True, initial=0.0, distances=True):
+        """ For every pair, the best score over their common ancestors
+
+        score is called as score(ancestor, distance1, distance2), or as score(ancestor) when distances is False
+        (measures which only depend on the ancestor, its value is computed once for the whole block).
+        With NumPy, distance1 and distance2 are a column and a row array, so score must only use arithmetic operators
+        """
+        table1, nodes1 = self._ancestor_table(synsetids1)
+        table2, nodes2 = self._ancestor_table(synsetids2)
+        common = table1.keys() & table2.keys()
+        if self.use_numpy:
+            matrix = np.full((len(nodes1), len(nodes2)), initial, dtype=float)
+            better = np.maximum if maximize else np.minimum
+            for anc in common:
+                rows, dists1 = table1[anc]
+                cols, dists2 = table2[anc]
+                block = np.ix_(rows, cols)
+                if distances:
+                    values = score(anc, np.array(dists1, dtype=float)[:, None], np.array(dists2, dtype=float)[None, :])
+                else:
+                    values = score(anc)
+                matrix[block] = better(matrix[block], values)
+        else:
+            matrix = [[initial] * len(nodes2) for _ in nodes1]
+            better = max if maximize else min
+            for anc in common:
+                rows, dists1 = table1[anc]
+                cols, dists2 = table2[anc]
+                if distances:
+                    for row, d1 in zip(rows, dists1):
+                        mrow = matrix[row]
+                        for col, d2 in zip(cols, dists2):
+                            mrow[col] = better(mrow[col], score(anc, d1, d2))
+                else:
+                    value = score(anc)
+                    for row in rows:
+                        mrow = matrix[row]
+                        for col in cols:
+                            mrow[col] = better(mrow[col], value)
+        return matrix, nodes1, nodes2
+
+    def _transform(self, matrix, func):
+        """ Apply func(value, row, col) to every cell of a pure Python matrix """
+        return [[func(value, r, c) for c, value in enumerate(row)] for r, row in enumerate(matrix)]
+
+    def _distances(self, synsetids1, synsetids2):
+        return self._best(synsetids1, synsetids2, lambda anc, d1, d2: d1 + d2, maximize=False, initial=math.inf)
+
+    # ---------------------------------------------------------------------------
+    # Measures
+    # ---------------------------------------------------------------------------
+
+    def path(self, synsetids1, synsetids2):
+        """ Path similarity: 1 / (1 + length of the shortest path through a common hypernym) """
+        matrix, _, _ = self._distances(synsetids1, synsetids2)
+        if self.use_numpy:
+            return 1.0 / (1.0 + matrix)
+        return self._transform(matrix, lambda d, r, c: 1.0 / (1.0 + d))
+
+    def wup(self, synsetids1, synsetids2):
+        """ Wu-Palmer similarity: 2 * depth(lcs) / (2 * depth(lcs) + distance1 + distance2)
+
+        lcs is the common hypernym which gives the highest score
+        """
+        depths = self.depths
+        matrix, _, _ = self._best(synsetids1, synsetids2, lambda anc, d1, d2: 2.0 * depths[anc] / (d1 + d2 + 2.0 * depths[anc]))
+        return matrix
+
+    def lch(self, synsetids1, synsetids2):
+        """ Leacock-Chodorow similarity: -log((shortest path length + 1) / (2 * taxonomy depth)) """
+        matrix, nodes1, _ = self._distances(synsetids1, synsetids2)
+        max_depths = [2.0 * self.taxonomy_depth[self.posnums[idx]] if idx is not None else 1.0 for idx in nodes1]
+        if self.use_numpy:
+            found = np.isfinite(matrix)
+            return np.where(found, -np.log((np.where(found, matrix, 0.0) + 1.0) / np.array(max_depths)[:, None]), 0.0)
+        return self._transform(matrix, lambda d, r, c: -math.log((d + 1.0) / max_depths[r]) if d != math.inf else 0.0)
+
+    def res(self, synsetids1, synsetids2):
+        """ Resnik similarity: information content of the most informative common hypernym """
+        matrix, _, _ = self._best(synsetids1, synsetids2, self.ic.__getitem__, distances=False)
+        return matrix
+
+    def lin(self, synsetids1, synsetids2):
+        """ Lin similarity: 2 * res / (IC(synset1) + IC(synset2)) """
+        ic = self.ic
+        matrix, nodes1, nodes2 = self._best(synsetids1, synsetids2, ic.__getitem__, distances=False)
+        ic1 = [ic[idx] if idx is not None else 0.0 for idx in nodes1]
+        ic2 = [ic[idx] if idx is not None else 0.0 for idx in nodes2]
+        if self.use_numpy:
+            total = np.array(ic1)[:, None] + np.array(ic2)[None, :]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(total > 0, 2.0 * matrix / np.where(total > 0, total, 1.0), 0.0)
+        return self._transform(matrix, lambda value, r, c: 2.0 * value / (ic1[r] + ic2[c]) if ic1[r] + ic2[c] > 0 else 0.0)
+
+    def matrix(self, measure, synsetids1, synsetids2=None):
+        """ Similarity matrix of a measure (one of MEASURES) between two lists of synset IDs
+
+        When synsetids2 is None, synsetids1 is compared with itself
+        """
+        if measure not in MEASURES:
+            raise ValueError("Unknown similarity measure {} (available: {})".format(measure, ', '.join(MEASURES)))
+        synsetids1 = list(synsetids1)
+        synsetids2 = synsetids1 if synsetids2 is None else list(synsetids2)
+        return getattr(self, measure)(synsetids1, synsetids2)
+
+    def similarity(self, measure, synsetid1, synsetid2):
+        """ Similarity score of a single pair """
+        return float(self.matrix(measure, (synsetid1,), (synsetid2,))[0][0])
+
@@ -23,16 +23,23 @@ Usage:
 # :license: MIT, see LICENSE for more details.
 
 import os.path
+import gc
+import json
 import logging
+import tracemalloc
 
 from texttaglib.chirptext.leutile import Timer, header, FileHelper
 from texttaglib.chirptext.cli import CLIApp, setup_logging
 
 from .helpers import add_wordnet_config
 from .helpers import show_info, _LXML_AVAILABLE
-from .helpers import get_gwn, get_gwnxml, get_omw, get_wn
+from .helpers import get_gwn, get_gwnxml, get_omw, get_wn, gwnxml_files
 from .helpers import get_synset_by_id, get_synset_by_sk, get_synsets_by_term
-from .helpers import smart_wn_search
+from .helpers import smart_wn_search, search_wn_full_text
+from .models import SynsetID
+from .glosswordnet import GWordnetXML
+from .inmemory import InMemoryWordnet
+from . import bench
 
 # -----------------------------------------------------------------------
 # CONFIGURATION
@@ -48,6 +55,9 @@ PWN30 = 'pwn30'
 GWN = 'gwn'
 OMW = 'omw'
 
+# queries of `wntk profile' when none is given (lemma, pattern, sensekey, synset ID)
+PROFILE_QUERIES = ('dog', 'love', 'bank%', 'love%2:37:01::', '02084071-n')
+
 
 def get_logger():
     return logging.getLogger(__name__)
@@ -73,15 +83,183 @@ def convert(cli, args):
     db = get_gwn(args)
     header('Importing data from XML to SQLite')
     t = Timer()
-    header("Extracting Gloss WordNet (XML)")
-    xmlgwn = get_gwnxml(args)
-    header("Inserting data into SQLite database")
-    t.start()
-    db.insert_synsets(xmlgwn.synsets)
+    if args.row_by_row:
+        header("Extracting Gloss WordNet (XML)")
+        xmlgwn = get_gwnxml(args)
+        header("Inserting data into SQLite database")
+        t.start()
+        db.insert_synsets(xmlgwn.synsets)
+    elif args.workers == 1:
+        # synsets are inserted while the XML files are being parsed
+        header("Importing Gloss WordNet (XML) into SQLite database")
+        t.start()
+        count = db.bulk_insert_synsets(GWordnetXML().iterfiles(gwnxml_files(args)))
+        print("Inserted {} synsets".format(count))
+    else:
+        header("Importing Gloss WordNet (XML) into SQLite database (parallel)")
+        t.start()
+        count = db.parallel_insert_files(gwnxml_files(args), workers=args.workers)
+        print("Inserted {} synsets".format(count))
     t.end('Insertion completed.')
     pass
 
 
+def _slot_names(cls):
+    """ Attribute names of all slots of a class (private names are mangled) """
+    for klass in cls.__mro__:
+        for name in klass.__dict__.get('__slots__', ()):
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_{}{}'.format(klass.__name__.lstrip('_'), name)
+            yield name
+
+
+def copy_objects(synsets, slotted=True):
+    """ Copy the object graph of synsets (glosses, items, tags, ...), strings and synset IDs are shared
+
+    When slotted is False, every copied object keeps its attributes in a __dict__ (the layout before gloss objects
+    used __slots__) so that both layouts can be measured on the same data
+    """
+    classes = {}
+    memo = {}
+
+    def copy(value):
+        if isinstance(value, list):
+            return [copy(v) for v in value]
+        cls = type(value)
+        if not cls.__module__.startswith('yawlib.') or isinstance(value, SynsetID):
+            return value
+        if id(value) in memo:
+            return memo[id(value)]
+        if slotted:
+            obj = cls.__new__(cls)
+        else:
+            if cls not in classes:
+                classes[cls] = type(cls.__name__, (), {})
+            obj = classes[cls]()
+        memo[id(value)] = obj
+        for name in list(_slot_names(cls)) + list(getattr(value, '__dict__', ())):
+            try:
+                attr = getattr(value, name)
+            except AttributeError:
+                continue
+            setattr(obj, name, copy(attr))
+        return obj
+    return [copy(ss) for ss in synsets]
+
+
+def _traced_size(func, *args, **kwargs):
+    """ Bytes held by the result of func (tracemalloc must be tracing) """
+    gc.collect()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func(*args, **kwargs)
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    del result
+    return after - before
+
+
+def measure_memory(cli, args):
+    """ Report memory usage per synset of Gloss WordNet XML loaded into memory """
+    files = gwnxml_files(args)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        xmlgwn = GWordnetXML(files)
+        gc.collect()
+        used, peak = tracemalloc.get_traced_memory()
+        # the same object graph with and without __slots__
+        slotted = _traced_size(copy_objects, xmlgwn.synsets, slotted=True)
+        unslotted = _traced_size(copy_objects, xmlgwn.synsets, slotted=False)
+    finally:
+        tracemalloc.stop()
+    synset_count = len(xmlgwn.synsets)
+    item_count = sum(len(g.items) for ss in xmlgwn.synsets for g in ss.glosses)
+    tag_count = sum(len(g.tags) for ss in xmlgwn.synsets for g in ss.glosses)
+    without_slots = used - slotted + unslotted
+    header("Memory usage")
+    print("Files       : {}".format(', '.join(files)))
+    print("Synsets     : {} | Gloss items: {} | Sense tags: {}".format(synset_count, item_count, tag_count))
+    print("Memory      : {:,} bytes (peak: {:,} bytes)".format(used, peak))
+    print("No __slots__: {:,} bytes (same objects with a __dict__ each)".format(without_slots))
+    if synset_count:
+        print("Per synset  : {:,.0f} bytes (before: {:,.0f} bytes, {:.0%} saved)".format(
+            used / synset_count, without_slots / synset_count, 1 - used / without_slots))
+
+
+def build_fts_index(cli, args):
+    """ Build full-text search indexes for lemmas, definitions and examples """
+    wn = get_wn_profile(cli, args)
+    t = Timer()
+    t.start()
+    wn.build_fts_index()
+    t.end('Full-text indexes were built')
+
+
+def upgrade_schema(cli, args):
+    """ Create case-insensitive lemma and sensekey indexes """
+    wn = get_wn_profile(cli, args)
+    wn.upgrade_schema()
+    print("Schema upgrade completed")
+
+
+def build_snapshot(cli, args):
+    """ Save a Wordnet as a binary snapshot which can be loaded by InMemoryWordnet """
+    wn = get_wn_profile(cli, args)
+    t = Timer()
+    t.start()
+    mwn = InMemoryWordnet.build(wn, langs=args.lang)
+    mwn.save(args.output)
+    t.end("Snapshot of {} synsets was written to {}".format(len(mwn), args.output))
+
+
+def profile_queries(cli, args):
+    """ Run queries with SQL instrumentation and report statistics of each statement """
+    wn = get_wn_profile(cli, args)
+    profiler = wn.enable_profiling()
+    queries = list(args.queries)
+    if args.file:
+        with open(args.file, encoding='utf-8') as infile:
+            queries.extend(line.strip() for line in infile if line.strip())
+    if not queries:
+        queries = PROFILE_QUERIES
+    t = Timer()
+    t.start()
+    with wn.ctx() as ctx:
+        for _ in range(args.repeat):
+            for query in queries:
+                search_wn_full_text(wn, query, lang=args.lang, ctx=ctx)
+    t.end("Ran {} queries x {}".format(len(queries), args.repeat))
+    if args.json:
+        print(json.dumps(profiler.stats(sort_by=args.sort)[:args.limit], indent=2))
+    else:
+        header("SQL statements (latency in ms)")
+        print(profiler.report(sort_by=args.sort, limit=args.limit, plans=args.plans))
+
+
+def run_benchmarks(cli, args):
+    """ Benchmark DAO hot paths on a synthetic Wordnet (generated on first use) """
+    workload_path = os.path.join(args.dir, bench.WORKLOAD_FILE)
+    if args.regenerate or not os.path.isfile(workload_path) or bench.read_workload(args.dir)['size'] != args.size:
+        header("Generating synthetic Wordnet ({} synsets) in {}".format(args.size, args.dir))
+        t = Timer()
+        t.start()
+        bench.SyntheticWordnet.from_xml(args.template, size=args.size, seed=args.seed).generate(args.dir, fts=args.fts)
+        t.end("Synthetic Wordnet was generated")
+    results = bench.run_benchmarks(args.dir, backends=args.backends, benchmarks=args.benchmarks,
+                                   ops=args.ops, seed=args.seed, template=args.template)
+    header("Results")
+    print(bench.report(results))
+    if args.output:
+        bench.write_results(results, args.output)
+        print("Results were written to {}".format(args.output))
+    if args.compare:
+        header("Compared to {} (new / old)".format(args.compare))
+        for row in bench.compare_results(bench.read_results(args.compare), results):
+            print("{:<6} {:<20} ops/s: {} | p50: {} | p99: {}".format(
+                row['backend'], row['benchmark'],
+                *('{:.2f}x'.format(row[k]) if row[k] is not None else '-' for k in ('ops_per_sec', 'p50', 'p99'))))
+
+
 def get_wn_profile(cli, args):
     cli.logger.info("Loading Wordnet profile: {}".format(args.wn))
     if args.wn == GWN:
@@ -132,6 +310,46 @@ def main():
     add_wordnet_config(app.parser)
     # Convert GWordnetXML into GWordnetSQL
     task = app.add_task('create', func=convert)
+    task.add_argument('--row_by_row', help='Insert synsets one row at a time instead of using bulk inserts', action='store_true')
+    task.add_argument('--workers', help='Number of worker processes for parsing XML files (default: number of CPUs)', type=int, default=None)
+    # Measure memory usage of loaded synsets
+    task = app.add_task('memory', func=measure_memory)
+    # Build full-text search indexes
+    task = app.add_task('index', func=build_fts_index)
+    task.add_argument('--wn', help='Which Wordnet to use', choices=[GWN, PWN30, OMW], default=GWN)
+    # Create case-insensitive indexes
+    task = app.add_task('upgrade', func=upgrade_schema)
+    task.add_argument('--wn', help='Which Wordnet to use', choices=[GWN, PWN30, OMW], default=GWN)
+    # Build in-memory Wordnet snapshot
+    task = app.add_task('snapshot', func=build_snapshot)
+    task.add_argument('output', help='Path to snapshot file')
+    task.add_argument('--wn', help='Which Wordnet to use', choices=[GWN, PWN30, OMW], default=PWN30)
+    task.add_argument('--lang', help='Languages to include (OMW only, default: eng)', nargs='*')
+    # Profile SQL statements of lookups
+    task = app.add_task('profile', func=profile_queries)
+    task.add_argument('queries', nargs='*', help='Queries (lemmas, sensekeys or synset IDs), a few sample queries are used by default')
+    task.add_argument('-f', '--file', help='Read queries from a text file (one query per line)')
+    task.add_argument('--repeat', help='Number of times all queries are run', type=int, default=1)
+    task.add_argument('--sort', help='Sort statements by', choices=['total', 'mean', 'max', 'p99', 'calls', 'rows'], default='total')
+    task.add_argument('--limit', help='Maximum number of statements to report', type=int, default=None)
+    task.add_argument('--plans', help='Show the query plan of each statement', action='store_true')
+    task.add_argument('--json', help='Print statistics as JSON', action='store_true')
+    task.add_argument('--wn', help='Which Wordnet to use', choices=[GWN, PWN30, OMW], default=PWN30)
+    task.add_argument('--lang', help='Search language', default='eng')
+    # Benchmark DAO hot paths on a synthetic Wordnet
+    task = app.add_task('bench', func=run_benchmarks)
+    task.add_argument('--dir', help='Directory of the synthetic Wordnet databases', default='bench')
+    task.add_argument('--size', help='Number of synsets in the synthetic Wordnet', type=int, default=bench.DEFAULT_SIZE)
+    task.add_argument('--template', help='Gloss WordNet XML file with template synsets (default: test/data/test.xml of a source checkout)',
+                      default=bench.BENCH_TEMPLATE, required=bench.BENCH_TEMPLATE is None)
+    task.add_argument('--regenerate', help='Generate the synthetic Wordnet again', action='store_true')
+    task.add_argument('--fts', help='Build full-text indexes when generating', action='store_true')
+    task.add_argument('--ops', help='Number of operations of each benchmark', type=int, default=bench.DEFAULT_OPS)
+    task.add_argument('--seed', help='Random seed of data and workload', type=int, default=bench.DEFAULT_SEED)
+    task.add_argument('--backends', help='Backends to benchmark', nargs='+', choices=bench.BACKENDS, default=bench.BACKENDS)
+    task.add_argument('--benchmarks', help='Benchmarks to run', nargs='+', choices=bench.BENCHMARKS, default=bench.BENCHMARKS)
+    task.add_argument('-o', '--output', help='Write results to a JSON file')
+    task.add_argument('--compare', help='Compare with results of a previous run (JSON file)')
     # Search synsets by synsetID
     task = app.add_task('synset', func=search_by_id)
     task.add_argument('synsetid', help='Synset ID (e.g. 12345678-n)')
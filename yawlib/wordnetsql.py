@@ -10,9 +10,18 @@ WordNet SQLite wrapper
 # :license: MIT, see LICENSE for more details.
 
 import logging
-from collections import defaultdict as dd
 from texttaglib.puchikarui import Schema, with_ctx
-from yawlib.models import SynsetID, Synset, SynsetCollection
+from texttaglib.chirptext.leutile import uniquify
+from yawlib.models import Synset, SynsetCollection, synset_key
+from yawlib.common import SynsetNotFoundException
+from yawlib.common import chunks, in_clause, create_nocase_indexes
+from yawlib import fulltext
+from yawlib.cache import cached
+from yawlib.relgraph import RelationGraph, HierarchyQueries
+from yawlib.pool import PooledSchema
+from yawlib.profiling import ProfiledSchema
+from yawlib.lookup import BatchLookup, select_patterns, match_patterns
+from yawlib.lazy import LazySynset, field_groups, defer
 
 
 def getLogger():
@@ -33,98 +42,174 @@ class Wordnet3Schema(Schema):
         self.add_table('semlinks', 'synset1id synset2id linkid'.split())
 
 
-class WordnetSQL(Wordnet3Schema):
+class WordnetSQL(ProfiledSchema, PooledSchema, Wordnet3Schema, HierarchyQueries, BatchLookup):
 
-    def __init__(self, db_path, **kwargs):
+    # backend name in cache keys
+    BACKEND = 'wnsql'
+
+    # (table, column) pairs which can be indexed for full-text search
+    FTS_INDEXES = (('words', 'lemma'), ('synsets', 'definition'), ('samples', 'sample'))
+    # case-insensitive indexes for lemma and sensekey lookup
+    NOCASE_INDEXES = (('words', 'lemma'), ('senses', 'sensekey'))
+    # semlinks.linkid values: hypernym, instance hypernym | hyponym, instance hyponym
+    HYPERNYM_LINKS = (1, 3)
+    HYPONYM_LINKS = (2, 4)
+    # links which are returned by hypehypo()
+    HYPEHYPO_LINKS = (1, 2, 3, 4, 11, 12, 13, 14, 15, 16, 40, 50, 81)
+    # field groups which can be deferred (see yawlib.lazy), lemmas include sensekeys and tag count
+    FIELD_GROUPS = ('lemmas', 'definition', 'examples')
+    FIELD_ALIASES = {'sensekeys': 'lemmas', 'tagcount': 'lemmas', 'definitions': 'definition'}
+
+    def __init__(self, db_path, cache=None, pool_size=None, profile=False, **kwargs):
         super().__init__(data_source=db_path, **kwargs)
-        # Caches
-        self.sk_cache = dd(set)
-        self.sid_cache = dd(set)
-        self.hypehypo_cache = dd(set)
-        self.tagcount_cache = dd(lambda: 0)
+        # an optional SynsetCache (see yawlib.cache), which may be shared with other DAOs
+        self.cache = cache
+        # borrow read-only connections from a pool instead of opening one per call (see yawlib.pool)
+        if pool_size:
+            self.enable_pool(pool_size)
+        # record SQL statement statistics (see yawlib.profiling)
+        if profile:
+            self.enable_profiling()
+        self._graph = None
+
+    def cache_key(self, *parts):
+        return (self.BACKEND, 'eng') + parts
 
     def ensure_sid(self, sid):
-        """Ensure that a given synset ID is an instance of SynsetID"""
-        if isinstance(sid, SynsetID):
-            sid = sid.to_wnsql()
-        else:
-            sid = SynsetID.from_string(str(sid)).to_wnsql()
-        return sid
+        """ Convert a synset ID to WordnetSQL format (integer synset key, e.g. 112345678) """
+        return synset_key(sid)
 
     @with_ctx
-    def get_synset(self, synsetid, ctx=None, **kwargs):
+    def get_synset(self, synsetid, fields=None, ctx=None, **kwargs):
         sid = self.ensure_sid(synsetid)
-        # get synset object
-        synset_info = ctx.ss.by_id(sid)
-        if synset_info is None:
-            return None
-        else:
-            ss = Synset(synset_info.synsetid)
-            ss.definition = synset_info.definition
-            # add lemmas, sensekeys and tag count
-            rows = ctx.wordsense.select('synsetid=?', (sid,), columns=('lemma', 'sensekey', 'tagcount'))
-            for row in rows:
-                ss.add_lemma(row.lemma)
-                ss.add_key(row.sensekey)
-                ss.tagcount += row.tagcount
-            # add examples
-            exes = ctx.ex.select(where='synsetid=?', values=[sid], orderby='sampleid')
-            for ex in exes:
-                ss.examples.append(ex.sample)
-            return ss
-
-    @with_ctx
-    def get_synsets(self, synsetids, ctx=None, **kwargs):
-        """ Get synsets by synsetids """
-        synsets = SynsetCollection()
-        for sid in synsetids:
-            ss = self.get_synset(sid, ctx=ctx)
-            synsets.add(ss)
-        return synsets
+        synsets = self.get_synsets((sid,), fields=fields, ctx=ctx)
+        return synsets.synsets[0] if synsets else None
+
+    @with_ctx
+    def get_synsets(self, synsetids, fields=None, ctx=None, **kwargs):
+        """ Get synsets by synsetids
+
+        Synsets, senses and examples are fetched for the whole list using IN (...) queries
+        (split into chunks to stay under SQLite's variable limit) and then assembled in memory.
+        When fields is given, only these field groups (see FIELD_GROUPS) are fetched now and
+        the others are fetched on first access (see yawlib.lazy).
+        Synset IDs that cannot be found are ignored.
+        """
+        sids = uniquify([self.ensure_sid(sid) for sid in synsetids])
+        groups = field_groups(self, fields)
+        synset_map = {}
+        missing = sids
+        if self.cache is not None:
+            missing = []
+            for sid in sids:
+                ss = self.cache.get(self.cache_key(sid))
+                if ss is None:
+                    missing.append(sid)
+                else:
+                    # callers may modify their synsets, so the cached ones are copied
+                    synset_map[sid] = ss.copy()
+        loaded = {}
+        for chunk in chunks(missing):
+            if groups is None:
+                # synset info
+                for row in ctx.ss.select(in_clause('synsetid', chunk), chunk, columns=('synsetid', 'definition')):
+                    ss = Synset(row.synsetid)
+                    ss.definition = row.definition
+                    loaded[row.synsetid] = ss
+            else:
+                for row in ctx.ss.select(in_clause('synsetid', chunk), chunk, columns=('synsetid',)):
+                    loaded[row.synsetid] = LazySynset(row.synsetid)
+        if groups is None:
+            self._load_fields('lemmas', loaded, ctx=ctx)
+            self._load_fields('examples', loaded, ctx=ctx)
+            # only complete synsets are cached
+            if self.cache is not None:
+                for sid, ss in loaded.items():
+                    self.cache.put(self.cache_key(sid), ss.copy())
+        elif loaded:
+            defer(self, loaded.values(), groups, ctx=ctx)
+        synset_map.update(loaded)
+        return SynsetCollection(synset_map[sid] for sid in sids if sid in synset_map)
+
+    @with_ctx
+    def _load_fields(self, group, synset_map, ctx=None):
+        """ Fetch a field group (see FIELD_GROUPS) of synsets (a dict of synset key > synset) """
+        for chunk in chunks(list(synset_map)):
+            if group == 'definition':
+                for row in ctx.ss.select(in_clause('synsetid', chunk), chunk, columns=('synsetid', 'definition')):
+                    synset_map[row.synsetid].definition = row.definition
+            elif group == 'lemmas':
+                # lemmas, sensekeys and tag count
+                rows = ctx.wordsense.select(in_clause('synsetid', chunk), chunk,
+                                            columns=('synsetid', 'lemma', 'sensekey', 'tagcount'),
+                                            orderby='synsetid, senseid')
+                for row in rows:
+                    ss = synset_map[row.synsetid]
+                    ss.add_lemma(row.lemma)
+                    ss.add_key(row.sensekey)
+                    ss.tagcount += row.tagcount
+            elif group == 'examples':
+                exes = ctx.ex.select(in_clause('synsetid', chunk), chunk,
+                                     columns=('synsetid', 'sample'), orderby='synsetid, sampleid')
+                for ex in exes:
+                    synset_map[ex.synsetid].examples.append(ex.sample)
 
     @with_ctx
     def sk2sid(self, sensekey, ctx=None):
-        return ctx.select_scalar('select synsetid from senses where lower(sensekey)=?', (sensekey,))
+        row = ctx.select_single('select synsetid from senses where sensekey=? COLLATE NOCASE', (sensekey,))
+        return row[0] if row else None
 
     @with_ctx
     def get_by_key(self, sensekey, ctx=None, **kwargs):
         # get synset object
-        sid = self.sk2sid(sensekey.lower(), ctx=ctx)
-        return self.get_synset(sid, ctx=ctx)
+        sid = cached(self.cache, self.cache_key('sk2sid', sensekey), lambda: self.sk2sid(sensekey, ctx=ctx))
+        if sid is None:
+            raise SynsetNotFoundException("Could not find any synset with provided key {}".format(sensekey))
+        return self.get_synset(sid, fields=kwargs.get('fields'), ctx=ctx)
 
     @with_ctx
     def get_by_keys(self, sensekeys, ctx=None, **kwargs):
-        query = 'lower(sensekey) IN ({})'.format(', '.join(len(sensekeys) * ['?']))
-        results = ctx.senses.select(query, [s.lower() for s in sensekeys], columns=('synsetid',))
+        sids = []
+        for chunk in chunks(sensekeys):
+            results = ctx.senses.select(in_clause('sensekey COLLATE NOCASE', chunk), chunk, columns=('synsetid',))
+            sids.extend(s.synsetid for s in results)
         # get synset object
-        return self.get_synsets(set(s.synsetid for s in results), ctx=ctx)
+        return self.get_synsets(sids, fields=kwargs.get('fields'), ctx=ctx)
 
-    def get_synsets_by_lemma(self, lemma):
-        with self.schema.ds.open() as ctx:
-            # get synset object
-            rows = ctx.wss.select(where='lemma=?', values=(lemma,))
-            synsets = SynsetCollection()
-            if rows is not None and len(rows) > 0:
-                for row in rows:
-                    ss = Synset(row.synsetid)
-                    ss.definition = row.definition
-                    ss.add_lemma(row.lemma)
-                    ss.add_key(row.sensekey)
-                    ss.tagcount = row.tagcount
-                    # add examples
-                    exes = ctx.ex.select(where='synsetid=?', values=[row.synsetid], orderby='sampleid')
-                    for ex in exes:
-                        ss.examples.append(ex.sample)
-                    synsets.add(ss)
-            return synsets
+    @with_ctx
+    def get_synsets_by_lemma(self, lemma, ctx=None, **kwargs):
+        """ Get the senses of a lemma
+
+        Each synset holds only this lemma with the sensekey and tag count of its sense
+        (the definition and examples are the synset's). Examples are fetched with IN (...) queries.
+        """
+        rows = ctx.wss.select(where='lemma=?', values=(lemma,), columns=('synsetid', 'definition', 'lemma', 'sensekey', 'tagcount'))
+        synset_map = {}
+        for row in rows:
+            ss = Synset(row.synsetid)
+            ss.definition = row.definition
+            ss.add_lemma(row.lemma)
+            ss.add_key(row.sensekey)
+            ss.tagcount = row.tagcount
+            synset_map[row.synsetid] = ss
+        self._load_fields('examples', synset_map, ctx=ctx)
+        return SynsetCollection(synset_map.values())
 
     @with_ctx
     def search(self, lemma, pos=None, deep_select=True, synsets=None, ignore_case=True, ctx=None, **kwargs):
+        sids = cached(self.cache, self.cache_key('search', lemma, pos, ignore_case),
+                      lambda: self._search_sids(lemma, pos=pos, ignore_case=ignore_case, ctx=ctx))
+        # get synset objects
+        return self.get_synsets(sids, fields=kwargs.get('fields'), ctx=ctx)
+
+    def _search_sids(self, lemma, pos=None, ignore_case=True, ctx=None):
         # Build query
-        if ignore_case:
-            query = ['wordid IN (SELECT wordid FROM words WHERE lower(lemma) LIKE ?)']
-            params = [lemma.lower()]
+        fts_filter = fulltext.rowid_filter(ctx, 'words', 'lemma', lemma) if ignore_case else None
+        if fts_filter:
+            query = ['wordid IN (SELECT wordid FROM words WHERE {})'.format(fts_filter[0])]
+            params = fts_filter[1]
         else:
+            # LIKE is case-insensitive and can use the words_lemma_nocase index
             query = ['wordid IN (SELECT wordid FROM words WHERE lemma LIKE ?)']
             params = [lemma]
         if pos == 'a':
@@ -140,29 +225,103 @@ class WordnetSQL(Wordnet3Schema):
             params.append(pos)
         # find synsetIDs first
         senses = ctx.senses.select(' AND '.join(query), params, columns=('synsetid',))
-        # get synset object
-        synsets = SynsetCollection()
-        if senses:
-            for sense in senses:
-                ss = self.get_synset(sense.synsetid, ctx=ctx)
-                synsets.add(ss)
-        return synsets
+        return tuple(uniquify([sense.synsetid for sense in senses]))
+
+    @with_ctx
+    def search_text(self, table, column, query, ignore_case=True, synsets=None, fields=None, ctx=None):
+        """ Search synsets by text in synsets.definition or samples.sample
+
+        The full-text index of the column is used when it is available (results are ranked by relevance),
+        otherwise the table will be scanned using LIKE
+        """
+        rows = fulltext.search(ctx, table, column, query, columns=('synsetid',)) if ignore_case else None
+        if rows is None:
+            if ignore_case:
+                where, params = 'lower({}) LIKE ?'.format(column), [query.lower()]
+            else:
+                where, params = '{} LIKE ?'.format(column), [query]
+            rows = getattr(ctx, table).select(where, params, columns=('synsetid',))
+        if synsets is None:
+            synsets = SynsetCollection()
+        return synsets.merge(self.get_synsets([r.synsetid for r in rows if r.synsetid not in synsets], fields=fields, ctx=ctx))
+
+    @with_ctx
+    def search_def(self, query, deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
+        return self.search_text('synsets', 'definition', query, ignore_case=ignore_case, synsets=synsets, fields=kwargs.get('fields'), ctx=ctx)
+
+    @with_ctx
+    def search_ex(self, query, deep_select=True, ignore_case=True, synsets=None, ctx=None, **kwargs):
+        return self.search_text('samples', 'sample', query, ignore_case=ignore_case, synsets=synsets, fields=kwargs.get('fields'), ctx=ctx)
+
+    def _sensekey_sids(self, sensekeys, ctx=None):
+        for chunk in chunks(sensekeys):
+            yield from ctx.select('SELECT sensekey, synsetid FROM senses WHERE {}'.format(in_clause('sensekey COLLATE NOCASE', chunk)), chunk)
+
+    def _lemma_sids(self, patterns, pos=None, lang='eng', ctx=None):
+        query = ['SELECT words.lemma, senses.synsetid FROM words JOIN senses ON senses.wordid = words.wordid WHERE']
+        params = []
+        if pos == 'a':
+            query.append("senses.synsetid IN (SELECT synsetid FROM synsets WHERE pos IN ('a', 's')) AND")
+        elif pos:
+            query.append('senses.synsetid IN (SELECT synsetid FROM synsets WHERE pos = ?) AND')
+            params.append(pos)
+        query.append('{}')
+        rows = select_patterns(ctx, ' '.join(query), 'words', 'lemma', patterns, params)
+        return match_patterns(rows, patterns)
+
+    def _text_sids(self, field, patterns, lang='eng', ctx=None):
+        table, column = ('synsets', 'definition') if field == 'def' else ('samples', 'sample')
+        rows = select_patterns(ctx, 'SELECT {c}, synsetid FROM {t} WHERE {{}}'.format(c=column, t=table), table, column, patterns, lower=True)
+        return match_patterns(rows, patterns)
+
+    @with_ctx
+    def upgrade_schema(self, ctx=None):
+        """ Create case-insensitive indexes for lemma and sensekey lookup """
+        create_nocase_indexes(ctx, self.NOCASE_INDEXES)
+
+    @with_ctx
+    def build_fts_index(self, ctx=None):
+        """ Build full-text search indexes for lemmas, definitions and examples """
+        fulltext.build_indexes(ctx, self.FTS_INDEXES)
 
     @with_ctx
     def hypehypo(self, sid, ctx=None):
         """ Get all hypernyms and hyponyms of a given synset
         """
-        sid = SynsetID.from_string(str(sid))
-        if sid in self.hypehypo_cache:
-            return self.hypehypo_cache[sid]
-        result = ctx.semlinks.select(
-            where='synset1id = ? and linkid in (1,2,3,4,11,12,13,14,15,16,40,50,81)',
-            values=[sid.to_wnsql()])
-        for r in result:
-            self.hypehypo_cache[sid].add(r.synset2id)
-        return self.hypehypo_cache[sid]
+        sid = self.ensure_sid(sid)
+
+        def find_links():
+            result = ctx.semlinks.select(
+                where='synset1id = ? and {}'.format(in_clause('linkid', self.HYPEHYPO_LINKS)),
+                values=(sid,) + self.HYPEHYPO_LINKS)
+            return frozenset(r.synset2id for r in result)
+        return set(cached(self.cache, self.cache_key('hypehypo', sid), find_links))
+
+    @with_ctx
+    def relation_graph(self, ctx=None):
+        """ Hypernym graph of all synsets (built from semlinks on first use and then kept in memory) """
+        if self._graph is None:
+            links = ctx.semlinks.select(in_clause('linkid', self.HYPERNYM_LINKS), self.HYPERNYM_LINKS, columns=('synset1id', 'synset2id'))
+            synsets = ctx.ss.select(columns=('synsetid',))
+            self._graph = RelationGraph.from_edges(links, nodes=(row.synsetid for row in synsets))
+        return self._graph
+
+    @with_ctx
+    def hypernyms(self, synsetid, deep_select=True, ctx=None, **kwargs):
+        sids = self.relation_graph(ctx=ctx).hypernyms(synsetid)
+        return self.get_synsets(sids, ctx=ctx) if deep_select else [Synset(sid) for sid in sids]
+
+    @with_ctx
+    def hyponyms(self, synsetid, deep_select=True, ctx=None, **kwargs):
+        sids = self.relation_graph(ctx=ctx).hyponyms(synsetid)
+        return self.get_synsets(sids, ctx=ctx) if deep_select else [Synset(sid) for sid in sids]
 
     @with_ctx
     def get_tagcount(self, sid, ctx=None, **kwargs):
         sid = self.ensure_sid(sid)
         return ctx.select_scalar('SELECT SUM(tagcount) FROM senses WHERE synsetid=?', (sid,))
+
+    @with_ctx
+    def get_tagcounts(self, ctx=None, **kwargs):
+        """ Tag counts of all synsets (synset key > sum of sense tag counts) """
+        return {sid: count for sid, count in ctx.select('SELECT synsetid, SUM(tagcount) FROM senses GROUP BY synsetid')}
@@ -13,15 +13,18 @@ import json
 import logging
 
 import flask
-from flask import Flask, Response, abort
+from flask import Flask, Response, abort, stream_with_context
 from functools import wraps
 from flask import request
 from texttaglib.chirptext.cli import CLIApp, setup_logging
 
 from yawlib.config import read_config
-from yawlib import YLConfig
-from yawlib import SynsetID, SynsetCollection
-from yawlib import WordnetSQL as WSQL
+from yawlib import YLConfig, __version__
+from yawlib import SynsetID, SynsetCollection, SynsetNotFoundException
+from yawlib.helpers import get_server_wn, wn_stats
+from yawlib.helpers import bulk_get_synsets, bulk_search, parse_bulk_items, to_ndjson
+from yawlib.serializer import object_json
+from yawlib.yawol.httpcache import ResponseCache
 
 
 # ---------------------------------------------------------------------
@@ -37,7 +40,10 @@ logging_config_file = cfg.get('logging_config_file', 'logging.json')
 log_dir = cfg.get('log_dir', 'logs')
 setup_logging(logging_config_file, log_dir)
 app = Flask(__name__, static_url_path="")
-wsql = WSQL(YLConfig.WNSQL30_PATH)
+# WordnetSQL or a memory-mapped snapshot which is shared by all workers (see WN_SNAPSHOT in config)
+wsql = get_server_wn()
+# ETags and serialized responses (see yawlib.yawol.httpcache)
+responses = ResponseCache(wsql, maxsize=YLConfig.RESPONSE_CACHE_SIZE, max_age=YLConfig.HTTP_MAX_AGE)
 
 
 # ---------------------------------------------------------------------
@@ -58,45 +64,110 @@ def jsonp(func):
     return decorated_function
 
 
+def cached_jsonp(route):
+    """ JSON/JSONP output with ETag and Cache-Control headers, which is served from the response cache
+
+    Requests with a matching If-None-Match header get 304 Not Modified when the response exists
+    """
+    def decorator(func):
+        @wraps(func)
+        def decorated_function(**kwargs):
+            query = '/'.join(str(v) for v in kwargs.values())
+            callback = request.args.get('callback', False)
+            data, etag, not_modified = responses.respond(route, query, request.headers.get('If-None-Match'),
+                                                         lambda: func(**kwargs), callback if callback else '')
+            if data is None:
+                abort(404)
+            headers = responses.headers(etag)
+            if not_modified:
+                return Response(status=304, headers=headers)
+            if callback:
+                content = b"".join((str(callback).encode('utf-8'), b"(", data, b")"))
+                return Response(content, mimetype="application/javascript", headers=headers)
+            else:
+                return Response(data, mimetype="application/json", headers=headers)
+        return decorated_function
+    return decorator
+
+
+def bulk_items():
+    """ Items of a bulk request (JSON array of strings), abort with 400 if the request body is invalid """
+    try:
+        return parse_bulk_items(request.get_json(force=True, silent=True))
+    except ValueError as e:
+        abort(400, str(e))
+
+
+def ndjson(records):
+    """ Stream records as newline-delimited JSON """
+    return Response(stream_with_context(to_ndjson(records)), mimetype="application/x-ndjson")
+
+
 # ---------------------------------------------------------------------
 # Views
 # ---------------------------------------------------------------------
 @app.route('/yawol/synset/<synsetid>', methods=['GET'])
-@jsonp
+@cached_jsonp('synset')
 def get_synset(synsetid):
-    ss = wsql.get_synset_by_id(synsetid)
+    ss = wsql.get_synset(synsetid)
     if ss is not None:
-        return ss.to_json_str()
+        return ss.to_json_bytes()
     else:
         abort(404)
 
 
 @app.route('/yawol/search/<query>', methods=['GET'])
-@jsonp
+@cached_jsonp('search')
 def search(query):
     # assume that query is a synset?
     try:
         sid = SynsetID.from_string(query)
-        ss = wsql.get_synset_by_id(sid)
+        ss = wsql.get_synset(sid)
         if ss is not None:
-            return SynsetCollection().add(ss).to_json_str()
+            return SynsetCollection().add(ss).to_json_bytes()
     except Exception as e:
         # not synsetid
         getLogger().exception(e, "Invalid synset ID")
         pass
-    # try search by lemma
+    # try search by lemma (exact match)
     synsets = wsql.get_synsets_by_lemma(query)
     if synsets:
-        return synsets.to_json_str()
+        return synsets.to_json_bytes()
     else:
         # search by sensekey
-        ss = wsql.get_synset_by_sk(query)
+        try:
+            ss = wsql.get_by_key(query)
+        except SynsetNotFoundException:
+            ss = None
         if ss:
-            return SynsetCollection().add(ss).to_json_str()
+            return SynsetCollection().add(ss).to_json_bytes()
     # invalid query
     abort(404)
 
 
+@app.route('/yawol/synsets', methods=['POST'])
+def get_synsets():
+    """ Get synsets by a JSON array of synset IDs, one NDJSON line per ID: {"synsetid": ..., "synset": {...} or null} """
+    synsetids = bulk_items()
+    return ndjson(object_json((('synsetid', sid), ('synset', ss.to_json_bytes() if ss is not None else None)))
+                  for sid, ss in bulk_get_synsets(wsql, synsetids))
+
+
+@app.route('/yawol/search', methods=['POST'])
+def search_many():
+    """ Search a JSON array of synset IDs, sensekeys or lemmas, one NDJSON line per query: {"query": ..., "synsets": [...]} """
+    queries = bulk_items()
+    return ndjson(object_json((('query', query), ('synsets', synsets.to_json_bytes())))
+                  for query, synsets in bulk_search(wsql, queries, auto_wrap=False))
+
+
+@app.route('/yawol/stats', methods=['GET'])
+@jsonp
+def stats():
+    """ Connection pool, cache, response cache and SQL statement statistics (set PROFILE_QUERIES in config to record statements) """
+    return json.dumps({'wn': wn_stats(wsql), 'responses': responses.stats()})
+
+
 @app.route('/yawol/', methods=['GET'])
 def index():
     return Response('Yawol {yv} - yawol-flask/Flask-{fv}'.format(yv=__version__, fv=flask.__version__), mimetype='text/html')
@@ -9,6 +9,9 @@ from . import views
 urlpatterns = [
     url(r'^$', views.index, name='index'),
     url(r'^synset/(?P<synsetid>\w+)$', views.get_synset, name='synset'),
+    url(r'^synsets/?$', views.get_synsets, name='synsets'),
+    url(r'^search/?$', views.search_many, name='search_many'),
     url(r'^search/(?P<query>.+)$', views.search, name='search'),
-    url(r'^version/?$', views.version, name='version')
+    url(r'^version/?$', views.version, name='version'),
+    url(r'^stats/?$', views.stats, name='stats')
 ]
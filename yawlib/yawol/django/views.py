@@ -9,21 +9,28 @@ YAWOL-Django - Yet Another Wordnet Online (REST server) for Django
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
-import os
 import json
 import logging
 import django
-from django.http import HttpResponse, Http404
-from yawlib import SynsetID, SynsetCollection
-from yawlib.helpers import get_omw, get_wn
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse, Http404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from yawlib import YLConfig, SynsetID, SynsetCollection, __version__
+from yawlib.helpers import get_server_omw, get_server_wn, wn_stats
+from yawlib.helpers import bulk_get_synsets, bulk_search, parse_bulk_items, to_ndjson
+from yawlib.serializer import object_json, dumps
+from yawlib.yawol.httpcache import ResponseCache
 
 # ---------------------------------------------------------------------
 # CONFIGURATION
 # ---------------------------------------------------------------------
 logger = logging.getLogger(__name__)
-wsql = get_wn()
-omwsql = get_omw()
-print("OMW: {}".format(omwsql))
+# SQLite DAOs or memory-mapped snapshots which are shared by all workers (see WN_SNAPSHOT and OMW_SNAPSHOT in config)
+wsql = get_server_wn()
+omwsql = get_server_omw()
+logger.info("OMW: {}".format(omwsql))
+# ETags and serialized responses (see yawlib.yawol.httpcache)
+responses = ResponseCache(wsql, omwsql, maxsize=YLConfig.RESPONSE_CACHE_SIZE, max_age=YLConfig.HTTP_MAX_AGE)
 
 
 def jsonp(func):
@@ -48,21 +55,64 @@ def jsonp(func):
     return decorator
 
 
-@jsonp
+def encode(objects):
+    """ Encode objects as JSON (bytes are already encoded) """
+    return objects if isinstance(objects, bytes) else dumps(objects)
+
+
+def cached_jsonp(route):
+    """ JSON/JSONP decorator with ETag and Cache-Control headers, responses are served from the response cache
+
+    Views return objects or encoded JSON (bytes). Requests with a matching If-None-Match header get 304 Not Modified
+    when the response exists (views raise Http404 otherwise)
+    """
+    def wrapper(func):
+        def decorator(request, **kwargs):
+            query = '/'.join(str(v) for v in kwargs.values())
+            callback = request.GET.get('callback', '')
+            data, etag, not_modified = responses.respond(route, query, request.META.get('HTTP_IF_NONE_MATCH'),
+                                                         lambda: encode(func(request, **kwargs)), callback)
+            if not_modified:
+                response = HttpResponse(status=304)
+            elif callback:
+                response = HttpResponse(b''.join((callback.encode('utf-8'), b'(', data, b');')), "application/javascript")
+            else:
+                response = HttpResponse(data, "application/json")
+            for header, value in responses.headers(etag).items():
+                response[header] = value
+            return response
+        return decorator
+    return wrapper
+
+
+def bulk_view(func):
+    """ Bulk request decorator: parse the JSON array in the request body and stream the records as NDJSON """
+    @csrf_exempt
+    @require_POST
+    def decorator(request, *args, **kwargs):
+        try:
+            items = parse_bulk_items(json.loads(request.body.decode('utf-8')))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        return StreamingHttpResponse(to_ndjson(func(request, items, *args, **kwargs)), content_type="application/x-ndjson")
+    return decorator
+
+
+@cached_jsonp('synset')
 def get_synset(request, synsetid):
     """ Get a synset by ID
     Mapping: /yawol/synset/<synsetID> """
-    ss = wsql.get_synset_by_id(synsetid)
+    ss = wsql.get_synset(synsetid)
     if ss is None and omwsql is not None:
         # try to search in OMW
         ss = omwsql.get_synset(synsetid)
     if ss is not None:
-        return ss.to_json()
+        return ss.to_json_bytes()
     else:
         raise Http404("Synset doesn't exist")
 
 
-@jsonp
+@cached_jsonp('search')
 def search(request, query):
     """ Search by lemma, sensekey or synsetID
     Mapping: /yawol/search/<query>
@@ -73,23 +123,23 @@ def search(request, query):
         ss = wsql.get_synset(sid)
         if ss is None and omwsql is not None:
             # try to search by OMW
-            print("Searching in OMW")
+            logger.debug("Searching {} in OMW".format(sid))
             ss = omwsql.get_synset(sid)
-            print("OMW SS", ss)
+            logger.debug("OMW synset: {}".format(ss))
         if ss is not None:
-            return SynsetCollection().add(ss).to_json()
+            return SynsetCollection().add(ss).to_json_bytes()
     # try to search by lemma
     synsets = wsql.search(lemma=query)
     if synsets:
         logger.info("Query: {} - Results: {}".format(query, synsets))
-        return synsets.to_json()
+        return synsets.to_json_bytes()
     else:
         if not synsets and omwsql is not None:
-            print("Try to search {} in OMW".format(query))
+            logger.debug("Try to search {} in OMW".format(query))
             synsets = omwsql.search(lemma=query)
             if synsets:
                 logger.info("Query: {} - Results: {}".format(query, synsets))
-                return synsets.to_json()
+                return synsets.to_json_bytes()
             else:
                 logger.warning("Not found {} in OMW".format(query))
         else:
@@ -99,11 +149,36 @@ def search(request, query):
             except:
                 ss = None
             if ss:
-                return SynsetCollection().add(ss).to_json()
+                return SynsetCollection().add(ss).to_json_bytes()
     # invalid query
     raise Http404('Invalid query')
 
 
+@bulk_view
+def get_synsets(request, synsetids):
+    """ Get synsets by a JSON array of synset IDs (POST), one NDJSON line per ID
+    Mapping: /yawol/synsets """
+    for sid, ss in bulk_get_synsets(wsql, synsetids, fallback=omwsql):
+        yield object_json((('synsetid', sid), ('synset', ss.to_json_bytes() if ss is not None else None)))
+
+
+@bulk_view
+def search_many(request, queries):
+    """ Search a JSON array of lemmas, sensekeys or synset IDs (POST), one NDJSON line per query
+    Mapping: /yawol/search """
+    for query, synsets in bulk_search(wsql, queries, fallback=omwsql, auto_wrap=False):
+        yield object_json((('query', query), ('synsets', synsets.to_json_bytes())))
+
+
+@jsonp
+def stats(request):
+    """ Connection pool, cache, response cache and SQL statement statistics (set PROFILE_QUERIES in config to record statements)
+    Mapping: /yawol/stats """
+    return {'wn': wn_stats(wsql),
+            'omw': wn_stats(omwsql) if omwsql is not None else None,
+            'responses': responses.stats()}
+
+
 def index(request):
     """ Yawol-django root """
     return HttpResponse('Yawol {yv} - yawol-django/Django-{dv}'.format(yv=__version__, dv=django.get_version()), 'text/html')
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP caching for YAWOL servers (Flask and Django)
+
+Wordnet data does not change while a server is running, so every response is identified by a strong ETag
+which is derived from the identity of the database files (path, size, modification time) and the request
+(route, query, JSONP callback). Serialized JSON is kept in a bounded LRU cache keyed by route and query,
+so that repeated requests skip both the DAO and JSON encoding. Requests with a matching If-None-Match header
+are answered with 304 Not Modified, but only when the response exists (i.e. it is cached or was rendered).
+
+    responses = ResponseCache(wn, maxsize=4096, max_age=86400)
+    data, etag, not_modified = responses.respond('synset', synsetid, request_if_none_match,
+                                                 lambda: wn.get_synset(synsetid).to_json_bytes())
+    if data is None: ... 404
+    if not_modified: ... 304
+"""
+
+# This code is a part of yawlib library: https://github.com/letuananh/yawlib
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import hashlib
+
+from yawlib.__version__ import __version__
+from yawlib.cache import SynsetCache
+
+
+# maximum number of serialized responses to be kept
+DEFAULT_RESPONSE_CACHE_SIZE = 4096
+# Cache-Control max-age (in seconds)
+DEFAULT_MAX_AGE = 86400
+
+
+def wn_path(wn):
+    """ Database (or snapshot) file of a Wordnet DAO, None if it is unknown """
+    ds = getattr(wn, 'ds', None)
+    path = getattr(ds, 'path', None) if ds is not None else None
+    if not path:
+        path = getattr(wn, 'db_path', None) or getattr(wn, 'path', None)
+    return path if path and path != ':memory:' else None
+
+
+def data_version(*wns):
+    """ Identity of the data of a list of Wordnet DAOs: yawlib version, backend names and file path, size and mtime """
+    parts = [__version__]
+    for wn in wns:
+        if wn is None:
+            continue
+        parts.append(getattr(wn, 'BACKEND', type(wn).__name__))
+        path = wn_path(wn)
+        if path is not None and os.path.isfile(path):
+            st = os.stat(path)
+            parts.append('{}:{}:{}'.format(os.path.abspath(path), st.st_size, st.st_mtime_ns))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def parse_etags(if_none_match):
+    """ Entity tags of an If-None-Match header (weak tags are compared as strong ones) """
+    if not if_none_match:
+        return []
+    return [tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip() for tag in if_none_match.split(',')]
+
+
+class ResponseCache:
+    """ ETags, Cache-Control headers and a thread-safe LRU cache of serialized responses (bytes) """
+
+    def __init__(self, *wns, maxsize=DEFAULT_RESPONSE_CACHE_SIZE, max_age=DEFAULT_MAX_AGE):
+        self.version = data_version(*wns)
+        self.max_age = max_age
+        self.cache = SynsetCache(maxsize) if maxsize else None
+
+    def etag(self, route, query, variant=''):
+        """ Strong ETag of a response (variant is anything else which changes the response body, e.g. a JSONP callback) """
+        digest = hashlib.sha1('\0'.join((self.version, route, query, variant)).encode('utf-8')).hexdigest()
+        return '"{}"'.format(digest)
+
+    def headers(self, etag):
+        return {'ETag': etag, 'Cache-Control': 'public, max-age={:d}'.format(self.max_age)}
+
+    def not_modified(self, if_none_match, etag):
+        """ Check the If-None-Match header of a request against an ETag """
+        tags = parse_etags(if_none_match)
+        return '*' in tags or etag in tags
+
+    def get(self, route, query, render):
+        """ Serialized response of a route and query
+
+        render() is called on cache misses and returns a JSON string (or bytes),
+        None (e.g. not found) is returned as it is and is not cached
+        """
+        def load():
+            data = render()
+            return data.encode('utf-8') if isinstance(data, str) else data
+        if self.cache is None:
+            return load()
+        return self.cache.get_or_load((route, query), load)
+
+    def respond(self, route, query, if_none_match, render, variant=''):
+        """ Serialized response, ETag and whether the request can be answered with 304 Not Modified
+
+        The response is taken from the cache or rendered (see get()) before If-None-Match is checked,
+        so that a resource which does not exist (render() returns None or raises) is never "not modified"
+        """
+        data = self.get(route, query, render)
+        etag = self.etag(route, query, variant)
+        return data, etag, data is not None and self.not_modified(if_none_match, etag)
+
+    def stats(self):
+        return self.cache.stats() if self.cache is not None else None